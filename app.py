@@ -1,11 +1,8 @@
-from flask import Flask, render_template, session, redirect, url_for
+from flask import Flask, render_template, session, redirect, url_for, request, jsonify, make_response
 from config import config
-from firebase_setup import initialize_firebase
+from firebase_setup import initialize_firebase, configure_firestore_client
 import os
 
-# Initialize Firebase when app starts
-initialize_firebase()
-
 def create_app(config_name=None):
     """Application factory pattern"""
     if config_name is None:
@@ -14,6 +11,102 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Firebase Admin app (credentials only). configure_firestore_client only
+    # records the channel options: the Firestore client and its gRPC channel are
+    # created lazily in each process, so nothing is shared across fork under
+    # gunicorn --preload; see gunicorn.conf.py for the warm-up and the guard
+    initialize_firebase()
+    configure_firestore_client(app.config['FIRESTORE_CHANNEL_OPTIONS'])
+    
+    # Cache for rendered project fragments (board columns, overview panels)
+    from services.fragments import init_fragment_cache
+    init_fragment_cache(app)
+    
+    # Write-behind window for drag-and-drop task moves
+    from services.firestore_service import task_write_buffer
+    task_write_buffer.delay = app.config['TASK_MOVE_COALESCE_SECONDS']
+    
+    # Rate limiting, retries and circuit breaker around Firestore calls
+    from services.firestore_service import FirestoreService
+    FirestoreService.configure_resilience(app.config)
+    
+    # Per-worker and cross-worker caches of project and user documents
+    from services.firestore_service import document_cache, shared_cache
+    document_cache.max_entries = app.config['DOCUMENT_CACHE_MAX_ENTRIES']
+    document_cache.ttl = app.config['DOCUMENT_CACHE_TTL']
+    shared_cache.configure(app.config['SHARED_CACHE_URL'] or None, ttl=app.config['SHARED_CACHE_TTL'])
+    
+    # Cached project access decisions of the project_access_required routes
+    from services.firestore_service import access_cache
+    access_cache.ttl = app.config['PROJECT_ACCESS_CACHE_TTL']
+    
+    # Snapshot-listener replicas of the projects being viewed
+    from services.firestore_service import project_replicas
+    project_replicas.max_projects = app.config['PROJECT_REPLICA_MAX_PROJECTS']
+    project_replicas.max_tasks = app.config['PROJECT_REPLICA_MAX_TASKS']
+    project_replicas.idle_seconds = app.config['PROJECT_REPLICA_IDLE_SECONDS']
+    
+    # Overload degrades to a 503 with Retry-After instead of a 500
+    from services.resilience import ServiceUnavailableError
+    
+    @app.errorhandler(ServiceUnavailableError)
+    def service_unavailable(error):
+        message = 'Service temporairement indisponible, veuillez réessayer dans un instant.'
+        if request.is_json or request.accept_mimetypes.best == 'application/json':
+            response = jsonify({'success': False, 'error': message})
+        else:
+            response = make_response(message)
+        response.status_code = 503
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    
+    # Background computation of deadline flags and due-soon reminders. Only
+    # configured here: the thread is started by the serving process itself
+    # (gunicorn's post_worker_init, or __main__ below), never by the factory,
+    # so CLI commands and a --preload master do not sweep
+    from services.due_dates import due_date_scheduler
+    due_date_scheduler.interval = app.config['DUE_DATE_SWEEP_SECONDS']
+    due_date_scheduler.due_soon_days = app.config['DUE_SOON_DAYS']
+    due_date_scheduler.upcoming_days = app.config['DUE_UPCOMING_DAYS']
+    due_date_scheduler.approaching_days = app.config['DUE_APPROACHING_DAYS']
+    due_date_scheduler.email_batch_size = app.config['REMINDER_EMAIL_BATCH_SIZE']
+    
+    # Archiving of old completed tasks (run by the due date sweep)
+    from services.archive import task_archiver
+    task_archiver.after_days = app.config['TASK_ARCHIVE_AFTER_DAYS']
+    task_archiver.batch_size = app.config['TASK_ARCHIVE_BATCH_SIZE']
+    
+    # In-memory inverted index behind task search
+    from services.search import search_index
+    search_index.max_projects = app.config['SEARCH_INDEX_MAX_PROJECTS']
+    
+    # Cached iCalendar feeds of project due dates
+    from services.calendar_feed import calendar_feeds
+    calendar_feeds.max_projects = app.config['CALENDAR_FEED_MAX_PROJECTS']
+    
+    # Signed-in user recorded as the actor of activity log events
+    from services.activity import set_actor
+    
+    @app.before_request
+    def set_activity_actor():
+        set_actor(session.get('user', {}).get('uid'))
+    
+    @app.teardown_request
+    def clear_activity_actor(error=None):
+        set_actor(None)
+    
+    # Prometheus metrics: request and FirestoreService latency, caches, queues
+    from middleware.metrics import init_metrics
+    init_metrics(app)
+    
+    # Opt-in request profiling (registered first so that it also covers compression)
+    from middleware.profiler import init_profiler
+    init_profiler(app)
+    
+    # gzip/brotli compression of HTML and JSON responses
+    from middleware.compression import init_compression
+    init_compression(app)
+    
     # Custom Jinja2 filter for initials
     @app.template_filter('initials')
     def initials_filter(name):
@@ -30,6 +123,14 @@ def create_app(config_name=None):
             return words[0][0].upper()
         return 'U'
     
+    @app.template_filter('epoch_format')
+    def epoch_format_filter(value, fmt='%d/%m/%Y'):
+        """Format a UTC epoch timestamp (as stored on Task/Project models)"""
+        from services.models import epoch_to_datetime
+        if value is None:
+            return ''
+        return epoch_to_datetime(value).strftime(fmt)
+    
     # Make Firebase config available to templates
     @app.context_processor
     def inject_firebase_config():
@@ -55,11 +156,15 @@ def create_app(config_name=None):
         if not current_user_id:
             return {'notifications': [], 'unread_count': 0}
         
+        from services.firestore_service import FirestoreService
+        from services.resilience import ServiceUnavailableError
         try:
-            from services.firestore_service import FirestoreService
             notifications = FirestoreService.get_user_pending_invites(current_user_id)
             unread_count = len(notifications)
             return {'notifications': notifications, 'unread_count': unread_count}
+        except ServiceUnavailableError:
+            # Firestore is throttled or failing: render the page without notifications
+            return {'notifications': [], 'unread_count': 0}
         except Exception as e:
             print(f"Error fetching notifications: {e}")
             return {'notifications': [], 'unread_count': 0}
@@ -76,14 +181,30 @@ def create_app(config_name=None):
     from routes.projects import projects_bp
     from routes.tasks import tasks_bp
     from routes.auth import auth_bp
+    from routes.assets import assets_bp, init_assets
     
     app.register_blueprint(main_bp, url_prefix='/dashboard')
     app.register_blueprint(projects_bp, url_prefix='/projects')
     app.register_blueprint(tasks_bp, url_prefix='/tasks')
     app.register_blueprint(auth_bp)
+    app.register_blueprint(assets_bp, url_prefix='/assets')
+    init_assets(app)
+    
+    # Flask CLI commands (flask --app app <command>)
+    from commands import register_commands
+    register_commands(app)
     
     return app
 
+def start_background_tasks(app):
+    """Start the per-process background threads of a process that serves requests"""
+    if app.config['DUE_DATE_SCHEDULER_ENABLED'] and not app.config.get('TESTING'):
+        from services.due_dates import due_date_scheduler
+        due_date_scheduler.start()
+
 if __name__ == '__main__':
     app = create_app()
+    # The debug reloader's parent process only watches files: no scheduler there
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks(app)
     app.run(debug=True)
\ No newline at end of file
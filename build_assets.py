@@ -0,0 +1,75 @@
+"""Build fingerprinted, precompressed static assets.
+
+Usage:
+    python build_assets.py
+
+Every JS/CSS file under static/ is copied to static/dist/ with a content hash
+in its name, next to .gz and .br variants. The mapping from source name to
+hashed name is written to static/dist/manifest.json, which routes.assets
+reads at startup.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+import brotli
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+ASSET_EXTENSIONS = ('.js', '.css')
+
+
+def fingerprint(content: bytes) -> str:
+    """Short content hash used in asset file names"""
+    return hashlib.sha256(content).hexdigest()[:12]
+
+
+def iter_sources():
+    """Yield the static files to build, relative to the static folder"""
+    for root, dirs, files in os.walk(STATIC_DIR):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != DIST_DIR]
+        for name in sorted(files):
+            if name.endswith(ASSET_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+
+
+def build_asset(source: str) -> str:
+    """Write the hashed and precompressed variants of one asset"""
+    with open(os.path.join(STATIC_DIR, source), 'rb') as f:
+        content = f.read()
+
+    stem, ext = os.path.splitext(source)
+    hashed = f"{stem}.{fingerprint(content)}{ext}"
+    target = os.path.join(DIST_DIR, hashed)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    with open(target, 'wb') as f:
+        f.write(content)
+    with open(target + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    with open(target + '.br', 'wb') as f:
+        f.write(brotli.compress(content, quality=11))
+
+    return hashed
+
+
+def build():
+    """Rebuild static/dist and its manifest from scratch"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {source: build_asset(source) for source in iter_sources()}
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Built {len(manifest)} assets into {DIST_DIR}")
+    return manifest
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,75 @@
+import json
+
+import click
+
+
+def register_commands(app):
+    """Register the maintenance commands on the Flask CLI"""
+
+    @app.cli.command('import-tasks')
+    @click.argument('project_id')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'import_format', type=click.Choice(['csv', 'ndjson']),
+                  help='File format (guessed from the extension by default)')
+    @click.option('--dry-run', is_flag=True, help='Validate the file without writing anything')
+    def import_tasks_command(project_id, path, import_format, dry_run):
+        """Bulk import tasks into PROJECT_ID from a CSV or NDJSON file"""
+        from services.task_import import import_tasks
+
+        if not import_format:
+            import_format = 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+        with open(path, encoding='utf-8-sig') as f:
+            report = import_tasks(project_id, f.read(), import_format, dry_run=dry_run)
+
+        for error in report['errors']:
+            click.echo(f"Row {error['row']}: {error['error']}", err=True)
+        click.echo(json.dumps({k: v for k, v in report.items() if k != 'errors'}))
+
+    @app.cli.command('refresh-due-dates')
+    @click.option('--project', 'project_id', help='Only recompute this project')
+    @click.option('--send-reminders', is_flag=True, help='Also email due-soon reminders')
+    def refresh_due_dates_command(project_id, send_reminders):
+        """Recompute task deadline flags and project overdue counts (e.g. from cron)"""
+        from services.due_dates import due_date_scheduler
+
+        report = due_date_scheduler.refresh(project_id, send_reminders=send_reminders)
+        click.echo(json.dumps(report))
+
+    @app.cli.command('backfill-projects')
+    def backfill_projects_command():
+        """Add the sort fields (deadline, name, updated_at) missing from older project documents"""
+        from services.firestore_service import FirestoreService
+
+        click.echo(json.dumps({'updated': FirestoreService.backfill_project_sort_fields()}))
+
+    @app.cli.command('dashboard-stats')
+    def dashboard_stats_command():
+        """Print project and task totals over the whole database, counted server-side"""
+        from services.firestore_service import FirestoreService
+
+        click.echo(json.dumps(FirestoreService.get_dashboard_stats()))
+
+    @app.cli.command('rebuild-boards')
+    @click.option('--project', 'project_id', help='Only rebuild this project\'s board')
+    def rebuild_boards_command(project_id):
+        """Regenerate the board read models from the tasks (e.g. after a manual data fix)"""
+        from services.firestore_service import FirestoreService
+
+        project_ids = [project_id] if project_id else [project.id for project in FirestoreService.get_projects()]
+        report = {}
+        for pid in project_ids:
+            report[pid] = len(FirestoreService.rebuild_board(pid))
+        click.echo(json.dumps({'projects': len(report), 'cards': sum(report.values())}))
+
+    @app.cli.command('archive-tasks')
+    @click.option('--project', 'project_id', help='Only archive this project\'s tasks')
+    @click.option('--days', type=click.IntRange(min=0),
+                  help='Archive completed tasks unchanged for this many days (TASK_ARCHIVE_AFTER_DAYS by default)')
+    def archive_tasks_command(project_id, days):
+        """Move old completed tasks to the archive (e.g. from cron)"""
+        from services.archive import task_archiver
+
+        if days is None and not task_archiver.enabled:
+            raise click.UsageError('Set TASK_ARCHIVE_AFTER_DAYS or pass --days')
+        report = task_archiver.run(project_id, after_days=days)
+        click.echo(json.dumps(report))
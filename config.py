@@ -15,6 +15,109 @@ class Config:
     FIREBASE_MESSAGING_SENDER_ID = os.environ.get('FIREBASE_MESSAGING_SENDER_ID')
     FIREBASE_APP_ID = os.environ.get('FIREBASE_APP_ID')
     
+    # Drag-and-drop moves written within this window are coalesced (0 = write through)
+    TASK_MOVE_COALESCE_SECONDS = float(os.environ.get('TASK_MOVE_COALESCE_SECONDS', 0.5))
+    
+    # Firestore gRPC channel: keepalive pings keep idle connections from being
+    # dropped by load balancers; FIRESTORE_WARM_UP opens it when a worker starts
+    FIRESTORE_CHANNEL_OPTIONS = [
+        ('grpc.keepalive_time_ms', int(os.environ.get('FIRESTORE_KEEPALIVE_TIME_MS', 30000))),
+        ('grpc.keepalive_timeout_ms', int(os.environ.get('FIRESTORE_KEEPALIVE_TIMEOUT_MS', 10000))),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.max_send_message_length', -1),
+        ('grpc.max_receive_message_length', -1),
+    ]
+    FIRESTORE_WARM_UP = os.environ.get('FIRESTORE_WARM_UP', 'true').lower() == 'true'
+    
+    # Firestore resilience: token buckets (per second, burst) per operation type and worker;
+    # a rate of 0 leaves that operation type unlimited
+    FIRESTORE_RATE_LIMITS = {
+        'read': (float(os.environ.get('FIRESTORE_READ_RATE', 200)), 400),
+        'query': (float(os.environ.get('FIRESTORE_QUERY_RATE', 100)), 200),
+        'aggregate': (float(os.environ.get('FIRESTORE_AGGREGATE_RATE', 50)), 100),
+        'write': (float(os.environ.get('FIRESTORE_WRITE_RATE', 100)), 200),
+    }
+    FIRESTORE_THROTTLE_MAX_WAIT = float(os.environ.get('FIRESTORE_THROTTLE_MAX_WAIT', 0.05))
+    FIRESTORE_RETRY_ATTEMPTS = int(os.environ.get('FIRESTORE_RETRY_ATTEMPTS', 3))
+    FIRESTORE_RETRY_BASE_DELAY = float(os.environ.get('FIRESTORE_RETRY_BASE_DELAY', 0.1))
+    FIRESTORE_RETRY_MAX_DELAY = float(os.environ.get('FIRESTORE_RETRY_MAX_DELAY', 2.0))
+    FIRESTORE_BREAKER_THRESHOLD = int(os.environ.get('FIRESTORE_BREAKER_THRESHOLD', 5))
+    FIRESTORE_BREAKER_RESET_SECONDS = float(os.environ.get('FIRESTORE_BREAKER_RESET_SECONDS', 30))
+    
+    # Per-worker cache of project and user documents
+    DOCUMENT_CACHE_MAX_ENTRIES = int(os.environ.get('DOCUMENT_CACHE_MAX_ENTRIES', 1000))
+    DOCUMENT_CACHE_TTL = float(os.environ.get('DOCUMENT_CACHE_TTL', 30))
+    
+    # Per-worker cache of (user, project) access decisions, dropped on membership changes
+    PROJECT_ACCESS_CACHE_TTL = float(os.environ.get('PROJECT_ACCESS_CACHE_TTL', 60))
+    
+    # Live per-worker replicas of viewed projects, fed by Firestore snapshot listeners (0 = disabled)
+    PROJECT_REPLICA_MAX_PROJECTS = int(os.environ.get('PROJECT_REPLICA_MAX_PROJECTS', 0))
+    PROJECT_REPLICA_MAX_TASKS = int(os.environ.get('PROJECT_REPLICA_MAX_TASKS', 20000))
+    PROJECT_REPLICA_IDLE_SECONDS = float(os.environ.get('PROJECT_REPLICA_IDLE_SECONDS', 300))
+    
+    # Shared (cross-worker) cache of project and user documents:
+    # redis://host:6379/0, memory:// (in-process, for tests) or empty to disable
+    SHARED_CACHE_URL = os.environ.get('SHARED_CACHE_URL', '')
+    SHARED_CACHE_TTL = int(os.environ.get('SHARED_CACHE_TTL', 300))
+    
+    # Due date scheduler: deadline flags, per-project overdue counts and reminder emails
+    DUE_DATE_SCHEDULER_ENABLED = os.environ.get('DUE_DATE_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    DUE_DATE_SWEEP_SECONDS = float(os.environ.get('DUE_DATE_SWEEP_SECONDS', 300))
+    DUE_SOON_DAYS = int(os.environ.get('DUE_SOON_DAYS', 2))
+    DUE_UPCOMING_DAYS = int(os.environ.get('DUE_UPCOMING_DAYS', 3))
+    DUE_APPROACHING_DAYS = int(os.environ.get('DUE_APPROACHING_DAYS', 4))
+    REMINDER_EMAIL_BATCH_SIZE = int(os.environ.get('REMINDER_EMAIL_BATCH_SIZE', 50))
+    
+    # Archiving of completed tasks unchanged for this many days, run by the due date sweep (0 = disabled)
+    TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', 0))
+    TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get('TASK_ARCHIVE_BATCH_SIZE', 200))
+    ARCHIVE_PAGE_SIZE = int(os.environ.get('ARCHIVE_PAGE_SIZE', 50))
+    
+    # Task search: number of project indexes kept in memory per worker
+    SEARCH_INDEX_MAX_PROJECTS = int(os.environ.get('SEARCH_INDEX_MAX_PROJECTS', 200))
+    
+    # Project lists: projects per page (further pages are loaded by cursor)
+    PROJECTS_PAGE_SIZE = int(os.environ.get('PROJECTS_PAGE_SIZE', 24))
+    DASHBOARD_STATS_CACHE_TTL = float(os.environ.get('DASHBOARD_STATS_CACHE_TTL', 30))
+    ACTIVITY_PAGE_SIZE = int(os.environ.get('ACTIVITY_PAGE_SIZE', 20))
+    
+    # iCalendar feeds: number of project feeds kept in memory per worker
+    CALENDAR_FEED_MAX_PROJECTS = int(os.environ.get('CALENDAR_FEED_MAX_PROJECTS', 200))
+    
+    # Prometheus metrics at /metrics (opt-in); set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py
+    # does) to aggregate the workers' samples. The endpoint requires the bearer token,
+    # unless METRICS_ALLOW_UNAUTHENTICATED says the network already restricts access to it.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_BEARER_TOKEN = os.environ.get('METRICS_BEARER_TOKEN', '')
+    METRICS_ALLOW_UNAUTHENTICATED = os.environ.get('METRICS_ALLOW_UNAUTHENTICATED', 'false').lower() == 'true'
+    METRICS_SYNC_SECONDS = float(os.environ.get('METRICS_SYNC_SECONDS', 5))
+    
+    # On-demand request profiling: X-Profile: 1 (or ?profile=1) from these user ids,
+    # and/or a random fraction of requests; disabled (no hook) when both are unset
+    PROFILER_ADMIN_UIDS = [uid.strip() for uid in os.environ.get('PROFILER_ADMIN_UIDS', '').split(',') if uid.strip()]
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_DIR = os.environ.get('PROFILER_DIR', 'profiles')
+    # Oldest profiles are deleted beyond this many files or bytes in PROFILER_DIR
+    PROFILER_MAX_FILES = int(os.environ.get('PROFILER_MAX_FILES', 200))
+    PROFILER_MAX_BYTES = int(os.environ.get('PROFILER_MAX_BYTES', 100 * 1024 * 1024))
+    
+    # Exports
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', 500))
+    
+    # Rendering
+    DEFAULT_LOCALE = os.environ.get('DEFAULT_LOCALE', 'fr')
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Response compression, per content type (bodies below min_size are sent as is)
+    COMPRESSION_RULES = {
+        'text/html': {'min_size': 1024, 'gzip_level': 6, 'brotli_quality': 5},
+        'application/json': {'min_size': 1024, 'gzip_level': 6, 'brotli_quality': 5},
+        'text/csv': {'min_size': 1024, 'gzip_level': 6, 'brotli_quality': 5},
+        'application/x-ndjson': {'min_size': 1024, 'gzip_level': 6, 'brotli_quality': 5},
+        'text/calendar': {'min_size': 1024, 'gzip_level': 6, 'brotli_quality': 5},
+    }
+    
 class DevelopmentConfig(Config):
     DEBUG = True
 
@@ -1,9 +1,40 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials
+from google.cloud import firestore
 import os
+import threading
+
+# gRPC channel options of the Firestore client (the library defaults unless configured)
+DEFAULT_CHANNEL_OPTIONS = (
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.max_send_message_length', -1),
+    ('grpc.max_receive_message_length', -1),
+)
+
+
+class TunedFirestoreClient(firestore.Client):
+    """Firestore client whose gRPC channel is opened with the configured options"""
+
+    def __init__(self, *args, channel_options=DEFAULT_CHANNEL_OPTIONS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._channel_options = list(channel_options)
+
+    def _firestore_api_helper(self, transport, client_class, client_module):
+        # Same as the library, which hardcodes its channel options
+        if self._firestore_api_internal is None and self._emulator_host is None:
+            channel = transport.create_channel(
+                self._target, credentials=self._credentials, options=self._channel_options
+            )
+            self._transport = transport(host=self._target, channel=channel)
+            self._firestore_api_internal = client_class(
+                transport=self._transport, client_options=self._client_options
+            )
+            client_module._client_info = self._client_info
+        return super()._firestore_api_helper(transport, client_class, client_module)
+
 
 def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
+    """Initialize Firebase Admin SDK (credentials only: no connection is opened)"""
     if not firebase_admin._apps:
         cred_path = os.environ.get('FIREBASE_CREDENTIALS_PATH')
         if cred_path and os.path.exists(cred_path):
@@ -13,15 +44,63 @@ def initialize_firebase():
             # Return None if no credentials found
             print("Warning: Firebase credentials not found. Some features may not work.")
             return None
-    
-    return firestore.client()
 
-# Initialize Firestore client
+    return firebase_admin.get_app()
+
+# Firestore client of this process, shared by all its threads (the client is thread-safe)
 db = None
+_channel_options = DEFAULT_CHANNEL_OPTIONS
+_lock = threading.Lock()
+
+def configure_firestore_client(channel_options=None):
+    """Set the gRPC channel options (keepalive...) of clients created from now on"""
+    global _channel_options
+    _channel_options = tuple(channel_options or DEFAULT_CHANNEL_OPTIONS)
 
 def get_firestore_client():
-    """Get Firestore client"""
+    """Get Firestore client, creating it on first use in this process"""
     global db
     if db is None:
-        db = initialize_firebase()
-    return db
\ No newline at end of file
+        with _lock:
+            if db is None:
+                app = initialize_firebase()
+                if app is not None:
+                    db = TunedFirestoreClient(credentials=app.credential.get_credential(),
+                                              project=app.project_id,
+                                              channel_options=_channel_options)
+    return db
+
+def release_firestore_client():
+    """Drop this process's client and close its gRPC channel, if any; returns whether there was one"""
+    global db
+    with _lock:
+        client, db = db, None
+    if client is None:
+        return False
+    # The transport only exists once the channel has been opened
+    channel = getattr(getattr(client, '_transport', None), 'grpc_channel', None)
+    if channel is not None:
+        channel.close()
+    return True
+
+def warm_up_firestore(timeout=5.0):
+    """Open this process's channel (DNS, TLS, auth token) with one cheap read before serving traffic"""
+    client = get_firestore_client()
+    if client is None:
+        return False
+    try:
+        client.collection('_warmup').document('ping').get(timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"Error warming up Firestore client: {e}")
+        return False
+
+def _reset_after_fork():
+    # A gRPC channel must not be shared across fork: the child opens its own
+    # on first use. The lock may have been held by another thread at fork time.
+    global db, _lock
+    db = None
+    _lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
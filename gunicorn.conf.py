@@ -0,0 +1,62 @@
+# Gunicorn configuration (loaded automatically from the working directory)
+import os
+import shutil
+import sys
+import tempfile
+
+# With --preload the app (create_app) is loaded once in the master and the
+# workers are forked from it. create_app only records the Firestore channel
+# options and starts no thread: each worker opens its own client and channel
+# (post_worker_init below) and starts its own due date scheduler. Anything
+# that reads Firestore at import or app-factory time would open the channel in
+# the master instead, which pre_fork below reports and undoes.
+
+# Workers write their metric samples to files in this directory and /metrics
+# aggregates them (prometheus_client multiprocess mode)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'taskflow-metrics'))
+
+
+def on_starting(server):
+    """Start from empty metric files: a previous run's would be added to this one's"""
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges (in-flight requests, queue depth...) of a worker that exited"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write buffered task moves before the worker goes away"""
+    from services.firestore_service import task_write_buffer
+    task_write_buffer.flush_all()
+
+
+def pre_fork(server, worker):
+    """Close a Firestore client created in the master before forking: a gRPC channel must not cross fork"""
+    firebase_setup = sys.modules.get('firebase_setup')
+    if firebase_setup is not None and firebase_setup.db is not None:
+        server.log.warning("Firestore client created in the gunicorn master (a Firestore call at import "
+                           "or app-factory time?); closing it, the workers open their own")
+        firebase_setup.release_firestore_client()
+
+
+def post_worker_init(worker):
+    """Prepare per-worker state once the app is loaded, before serving requests"""
+    # Background threads belong to the workers (threads do not survive fork,
+    # and the master must not talk to Firestore)
+    from app import start_background_tasks
+    if hasattr(worker.wsgi, 'config'):
+        start_background_tasks(worker.wsgi)
+    
+    # Pay channel setup and TLS here rather than on the first request
+    config = getattr(worker.wsgi, 'config', {})
+    if config.get('FIRESTORE_WARM_UP'):
+        from firebase_setup import warm_up_firestore
+        warm_up_firestore()
@@ -0,0 +1,93 @@
+from flask import current_app, request
+from typing import Dict, Iterable, Iterator, Optional
+import time
+import zlib
+
+import brotli
+
+# Bodies that are already compressed or must not be altered
+SKIPPED_STATUS_CODES = (204, 206, 304)
+
+# A streamed body is flushed to the client once this much input is pending, or
+# when the last flush is this old: flushing every (row-sized) chunk would
+# frame each one separately and barely compress
+STREAM_FLUSH_BYTES = 16 * 1024
+STREAM_FLUSH_SECONDS = 1.0
+
+
+def init_compression(app):
+    """Compress dynamic responses according to COMPRESSION_RULES"""
+    app.after_request(compress_response)
+
+def _negotiate_encoding() -> Optional[str]:
+    """Pick the best encoding the client accepts"""
+    if request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def _compressor(encoding: str, rule: Dict):
+    """Return (compress, flush, finish) callables for an incremental compressor"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=rule.get('brotli_quality', 5))
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(rule.get('gzip_level', 6), zlib.DEFLATED, 31)
+    return (compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            lambda: compressor.flush(zlib.Z_FINISH))
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, rule: Dict) -> Iterator[bytes]:
+    """Compress a streamed body, flushing every STREAM_FLUSH_BYTES of input or STREAM_FLUSH_SECONDS"""
+    compress, flush, finish = _compressor(encoding, rule)
+    flush_bytes = rule.get('stream_flush_bytes', STREAM_FLUSH_BYTES)
+    pending, last_flush = 0, time.monotonic()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk)
+            pending += len(chunk)
+            if pending >= flush_bytes or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS:
+                data += flush()
+                pending, last_flush = 0, time.monotonic()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compress_response(response):
+    """after_request hook negotiating gzip/brotli for eligible responses"""
+    if (response.status_code < 200 or response.status_code in SKIPPED_STATUS_CODES
+            or request.method == 'HEAD' or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.cache_control.no_transform):
+        return response
+
+    rule = current_app.config['COMPRESSION_RULES'].get(response.mimetype)
+    if rule is None:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, rule)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < rule.get('min_size', 0):
+            return response
+        compress, _, finish = _compressor(encoding, rule)
+        response.set_data(compress(data) + finish())
+
+    response.headers['Content-Encoding'] = encoding
+    # The compressed body is a different representation of the same resource
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
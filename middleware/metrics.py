@@ -0,0 +1,192 @@
+from flask import current_app, g, request
+from functools import wraps
+import hmac
+import inspect
+import logging
+import os
+import time
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                                   generate_latest, multiprocess)
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    generate_latest = None
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the process, created on the first init_metrics() call
+_metrics = {}
+_last_sync = 0.0
+# Cache counter values already added to the Prometheus counters, per (metric, cache)
+_synced = {}
+
+
+def _create_metrics():
+    # Gauges are per worker: 'livesum' adds up the live workers' values
+    # (multiprocess mode, PROMETHEUS_MULTIPROC_DIR set), and is ignored otherwise.
+    # Counters keep the share of exited workers, so totals never go down
+    _metrics.update(
+        in_flight=Gauge('taskflow_http_requests_in_flight', 'Requests being served',
+                        multiprocess_mode='livesum'),
+        request_latency=Histogram('taskflow_http_request_duration_seconds', 'Request latency by endpoint',
+                                  ['endpoint', 'method', 'status']),
+        service_latency=Histogram('taskflow_firestore_service_duration_seconds',
+                                  'FirestoreService method latency (and call count)', ['method', 'outcome']),
+        cache_hits=Counter('taskflow_cache_hits', 'Lookups served from a cache', ['cache']),
+        cache_misses=Counter('taskflow_cache_misses', 'Lookups that missed a cache', ['cache']),
+        outbox_depth=Gauge('taskflow_email_outbox_depth', 'Reminder emails waiting to be sent',
+                           multiprocess_mode='livesum'),
+    )
+
+def init_metrics(app):
+    """Record request and FirestoreService metrics and expose them at /metrics (Prometheus format)"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    if generate_latest is None:
+        logger.warning("prometheus_client not installed, /metrics disabled")
+        return
+    if not app.config['METRICS_BEARER_TOKEN'] and not app.config['METRICS_ALLOW_UNAUTHENTICATED']:
+        logger.warning("METRICS_BEARER_TOKEN is not set, /metrics disabled")
+        return
+    if not _metrics:
+        _create_metrics()
+        _instrument_service()
+    app.before_request(start_request)
+    app.after_request(record_status)
+    app.teardown_request(finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+def start_request():
+    """before_request hook counting the request as in flight"""
+    g.metrics_started = time.perf_counter()
+    _metrics['in_flight'].inc()
+
+def record_status(response):
+    """after_request hook keeping the status for finish_request (streamed bodies end later)"""
+    g.metrics_status = response.status_code
+    return response
+
+def finish_request(error=None):
+    """teardown_request hook observing the request latency, once the body is sent"""
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    _metrics['in_flight'].dec()
+    _metrics['request_latency'].labels(
+        request.endpoint or 'unmatched', request.method, str(g.pop('metrics_status', 500))
+    ).observe(time.perf_counter() - started)
+    _sync_gauges(current_app.config['METRICS_SYNC_SECONDS'])
+
+def _timed(name, fn):
+    """FirestoreService method recording its latency and outcome (generators: until exhausted)"""
+    histogram = _metrics['service_latency']
+
+    if inspect.isgeneratorfunction(fn):
+        @wraps(fn)
+        def timed_generator(*args, **kwargs):
+            started, outcome = time.perf_counter(), 'error'
+            try:
+                yield from fn(*args, **kwargs)
+                outcome = 'ok'
+            finally:
+                histogram.labels(name, outcome).observe(time.perf_counter() - started)
+        return timed_generator
+
+    @wraps(fn)
+    def timed(*args, **kwargs):
+        started, outcome = time.perf_counter(), 'error'
+        try:
+            result = fn(*args, **kwargs)
+            outcome = 'ok'
+            return result
+        finally:
+            histogram.labels(name, outcome).observe(time.perf_counter() - started)
+    return timed
+
+def _instrument_service():
+    """Time every public FirestoreService method"""
+    from services.firestore_service import FirestoreService
+
+    for name, attr in list(vars(FirestoreService).items()):
+        if not name.startswith('_') and isinstance(attr, staticmethod):
+            setattr(FirestoreService, name, staticmethod(_timed(name, attr.__func__)))
+
+def _cache_counters():
+    """cache -> (hits, misses) of this worker; a hit is a lookup answered without reading Firestore"""
+    from services.firestore_service import access_cache, document_cache, project_replicas, shared_cache
+    from services.calendar_feed import calendar_feeds
+    from services.fragments import get_fragment_cache
+    from services.search import search_index
+
+    counters = {
+        'document': document_cache,
+        'shared': shared_cache,
+        'replica': project_replicas,
+        'access': access_cache,
+        'fragment': get_fragment_cache(),
+    }
+    counters = {cache: (counter.hits, counter.misses) for cache, counter in counters.items()}
+    counters['search'] = (search_index.hits, search_index.builds + search_index.catch_ups)
+    counters['calendar_feed'] = (calendar_feeds.hits, calendar_feeds.builds + calendar_feeds.updates)
+    return counters
+
+def _advance(metric: str, cache: str, value: int):
+    """Add to a cache counter what its source counted since the last sync"""
+    delta = value - _synced.get((metric, cache), 0)
+    _synced[(metric, cache)] = value
+    # A source that went down was reset: all of its count is new
+    _metrics[metric].labels(cache).inc(delta if delta >= 0 else value)
+
+def _sync_gauges(max_age: float = 0):
+    """Copy this worker's cache counters and queue depth into the metrics, at most every ``max_age`` seconds"""
+    global _last_sync
+    from services.due_dates import due_date_scheduler
+
+    now = time.monotonic()
+    if now - _last_sync < max_age:
+        return
+    _last_sync = now
+    for cache, (hits, misses) in _cache_counters().items():
+        _advance('cache_hits', cache, hits)
+        _advance('cache_misses', cache, misses)
+    _metrics['outbox_depth'].set(due_date_scheduler.outbox_depth)
+
+
+class HitRatioCollector:
+    """taskflow_cache_hit_ratio, computed from the hit and miss totals of every worker"""
+
+    def __init__(self, source):
+        self.source = source
+
+    def collect(self):
+        totals = {}
+        for family in self.source.collect():
+            if family.name in ('taskflow_cache_hits', 'taskflow_cache_misses'):
+                for sample in family.samples:
+                    if not sample.name.endswith('_total'):
+                        continue
+                    counts = totals.setdefault(sample.labels['cache'], [0.0, 0.0])
+                    counts[family.name == 'taskflow_cache_misses'] += sample.value
+        ratio = GaugeMetricFamily('taskflow_cache_hit_ratio', 'Share of cache lookups that hit', labels=['cache'])
+        for cache, (hits, misses) in sorted(totals.items()):
+            ratio.add_metric([cache], hits / (hits + misses) if hits + misses else 0.0)
+        yield ratio
+
+
+def metrics_view():
+    """Prometheus exposition of the metrics of every worker"""
+    token = current_app.config['METRICS_BEARER_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return 'Unauthorized', 401
+    _sync_gauges()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate the files every worker writes its samples to
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    ratios = CollectorRegistry()
+    ratios.register(HitRatioCollector(registry))
+    body = generate_latest(registry) + generate_latest(ratios)
+    return current_app.response_class(body, content_type=CONTENT_TYPE_LATEST)
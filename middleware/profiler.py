@@ -0,0 +1,130 @@
+from flask import current_app, g, request, session
+from datetime import datetime
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+logger = logging.getLogger(__name__)
+
+# Files written by finish_profile, the only ones _prune deletes
+PROFILE_EXTENSIONS = ('.prof', '.txt', '.html')
+
+
+def init_profiler(app):
+    """Profile requests flagged by an admin or sampled at PROFILER_SAMPLE_RATE.
+
+    Nothing is hooked into the app unless PROFILER_ADMIN_UIDS or
+    PROFILER_SAMPLE_RATE is set, so requests pay nothing when it is off.
+    """
+    if not app.config['PROFILER_ADMIN_UIDS'] and app.config['PROFILER_SAMPLE_RATE'] <= 0:
+        return
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(discard_profile)
+
+def _requested() -> bool:
+    """X-Profile: 1 header or ?profile=1 from an admin, or a sampled request"""
+    flagged = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+    if flagged and session.get('user', {}).get('uid') in current_app.config['PROFILER_ADMIN_UIDS']:
+        return True
+    rate = current_app.config['PROFILER_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+def start_profile():
+    """before_request hook starting a profiler for the requests to profile"""
+    if not _requested():
+        return
+    if SamplingProfiler is not None:
+        profiler = SamplingProfiler()
+        start = profiler.start
+    else:
+        profiler = cProfile.Profile()
+        start = profiler.enable
+    try:
+        start()
+    except (RuntimeError, ValueError) as e:
+        # Only one profiler can run per thread (or per process with sys.monitoring)
+        logger.warning("Error starting request profiler: %s", e)
+        return
+    g.profiler = profiler
+    g.profile_started = time.perf_counter()
+
+def _stop(profiler):
+    if SamplingProfiler is not None and isinstance(profiler, SamplingProfiler):
+        profiler.stop()
+    else:
+        profiler.disable()
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', value)[:64]
+
+def finish_profile(response):
+    """after_request hook writing the profile to PROFILER_DIR, tagged with the route and user"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    _stop(profiler)
+    elapsed_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+    name = '-'.join([
+        datetime.utcnow().strftime('%Y%m%dT%H%M%S%f'),
+        _slug(request.endpoint or 'unknown'),
+        _slug(session.get('user', {}).get('uid') or 'anonymous'),
+        str(os.getpid())
+    ])
+    directory = current_app.config['PROFILER_DIR']
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if isinstance(profiler, cProfile.Profile):
+            # .prof opens in snakeviz/flameprof; .txt is the cumulative-time call listing
+            profiler.dump_stats(os.path.join(directory, name + '.prof'))
+            listing = io.StringIO()
+            listing.write(f"{request.method} {request.full_path} -> {response.status_code} in {elapsed_ms:.1f} ms\n\n")
+            pstats.Stats(profiler, stream=listing).sort_stats('cumulative').print_stats(60)
+            with open(os.path.join(directory, name + '.txt'), 'w', encoding='utf-8') as f:
+                f.write(listing.getvalue())
+        else:
+            # Interactive call tree / flame graph
+            with open(os.path.join(directory, name + '.html'), 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        response.headers['X-Profile'] = name
+        _prune(directory, current_app.config['PROFILER_MAX_FILES'], current_app.config['PROFILER_MAX_BYTES'])
+    except OSError:
+        logger.exception("Error writing request profile")
+    return response
+
+def _prune(directory: str, max_files: int, max_bytes: int):
+    """Delete the oldest profiles until the directory holds at most ``max_files`` files and ``max_bytes`` bytes"""
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(PROFILE_EXTENSIONS):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue  # Pruned by another worker
+            profiles.append((stat.st_mtime, name, stat.st_size))
+    profiles.sort()
+    count, total = len(profiles), sum(size for _, _, size in profiles)
+    for _, name, size in profiles:
+        if count <= max_files and total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+        count, total = count - 1, total - size
+
+def discard_profile(error=None):
+    """teardown_request hook stopping a profiler left running by an unhandled error"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        _stop(profiler)
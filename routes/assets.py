@@ -0,0 +1,59 @@
+from flask import Blueprint, current_app, request, send_from_directory, url_for, abort
+import json
+import mimetypes
+import os
+
+assets_bp = Blueprint('assets', __name__)
+
+# Precompressed variants written by build_assets.py, in order of preference
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _dist_folder(app):
+    return os.path.join(app.static_folder, 'dist')
+
+def init_assets(app):
+    """Load the fingerprinted asset manifest and expose asset_url_for to templates"""
+    manifest_path = os.path.join(_dist_folder(app), 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    else:
+        print("Warning: static/dist/manifest.json not found, run build_assets.py. Serving unversioned assets.")
+
+    app.extensions['asset_manifest'] = manifest
+    app.jinja_env.globals['asset_url_for'] = asset_url_for
+
+def asset_url_for(endpoint, **values):
+    """Drop-in replacement for url_for that resolves fingerprinted static files"""
+    if endpoint == 'static':
+        hashed = current_app.extensions.get('asset_manifest', {}).get(values.get('filename'))
+        if hashed:
+            values['filename'] = hashed
+            return url_for('assets.serve_asset', **values)
+    return url_for(endpoint, **values)
+
+@assets_bp.route('/<path:filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted asset, preferring a precompressed variant"""
+    folder = _dist_folder(current_app)
+    if not os.path.isfile(os.path.join(folder, filename)):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    served = filename
+    for name, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[name] and os.path.isfile(os.path.join(folder, filename + suffix)):
+            encoding, served = name, filename + suffix
+            break
+
+    response = send_from_directory(folder, served, mimetype=mimetype, max_age=31536000)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The name changes with the content, so the file never needs revalidation
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
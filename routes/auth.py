@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, flash
 from functools import wraps
 from services.firestore_service import FirestoreService
+from services.resilience import ServiceUnavailableError
 import firebase_admin.auth
 
 auth_bp = Blueprint('auth', __name__)
@@ -14,6 +15,44 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def project_access_required(f=None, *, api=False):
+    """Decorator to require membership of the route's project, which is passed to the view as ``project``.
+
+    The project comes from the ``project_id`` URL argument, the project of the
+    ``task_id`` URL argument, or the ``project_id`` of the JSON body. API routes
+    (``api=True``) answer with JSON errors, pages with the login or join page.
+    """
+    if f is None:
+        return lambda view: project_access_required(view, api=api)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        current_user_id = session.get('user', {}).get('uid')
+        if not current_user_id:
+            if api:
+                return jsonify({'success': False, 'error': 'Non authentifié'}), 401
+            return redirect(url_for('auth.login'))
+
+        project_id = kwargs.get('project_id')
+        if project_id is None and 'task_id' in kwargs:
+            project_id = FirestoreService.get_task_project_id(kwargs['task_id'])
+        elif project_id is None:
+            project_id = (request.get_json(silent=True) or {}).get('project_id')
+        project = FirestoreService.get_project(project_id) if project_id else None
+        if not project:
+            if api:
+                return jsonify({'success': False, 'error': 'Projet non trouvé'}), 404
+            return "Projet non trouvé", 404
+
+        if not FirestoreService.has_project_access(current_user_id, project):
+            if api:
+                return jsonify({'success': False, 'error': 'Accès refusé'}), 403
+            # Show join page instead of 403
+            return render_template('join_project.html', project=project)
+
+        return f(*args, project=project, **kwargs)
+    return decorated_function
+
 @auth_bp.route('/login')
 def login():
     """Login page"""
@@ -66,6 +105,8 @@ def session_login():
         
         return jsonify({'success': True})
         
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 401
 
@@ -94,12 +135,12 @@ def profile():
         
         for p in all_projects:
             # Check membership
-            if p.get('created_by') == user_id or user_id in p.get('members', []):
+            if p.created_by == user_id or user_id in p.members:
                 my_projects.append(p)
                 
                 # 3. Count tasks assigned to this user in this project
                 # (Only fetch tasks if user is part of the project)
-                project_tasks = FirestoreService.get_tasks(p['id'])
+                project_tasks = FirestoreService.get_tasks(p.id)
                 
                 # Check match against username OR email (covers both assignment types)
                 user_identifiers = [
@@ -111,7 +152,7 @@ def profile():
                 # Count tasks where assignee matches any of the user's identifiers
                 user_tasks = [
                     t for t in project_tasks 
-                    if t.get('assignee') and t.get('assignee') in user_identifiers
+                    if t.assignee and t.assignee in user_identifiers
                 ]
                 tasks_count += len(user_tasks)
 
@@ -1,10 +1,12 @@
-from flask import Blueprint, render_template, jsonify, request, flash, redirect, url_for, session
+from flask import Blueprint, render_template, jsonify, request, flash, redirect, url_for, session, current_app
 from services.firestore_service import FirestoreService
+from services.activity import ACTION_LABELS
 from routes.auth import login_required
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+from dataclasses import asdict
 from datetime import datetime, timezone
 
 main_bp = Blueprint('main', __name__)
@@ -19,59 +21,46 @@ def dashboard():
     if not current_user_id:
         return redirect(url_for('auth.login'))
 
-    # 2. Get User's Projects (Owner or Member)
-    all_projects = FirestoreService.get_projects()
-    user_projects = []
-    
-    # Filter projects
-    for project in all_projects:
-        is_owner = project.get('created_by') == current_user_id
-        is_member = current_user_id in project.get('members', [])
-        if is_owner or is_member:
-            user_projects.append(project)
+    # 2. First page of the user's projects, most recently updated first
+    user_projects, next_cursor = FirestoreService.get_user_projects_page(
+        current_user_id, 'updated_at', current_app.config['PROJECTS_PAGE_SIZE']
+    )
 
-    # 3. Calculate Stats Dynamically based on these projects
-    total_tasks = 0
-    overdue_tasks = 0
-    status_counts = {'todo': 0, 'in_progress': 0, 'done': 0}
+    # 3. Stats over all of the user's projects, counted server-side
+    stats = FirestoreService.get_user_dashboard_stats(
+        current_user_id, cache_ttl=current_app.config['DASHBOARD_STATS_CACHE_TTL']
+    )
+    
+    # 4. First page of the activity feed of all these projects
+    activity = _activity_context(current_user_id)
     
-    now = datetime.now(timezone.utc)
+    return render_template('dashboard.html', stats=stats, projects=user_projects, has_more_projects=bool(next_cursor),
+                           **activity)
 
-    for project in user_projects:
-        # Get tasks for this specific project
-        tasks = FirestoreService.get_tasks(project['id'])
-        
-        # Check if we should count ALL tasks in the project or ONLY tasks assigned to the user
-        # Option A: Count ALL tasks in the project (Dashboard view of project health)
-        # Option B: Filter by assignee (Personal workload view)
-        
-        # We will use Option A (Project Health) to match the "Total Projects" context
-        total_tasks += len(tasks)
-        
-        for task in tasks:
-            # Count Status
-            status = task.get('status', 'todo')
-            if status in status_counts:
-                status_counts[status] += 1
-            
-            # Count Overdue
-            # Check if task has a deadline, isn't done, and deadline is passed
-            if task.get('due_date') and status != 'done':
-                # Handle Firestore timestamp or ISO string
-                due_date = task.get('due_date')
-                # (Assuming due_date is offset-aware from previous fixes)
-                if due_date < now:
-                    overdue_tasks += 1
+@main_bp.route('/activity')
+@login_required
+def activity_feed():
+    """Next page of the cross-project activity feed (JSON, for "Voir plus")"""
+    current_user_id = session.get('user', {}).get('uid')
+    try:
+        activity = _activity_context(current_user_id, request.args.get('cursor') or None)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Curseur de pagination invalide'}), 400
+    return jsonify({
+        'success': True,
+        'events': [asdict(event) for event in activity['events']],
+        'html': render_template('partials/activity_items.html', **activity),
+        'next_cursor': activity['activity_cursor']
+    })
 
-    # Construct the stats dictionary
-    stats = {
-        'total_projects': len(user_projects),
-        'total_tasks': total_tasks,
-        'overdue_tasks': overdue_tasks,
-        'status_distribution': status_counts
-    }
-    
-    return render_template('dashboard.html', stats=stats, projects=user_projects)
+def _activity_context(user_id, cursor=None):
+    """One page of activity events, with the names of their actors"""
+    events, next_cursor = FirestoreService.get_activity_feed(
+        user_id, current_app.config['ACTIVITY_PAGE_SIZE'], cursor
+    )
+    actor_ids = list(dict.fromkeys(event.actor for event in events if event.actor))
+    actors = {user['uid']: user['username'] for user in FirestoreService.get_users_by_ids(actor_ids)}
+    return {'events': events, 'actors': actors, 'action_labels': ACTION_LABELS, 'activity_cursor': next_cursor}
 
 @main_bp.route('/api/dashboard-stats')
 @login_required
@@ -1,7 +1,20 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session, flash
-from services.firestore_service import FirestoreService
-from routes.auth import login_required
-from datetime import datetime, timezone
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session, flash, make_response, current_app, stream_with_context
+from werkzeug.http import is_resource_modified
+from itsdangerous import BadSignature, URLSafeSerializer
+from services.firestore_service import FirestoreService, PROJECT_SORTS
+from services.fragments import render_fragments
+from services.calendar_feed import calendar_feeds, due_day
+from services.resilience import ServiceUnavailableError
+from services.models import Task, epoch_to_datetime
+from services.task_import import import_tasks
+from middleware.compression import compress_stream
+from routes.auth import login_required, project_access_required
+from datetime import datetime
+from dataclasses import asdict, fields
+import csv
+import hashlib
+import io
+import json
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -10,25 +23,99 @@ import os
 projects_bp = Blueprint('projects', __name__)
 
 
+def _project_validators(project, version, *variant):
+    """Build the ETag / Last-Modified pair for a view of a project.
+    
+    The ETag combines the project version stamp (``get_project_version``) with
+    anything else the rendered view depends on (current user, day, requested month...).
+    """
+    parts = [project.id, version]
+    parts.extend(str(v) for v in variant)
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    return etag, epoch_to_datetime(project.updated_at)
+
+def _not_modified_response(validators):
+    """Return a 304 response if the client's cached copy is still current"""
+    etag, last_modified = validators
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _with_validators(current_app.response_class(status=304), validators)
+
+def _not_modified_page(validators):
+    """Like _not_modified_response, for a full HTML page"""
+    # A 304 would leave the flashed messages in the session, to show up on a later page
+    if session.get('_flashes'):
+        return None
+    return _not_modified_response(validators)
+
+def _parse_deadline(value):
+    """Deadline of a project form (ISO date or datetime) as a datetime, None if empty.
+    
+    Raises ValueError for anything else.
+    """
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid deadline: {value!r}")
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _with_validators(response, validators):
+    """Attach validators so the client revalidates on every visit"""
+    etag, last_modified = validators
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 @projects_bp.route('/')
 @login_required
 def list_projects():
-    """List projects for current user only"""
+    """List projects for current user only, one page at a time (``?format=json`` for infinite scroll)"""
     current_user_id = session.get('user', {}).get('uid')
     if not current_user_id:
         current_user_id = 'anonymous'  # Fallback for development
     
-    # Get all projects and filter by membership
-    all_projects = FirestoreService.get_projects()
-    user_projects = []
+    sort = request.args.get('sort', 'updated_at')
+    if sort not in PROJECT_SORTS:
+        sort = 'updated_at'
+    wants_json = request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
     
-    for project in all_projects:
-        is_owner = project.get('created_by') == current_user_id
-        is_member = current_user_id in project.get('members', [])
-        if is_owner or is_member:
-            user_projects.append(project)
+    try:
+        projects, next_cursor = FirestoreService.get_user_projects_page(
+            current_user_id, sort, current_app.config['PROJECTS_PAGE_SIZE'], request.args.get('cursor') or None
+        )
+    except ValueError:
+        if wants_json:
+            return jsonify({'success': False, 'error': 'Curseur de pagination invalide'}), 400
+        return redirect(url_for('projects.list_projects', sort=sort))
+    
+    if wants_json:
+        return jsonify({
+            'success': True,
+            'projects': [asdict(project) for project in projects],
+            'html': render_template('partials/project_cards.html', projects=projects),
+            'next_cursor': next_cursor
+        })
+    return render_template('projects.html', projects=projects, sort=sort, next_cursor=next_cursor)
+
+@projects_bp.route('/search')
+@login_required
+def search_tasks():
+    """Rechercher des tâches dans tous les projets de l'utilisateur"""
+    from services.search import search_index
     
-    return render_template('projects.html', projects=user_projects)
+    current_user_id = session.get('user', {}).get('uid')
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    if len(query) < 2:
+        return jsonify({'success': False, 'error': 'La recherche doit contenir au moins 2 caractères'}), 400
+    
+    projects = FirestoreService.get_user_projects(current_user_id)
+    results = search_index.search(query, projects, limit=limit)
+    return jsonify({'success': True, 'query': query, 'results': results})
 
 @projects_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -43,20 +130,16 @@ def create_project():
             return jsonify({'error': 'Le code d\'accès doit contenir au moins 4 caractères'}), 400
         
         # --- NOUVEAU : Vérifier si le code existe déjà ---
-        all_projects = FirestoreService.get_projects()
-        for p in all_projects:
-            if p.get('access_code') == access_code:
-                # Si on trouve un doublon, on génère une erreur
-                return jsonify({'error': 'Ce code d\'accès est déjà utilisé par un autre projet. Veuillez en générer un nouveau.'}), 409
+        if FirestoreService.find_project_by_access_code(access_code):
+            # Si on trouve un doublon, on génère une erreur
+            return jsonify({'error': 'Ce code d\'accès est déjà utilisé par un autre projet. Veuillez en générer un nouveau.'}), 409
         # -----------------------------------------------
 
-        # Convert deadline string to datetime if provided
-        if data.get('deadline'):
-            try:
-                # Gestion simple de la date (YYYY-MM-DD)
-                data['deadline'] = datetime.fromisoformat(data['deadline'].replace('Z', '+00:00'))
-            except:
-                pass # Ou gérer l'erreur de format
+        # Stored as a timestamp, or null: the deadline sort skips any other value
+        try:
+            data['deadline'] = _parse_deadline(data.get('deadline'))
+        except ValueError:
+            return jsonify({'error': 'Date limite invalide'}), 400
         
         # Get current user ID from session
         current_user_id = session.get('user', {}).get('uid')
@@ -69,66 +152,56 @@ def create_project():
     return render_template('project_form.html')
 
 @projects_bp.route('/<project_id>')
-@login_required
-def view_project(project_id):
+@project_access_required
+def view_project(project_id, project):
     """View project details - Join Once Access Forever"""
-    current_user_id = session.get('user', {}).get('uid')
-    
-    if not current_user_id:
-        current_user_id = 'anonymous'
-    
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return "Project not found", 404
-    
-    # Check access permission
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
-    
-    if not (is_owner or is_member):
-        # Show join page instead of 403
-        return render_template('join_project.html', project=project)
-        
     return redirect(url_for('projects.project_overview', project_id=project_id))
 
 @projects_bp.route('/<project_id>/board')
-@login_required
-def project_board(project_id):
+@project_access_required
+def project_board(project_id, project):
     """Kanban board for a project"""
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return "Project not found", 404
-    
-    current_user_id = session.get('user', {}).get('uid')
-    if not current_user_id:
-        return redirect(url_for('auth.login'))
-    
-    # Check if user is a member of the project
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
-    
-    if not (is_owner or is_member):
-        return render_template('join_project.html', project=project)
-    
-    tasks = FirestoreService.get_tasks(project_id)
+    current_user_id = session['user']['uid']
+    
+    # Deadline badges come from the scheduler's flags, which bump the project
+    # version when they change, so the version alone identifies the board
+    version, invites_version = FirestoreService.get_page_versions(project, current_user_id)
+    validators = _project_validators(project, version, 'board', current_user_id, invites_version)
+    not_modified = _not_modified_page(validators)
+    if not_modified:
+        return not_modified
+    
+    # Columns are shared by every member, re-render them only when the project changes
+    fragment_key = (project_id, version)
+    board_columns, = render_fragments(fragment_key, lambda: _board_context(project_id),
+                                      'partials/board_columns.html')
+    
+    response = make_response(render_template('board.html', project=project, board_columns=board_columns))
+    return _with_validators(response, validators)
+
+def _board_context(project_id):
+    """Load the tasks needed to render the board columns (from the board read model)"""
+    tasks = FirestoreService.get_board_tasks(project_id)
     
     # Organize tasks by status
     board = {
-        'todo': [t for t in tasks if t.get('status') == 'todo'],
-        'in_progress': [t for t in tasks if t.get('status') == 'in_progress'],
-        'done': [t for t in tasks if t.get('status') == 'done']
+        'todo': [t for t in tasks if t.status == 'todo'],
+        'in_progress': [t for t in tasks if t.status == 'in_progress'],
+        'done': [t for t in tasks if t.status == 'done']
     }
-    
-    # FIX IS HERE: Use datetime.now(timezone.utc)
-    return render_template('board.html', project=project, board=board, now=datetime.now(timezone.utc))
+    return {'board': board}
 
 @projects_bp.route('/<project_id>/edit', methods=['PUT'])
-def edit_project(project_id):
+@project_access_required(api=True)
+def edit_project(project_id, project):
     """Edit a project"""
     data = request.get_json()
     
-    if data.get('deadline'):
-        data['deadline'] = datetime.fromisoformat(data['deadline'].replace('Z', '+00:00'))
+    if 'deadline' in data:
+        try:
+            data['deadline'] = _parse_deadline(data['deadline'])
+        except ValueError:
+            return jsonify({'error': 'Date limite invalide'}), 400
     
     FirestoreService.update_project(project_id, data)
     return jsonify({'success': True})
@@ -149,7 +222,7 @@ def join_specific_project(project_id):
         return jsonify({'success': False, 'message': 'Project not found'}), 404
     
     # Verify access code
-    if project.get('access_code') != access_code:
+    if project.access_code != access_code:
         return jsonify({'success': False, 'message': 'Invalid Access Code'}), 403
     
     # Get current user ID from session
@@ -158,7 +231,7 @@ def join_specific_project(project_id):
         return jsonify({'success': False, 'message': 'User not authenticated'}), 401
     
     # Check if user is already a member
-    if current_user_id in project.get('members', []):
+    if current_user_id in project.members:
         return jsonify({'success': True, 'message': 'Vous êtes déjà membre de ce projet', 'already_member': True})
     
     # Add user to project members
@@ -166,74 +239,95 @@ def join_specific_project(project_id):
     return jsonify({'success': True, 'message': 'Vous avez rejoint le projet avec succès'})
 
 @projects_bp.route('/<project_id>/overview')
-@login_required
-def project_overview(project_id):
+@project_access_required
+def project_overview(project_id, project):
     """Vue d'ensemble du projet"""
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return "Projet non trouvé", 404
-    
-    current_user_id = session.get('user', {}).get('uid')
-    if not current_user_id:
-        return redirect(url_for('auth.login'))
-    
-    # Check if user is a member of the project
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
+    current_user_id = session['user']['uid']
     
-    if not (is_owner or is_member):
-        return render_template('join_project.html', project=project)
-    
-    tasks = FirestoreService.get_tasks(project_id)
+    version, invites_version = FirestoreService.get_page_versions(project, current_user_id)
+    validators = _project_validators(project, version, 'overview', current_user_id, invites_version)
+    not_modified = _not_modified_page(validators)
+    if not_modified:
+        return not_modified
     
     # Get member data
-    member_ids = project.get('members', [])
+    member_ids = project.members
     members_data = FirestoreService.get_users_by_ids(member_ids)
     
-    # Calculate project statistics
-    total_tasks = len(tasks)
-    completed_tasks = len([t for t in tasks if t.get('status') == 'done'])
-    completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    pending_tasks = total_tasks - completed_tasks
+    fragment_key = (project_id, version)
+    overview_stats, overview_recent = render_fragments(
+        fragment_key, lambda: _overview_context(project),
+        'partials/overview_stats.html', 'partials/overview_recent.html'
+    )
     
-    # Get recent activity (last 5 tasks)
-    recent_tasks = sorted(tasks, key=lambda x: x.get('updated_at', x.get('created_at')), reverse=True)[:5]
+    response = make_response(render_template('project_overview.html', project=project, overview_stats=overview_stats,
+                                             overview_recent=overview_recent, members_data=members_data))
+    return _with_validators(response, validators)
+
+def _overview_context(project):
+    """Load the statistics and recent tasks shown on the overview"""
+    # Counts and the last 5 tasks come straight from the store, O(K) reads
+    stats = FirestoreService.get_task_completion_stats(project.id)
+    recent_tasks = FirestoreService.get_recent_tasks(project.id, limit=5)
     
     # Get team members (for now, just the member count)
-    team_size = len(project.get('members', []))
-    
-    stats = {
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'completion_percentage': round(completion_percentage, 1),
-        'pending_tasks': pending_tasks,
-        'team_size': team_size
-    }
+    stats['team_size'] = len(project.members)
     
-    return render_template('project_overview.html', project=project, stats=stats, recent_tasks=recent_tasks, members_data=members_data)
+    return {'stats': stats, 'recent_tasks': recent_tasks}
+
+def _tasks_by_due_day(tasks):
+    """Group tasks by the (UTC) day they are due"""
+    tasks_by_day = {}
+    for task in tasks:
+        day = due_day(task)
+        if day:
+            tasks_by_day.setdefault(day, []).append(task)
+    return tasks_by_day
+
+def _calendar_feed_token(project_id, user_id):
+    """Signed token of a member's calendar subscription (calendar apps have no session)"""
+    serializer = URLSafeSerializer(current_app.secret_key, salt='calendar-feed')
+    return serializer.dumps([project_id, user_id])
+
+@projects_bp.route('/<project_id>/calendar.ics')
+def calendar_feed(project_id):
+    """Flux iCalendar des échéances du projet, pour les applications d'agenda"""
+    serializer = URLSafeSerializer(current_app.secret_key, salt='calendar-feed')
+    try:
+        token_project_id, user_id = serializer.loads(request.args.get('token', ''))
+    except (BadSignature, ValueError):
+        return "Lien d'abonnement invalide", 404
+    
+    project = FirestoreService.get_project(project_id)
+    # The subscription ends when its owner is no longer a member
+    if token_project_id != project_id or not project or not FirestoreService.has_project_access(user_id, project):
+        return "Lien d'abonnement invalide", 404
+    
+    version = FirestoreService.get_project_version(project)
+    validators = _project_validators(project, version, 'ics')
+    not_modified = _not_modified_response(validators)
+    if not_modified:
+        return not_modified
+    
+    body = calendar_feeds.render(project, version)
+    response = current_app.response_class(body, mimetype='text/calendar')
+    response.headers['Content-Disposition'] = f'inline; filename="{project_id}.ics"'
+    return _with_validators(response, validators)
 
 @projects_bp.route('/<project_id>/calendar/data/<int:year>/<int:month>')
-@login_required
-def calendar_data(project_id, year, month):
+@project_access_required(api=True)
+def calendar_data(project_id, year, month, project):
     """API pour récupérer les données du calendrier"""
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return jsonify({'error': 'Projet non trouvé'}), 404
-    
-    current_user_id = session.get('user', {}).get('uid')
-    if not current_user_id:
-        return jsonify({'error': 'Non authentifié'}), 401
-    
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
+    from datetime import datetime, timedelta
     
-    if not (is_owner or is_member):
-        return jsonify({'error': 'Accès refusé'}), 403
+    version = FirestoreService.get_project_version(project)
+    validators = _project_validators(project, version, 'calendar', year, month, datetime.now().date())
+    not_modified = _not_modified_response(validators)
+    if not_modified:
+        return not_modified
     
     tasks = FirestoreService.get_tasks(project_id)
     
-    from datetime import datetime, timedelta
-    
     first_day = datetime(year, month, 1)
     start_offset = first_day.weekday()
     start_date = first_day - timedelta(days=start_offset)
@@ -241,19 +335,10 @@ def calendar_data(project_id, year, month):
     calendar_days = []
     current_date = start_date
     
+    tasks_by_day = _tasks_by_due_day(tasks)
+    
     for i in range(42):
-        day_tasks = []
-        for task in tasks:
-            if task.get('due_date'):
-                if hasattr(task['due_date'], 'date'):
-                    task_date = task['due_date'].date()
-                elif hasattr(task['due_date'], 'seconds'):
-                    task_date = datetime.fromtimestamp(task['due_date'].seconds).date()
-                else:
-                    continue
-                    
-                if task_date == current_date.date():
-                    day_tasks.append(task)
+        day_tasks = tasks_by_day.get(current_date.date(), [])
         
         calendar_days.append({
             'date': current_date.isoformat(),
@@ -271,30 +356,18 @@ def calendar_data(project_id, year, month):
         'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
     ]
     
-    return jsonify({
+    response = jsonify({
         'calendar_days': calendar_days,
         'current_month': month_names[month-1],
         'current_year': year,
         'current_month_index': month
     })
+    return _with_validators(response, validators)
 @projects_bp.route('/<project_id>/calendar')
-@login_required
-def project_calendar(project_id):
+@project_access_required
+def project_calendar(project_id, project):
     """Calendrier du projet"""
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return "Projet non trouvé", 404
-    
-    current_user_id = session.get('user', {}).get('uid')
-    if not current_user_id:
-        return redirect(url_for('auth.login'))
-    
-    # Check if user is a member of the project
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
-    
-    if not (is_owner or is_member):
-        return render_template('join_project.html', project=project)
+    current_user_id = session['user']['uid']
     
     tasks = FirestoreService.get_tasks(project_id)
     
@@ -319,22 +392,11 @@ def project_calendar(project_id):
     calendar_days = []
     current_date = start_date
     
+    # Find tasks for each date
+    tasks_by_day = _tasks_by_due_day(tasks)
+    
     for i in range(42):
-        day_tasks = []
-        
-        # Find tasks for this date
-        for task in tasks:
-            if task.get('due_date'):
-                # Handle Firestore timestamp
-                if hasattr(task['due_date'], 'date'):
-                    task_date = task['due_date'].date()
-                elif hasattr(task['due_date'], 'seconds'):
-                    task_date = datetime.fromtimestamp(task['due_date'].seconds).date()
-                else:
-                    continue
-                    
-                if task_date == current_date.date():
-                    day_tasks.append(task)
+        day_tasks = tasks_by_day.get(current_date.date(), [])
         
         calendar_days.append({
             'date': current_date,
@@ -352,42 +414,121 @@ def project_calendar(project_id):
         'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
     ]
     
+    feed_url = url_for('projects.calendar_feed', project_id=project_id,
+                       token=_calendar_feed_token(project_id, current_user_id), _external=True)
+    
     return render_template('project_calendar.html', 
                          project=project, 
+                         feed_url=feed_url,
                          calendar_days=calendar_days,
                          current_month=month_names[month-1],
                          current_year=year,
                          current_month_index=month)
     
+# Deadline flags are derived data maintained by the scheduler, not exported
+EXPORT_FIELDS = [f.name for f in fields(Task) if f.name not in ('due_state', 'reminder_sent')]
+EXPORT_TIMESTAMP_FIELDS = ('due_date', 'created_at', 'updated_at')
+
+def _export_row(task):
+    """Task as a flat dict with ISO 8601 timestamps"""
+    row = {name: getattr(task, name) for name in EXPORT_FIELDS}
+    for name in EXPORT_TIMESTAMP_FIELDS:
+        if row[name] is not None:
+            row[name] = epoch_to_datetime(row[name]).isoformat()
+    return row
+
+def _export_csv(tasks):
+    """Yield the export as CSV, one line per task"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for task in tasks:
+        writer.writerow(_export_row(task))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _export_ndjson(tasks):
+    """Yield the export as newline-delimited JSON"""
+    for task in tasks:
+        yield json.dumps(_export_row(task), ensure_ascii=False) + '\n'
+
+@projects_bp.route('/<project_id>/archive')
+@project_access_required
+def project_archive(project_id, project):
+    """Tâches terminées archivées du projet"""
+    try:
+        tasks, next_cursor = FirestoreService.get_archived_tasks(
+            project_id, current_app.config['ARCHIVE_PAGE_SIZE'], request.args.get('cursor')
+        )
+    except ValueError:
+        return redirect(url_for('projects.project_archive', project_id=project_id))
+    
+    return render_template('project_archive.html', project=project, tasks=tasks, next_cursor=next_cursor,
+                           archive_after_days=current_app.config['TASK_ARCHIVE_AFTER_DAYS'])
+
+@projects_bp.route('/<project_id>/export')
+@project_access_required(api=True)
+def export_tasks(project_id, project):
+    """Stream every task of the project as CSV (default) or NDJSON"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Format non supporté'}), 400
+    
+    tasks = FirestoreService.iter_tasks(project_id, page_size=current_app.config['EXPORT_PAGE_SIZE'])
+    if export_format == 'csv':
+        body, mimetype = _export_csv(tasks), 'text/csv'
+    else:
+        body, mimetype = _export_ndjson(tasks), 'application/x-ndjson'
+    filename = f"tasks-{project_id}.{export_format}"
+    
+    # ?gzip=1 downloads a .gz file; otherwise the compression middleware
+    # negotiates Content-Encoding with the client
+    if request.args.get('gzip') == '1':
+        body = (chunk.encode('utf-8') for chunk in body)
+        body = compress_stream(body, 'gzip', current_app.config['COMPRESSION_RULES'][mimetype])
+        mimetype, filename = 'application/gzip', filename + '.gz'
+    
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@projects_bp.route('/<project_id>/import', methods=['POST'])
+@project_access_required(api=True)
+def import_project_tasks(project_id, project):
+    """Bulk import tasks from an uploaded CSV or NDJSON file (?dry_run=1 to only validate)"""
+    upload = request.files.get('file')
+    try:
+        if upload:
+            content, filename = upload.read().decode('utf-8-sig'), upload.filename or ''
+        else:
+            content, filename = request.get_data().decode('utf-8-sig'), ''
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'error': 'Le fichier doit être encodé en UTF-8'}), 400
+    
+    import_format = request.values.get('format')
+    if not import_format:
+        is_ndjson = filename.endswith(('.ndjson', '.jsonl')) or request.mimetype == 'application/x-ndjson'
+        import_format = 'ndjson' if is_ndjson else 'csv'
+    if import_format not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'error': 'Format non supporté'}), 400
+    
+    dry_run = request.values.get('dry_run') == '1'
+    report = import_tasks(project_id, content, import_format, dry_run=dry_run)
+    return jsonify({'success': not report['errors'], **report})
+
 @projects_bp.route('/<project_id>/invite_member', methods=['POST'])
-@login_required
-def invite_member_by_email(project_id):
+@project_access_required(api=True)
+def invite_member_by_email(project_id, project):
     """Invite a member by email"""
     data = request.get_json()
-    print(f"DEBUG: Received data: {data}")  # Debug line
     
     email = data.get('email', '').strip().lower() if data else ''
-    print(f"DEBUG: Email after processing: '{email}'")  # Debug line
     
     if not email:
-        print("DEBUG: Email validation failed")
         return jsonify({'success': False, 'error': 'Email requis'}), 400
     
-    project = FirestoreService.get_project(project_id)
-    if not project:
-        return jsonify({'success': False, 'error': 'Projet non trouvé'}), 404
-    
-    current_user_id = session.get('user', {}).get('uid')
-    if not current_user_id:
-        return jsonify({'success': False, 'error': 'Non authentifié'}), 401
-    
-    # Check if user is owner or member
-    is_owner = project.get('created_by') == current_user_id
-    is_member = current_user_id in project.get('members', [])
-    
-    if not (is_owner or is_member):
-        return jsonify({'success': False, 'error': 'Accès refusé'}), 403
-    
     # Find user by email
     user = FirestoreService.find_user_by_email(email)
     if not user:
@@ -396,11 +537,11 @@ def invite_member_by_email(project_id):
     user_id = user.get('uid')
     
     # Check if already a member
-    if user_id in project.get('members', []):
+    if user_id in project.members:
         return jsonify({'success': False, 'error': 'Cet utilisateur est déjà membre du projet', 'category': 'warning'}), 200
     
     # Check if already has pending invite
-    if user_id in project.get('pending_invites', []):
+    if user_id in project.pending_invites:
         return jsonify({'success': False, 'error': 'Une invitation est déjà en attente pour cet utilisateur', 'category': 'warning'}), 200
     
     # Add to pending invites
@@ -408,7 +549,7 @@ def invite_member_by_email(project_id):
     
     # Send email notification
     try:
-        send_invitation_email(email, project.get('name'), project_id)
+        send_invitation_email(email, project.name, project_id)
     except Exception as e:
         print(f"Failed to send email: {e}")
     
@@ -428,7 +569,7 @@ def accept_invite(project_id):
         return jsonify({'success': False, 'error': 'Projet non trouvé'}), 404
     
     # Check if user has pending invite
-    if current_user_id not in project.get('pending_invites', []):
+    if current_user_id not in project.pending_invites:
         return jsonify({'success': False, 'error': 'Aucune invitation en attente'}), 400
     
     # Move from pending_invites to members
@@ -506,20 +647,15 @@ def join_project_route(project_id):
         return jsonify({'success': False, 'message': 'Projet non trouvé'}), 404
     
     # Verify access code matches this specific project
-    if project.get('access_code') != access_code:
+    if project.access_code != access_code:
         return jsonify({'success': False, 'message': 'Code incorrect'}), 403
     
     # Check if already a member
-    if current_user_id in project.get('members', []):
+    if current_user_id in project.members:
         return jsonify({'success': True, 'message': 'Vous êtes déjà membre de ce projet', 'already_member': True})
     
     # Add user to members array using arrayUnion
-    from google.cloud.firestore import ArrayUnion
-    db = FirestoreService._get_db()
-    db.collection('projects').document(project_id).update({
-        'members': ArrayUnion([current_user_id]),
-        'updated_at': datetime.utcnow()
-    })
+    FirestoreService.add_member_to_project(project_id, current_user_id)
     
     return jsonify({'success': True, 'message': 'Projet rejoint avec succès'})
 
@@ -541,43 +677,34 @@ def search_and_join():
     if not current_user_id:
         return jsonify({'success': False, 'message': 'Non authentifié'}), 401
 
-    # 2. Chercher le projet qui correspond à ce code
-    all_projects = FirestoreService.get_projects()
-    target_project = None
-    
-    for p in all_projects:
-        # Comparaison sensible à la casse
-        if p.get('access_code') == access_code:
-            target_project = p
-            break
+    # 2. Chercher le projet qui correspond à ce code (comparaison sensible à la casse)
+    target_project = FirestoreService.find_project_by_access_code(access_code)
     
     if not target_project:
         return jsonify({'success': False, 'message': 'Aucun projet trouvé avec ce code'}), 404
 
     # 3. Vérifier si l'utilisateur est déjà membre
-    if current_user_id in target_project.get('members', []) or target_project.get('created_by') == current_user_id:
+    if current_user_id in target_project.members or target_project.created_by == current_user_id:
         return jsonify({
             'success': True, 
             'message': 'Vous êtes déjà membre de ce projet', 
-            'project_id': target_project['id'],
+            'project_id': target_project.id,
             'already_member': True
         })
 
     # 4. Ajouter l'utilisateur au projet
     try:
-        from google.cloud.firestore import ArrayUnion
-        db = FirestoreService._get_db()
-        db.collection('projects').document(target_project['id']).update({
-            'members': ArrayUnion([current_user_id]),
-            'updated_at': datetime.utcnow()
-        })
+        FirestoreService.add_member_to_project(target_project.id, current_user_id)
         
         return jsonify({
             'success': True, 
-            'message': f'Bienvenue dans le projet "{target_project.get("name")}" !',
-            'project_id': target_project['id']
+            'message': f'Bienvenue dans le projet "{target_project.name}" !',
+            'project_id': target_project.id
         })
         
+    except ServiceUnavailableError:
+        # Overload: let the app answer 503 with Retry-After
+        raise
     except Exception as e:
         print(f"Error joining project: {e}")
         return jsonify({'success': False, 'message': 'Erreur serveur lors de l\'ajout'}), 500
\ No newline at end of file
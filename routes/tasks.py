@@ -1,22 +1,23 @@
 from flask import Blueprint, request, jsonify
 from services.firestore_service import FirestoreService
+from routes.auth import project_access_required
 from datetime import datetime
 
 tasks_bp = Blueprint('tasks', __name__)
 
 @tasks_bp.route('/create', methods=['POST'])
-def create_task():
+@project_access_required(api=True)
+def create_task(project):
     """Create a new task"""
     data = request.get_json()
     
     # Check for unique task name within project
-    project_id = data.get('project_id')
     task_title = data.get('title', '').strip()
     
-    if project_id and task_title:
-        existing_tasks = FirestoreService.get_tasks(project_id)
+    if task_title:
+        existing_tasks = FirestoreService.get_tasks(project.id)
         for task in existing_tasks:
-            if task.get('title', '').strip().lower() == task_title.lower():
+            if task.title.strip().lower() == task_title.lower():
                 return jsonify({'success': False, 'error': 'Le nom de la tâche doit être unique dans ce projet.'}), 400
     
     # Convert due_date string to datetime if provided
@@ -31,9 +32,12 @@ def create_task():
     return jsonify({'success': True, 'id': task_id})
 
 @tasks_bp.route('/<task_id>/update', methods=['PUT'])
-def update_task(task_id):
+@project_access_required(api=True)
+def update_task(task_id, project):
     """Update a task"""
     data = request.get_json()
+    # Access was checked on the task's project: it cannot be moved to another one
+    data.pop('project_id', None)
     
     if data.get('due_date'):
         data['due_date'] = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
@@ -42,7 +46,8 @@ def update_task(task_id):
     return jsonify({'success': True})
 
 @tasks_bp.route('/<task_id>/move', methods=['PUT'])
-def move_task(task_id):
+@project_access_required(api=True)
+def move_task(task_id, project):
     """Move task to different status (for drag & drop)"""
     data = request.get_json()
     new_status = data.get('status')
@@ -50,11 +55,13 @@ def move_task(task_id):
     if new_status not in ['todo', 'in_progress', 'done']:
         return jsonify({'error': 'Invalid status'}), 400
     
-    FirestoreService.update_task(task_id, {'status': new_status})
+    # Coalesced with the other moves of this card made within the buffer window
+    FirestoreService.queue_task_update(task_id, {'status': new_status})
     return jsonify({'success': True})
 
 @tasks_bp.route('/<task_id>/delete', methods=['DELETE'])
-def delete_task(task_id):
+@project_access_required(api=True)
+def delete_task(task_id, project):
     """Delete a task"""
     FirestoreService.delete_task(task_id)
     return jsonify({'success': True})
\ No newline at end of file
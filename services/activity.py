@@ -0,0 +1,32 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Collection of the append-only activity log
+ACTIVITY_COLLECTION = 'activity'
+
+# Wording of each event in the activity feed
+ACTION_LABELS = {
+    'project_created': 'a créé le projet',
+    'project_updated': 'a modifié le projet',
+    'project_deleted': 'a supprimé le projet',
+    'member_invited': 'a invité un membre dans',
+    'member_joined': 'a rejoint le projet',
+    'invitation_declined': 'a décliné l\'invitation à',
+    'task_created': 'a créé la tâche',
+    'tasks_imported': 'a importé des tâches dans',
+    'task_updated': 'a modifié la tâche',
+    'task_moved': 'a déplacé la tâche',
+    'task_deleted': 'a supprimé la tâche',
+}
+
+# User behind the current request, recorded as the actor of the events it causes
+_current_actor: ContextVar[Optional[str]] = ContextVar('activity_actor', default=None)
+
+
+def set_actor(user_id: Optional[str]):
+    _current_actor.set(user_id)
+
+
+def get_actor() -> Optional[str]:
+    """Current user id, or None outside requests (CLI, background threads)"""
+    return _current_actor.get()
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+# Collection the archived tasks are moved to, out of the queries on 'tasks'
+ARCHIVE_COLLECTION = 'archived_tasks'
+
+
+class TaskArchiver:
+    """Moves completed tasks unchanged for ``after_days`` days to the archive.
+
+    Tasks are moved in batches of ``batch_size`` (one transaction per project
+    and batch), so the board, calendar, statistics and search only ever read
+    the live tasks. Tasks without a project stay live: no project counts them
+    in its ``archived_count``. Disabled when ``after_days`` is 0.
+    """
+
+    def __init__(self, after_days: int = 0, batch_size: int = 200):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.runs = 0
+        self.archived = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.after_days > 0
+
+    def run(self, project_id: Optional[str] = None, after_days: Optional[int] = None) -> Dict:
+        """Archive the old completed tasks of one project, or of every project"""
+        from services.firestore_service import FirestoreService
+
+        after_days = self.after_days if after_days is None else after_days
+        cutoff = datetime.now(timezone.utc) - timedelta(days=after_days)
+        report = {'archived': 0, 'batches': 0, 'projects': set()}
+        while True:
+            tasks = FirestoreService.get_archivable_tasks(cutoff, project_id, limit=self.batch_size)
+            if not tasks:
+                break
+            by_project = {}
+            for task in tasks:
+                if task.project_id:
+                    by_project.setdefault(task.project_id, []).append(task.id)
+            moved = 0
+            for pid, task_ids in by_project.items():
+                moved += FirestoreService.archive_tasks(pid, task_ids, cutoff)
+                report['projects'].add(pid)
+            report['archived'] += moved
+            report['batches'] += 1
+            if not moved or len(tasks) < self.batch_size:
+                break
+        self.runs += 1
+        self.archived += report['archived']
+        report['projects'] = len(report['projects'])
+        return report
+
+    def stats(self) -> Dict:
+        return {'after_days': self.after_days, 'runs': self.runs, 'archived': self.archived}
+
+
+# Run by the due date sweep (under its lease) and by the CLI
+task_archiver = TaskArchiver()
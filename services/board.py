@@ -0,0 +1,70 @@
+import json
+import math
+import zlib
+from typing import Dict, List, Optional
+
+from services.models import Task
+
+# Collection of the board read models: '<project_id>' holds the metadata and
+# the first chunk of cards, '<project_id>_<n>' the following chunks
+BOARD_COLLECTION = 'boards'
+
+# Task fields the board columns render
+CARD_FIELDS = ('title', 'description', 'status', 'priority', 'assignee', 'due_date', 'due_state', 'created_at')
+
+# Chunks are sized well below Firestore's 1 MiB document limit, and a
+# rebuild leaves room for the board to grow by GROWTH before the next one.
+# The head tracks an upper bound of each chunk's size ('sizes', grown by
+# every card written) so that growing cards also make the board stale.
+CARDS_PER_CHUNK = 400
+CHUNK_BYTES = 256 * 1024
+GROWTH = 1.25
+MAX_CHUNK_BYTES = CHUNK_BYTES * GROWTH
+
+
+def chunk_id(project_id: str, index: int) -> str:
+    """Document id of a chunk of a project's board"""
+    return project_id if index == 0 else f'{project_id}_{index}'
+
+
+def chunk_of(task_id: str, chunks: int) -> int:
+    """Chunk holding a task's card, for a board of ``chunks`` chunks"""
+    return zlib.crc32(task_id.encode('utf-8')) % chunks
+
+
+def card_from(data: Dict) -> Dict:
+    """Card fields present in a task document or partial update"""
+    return {name: data[name] for name in CARD_FIELDS if name in data}
+
+
+def size_of(cards: Dict) -> int:
+    """Approximate stored size of cards, in bytes"""
+    return len(json.dumps(cards, default=str).encode('utf-8'))
+
+
+def chunk_count(cards: Dict[str, Dict]) -> int:
+    """Number of chunks for a board, leaving room for it to grow until the next rebuild"""
+    size = size_of(cards)
+    return max(1, math.ceil(len(cards) * GROWTH / CARDS_PER_CHUNK), math.ceil(size * GROWTH / CHUNK_BYTES))
+
+
+def is_usable(head: Optional[Dict]) -> bool:
+    """Whether a board's metadata describes a complete, current read model"""
+    if not head or head.get('stale') or 'sizes' not in head:
+        return False
+    return (head.get('count', 0) <= head.get('chunks', 0) * CARDS_PER_CHUNK
+            and all(size <= MAX_CHUNK_BYTES for size in head['sizes'].values()))
+
+
+def tasks_from(project_id: str, chunks: List[Dict]) -> List[Task]:
+    """Tasks (card fields only) of the chunks of a board, newest first"""
+    tasks = []
+    for index, chunk in enumerate(chunks):
+        for task_id, card in (chunk.get('cards') or {}).items():
+            if chunk_of(task_id, len(chunks)) != index:
+                continue  # Left over from a previous layout of the board
+            task = Task.from_dict(task_id, card)
+            task.project_id = project_id
+            tasks.append(task)
+    tasks.sort(key=lambda task: task.created_at or 0, reverse=True)
+    return tasks
@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from services.cache import LRUCache
+from services.models import Project, Task, epoch_to_datetime
+
+
+def due_day(task: Task) -> Optional[date]:
+    """(UTC) day a task is due, as shown on the calendar"""
+    if not task.due_date:
+        return None
+    return epoch_to_datetime(task.due_date).date()
+
+
+def _escape(text: str) -> str:
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Do not split a multi-byte character
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts)
+
+
+def _format_utc(epoch: int) -> str:
+    return epoch_to_datetime(epoch).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_event(task: Task) -> str:
+    """VEVENT of a task: an all-day event on its due day"""
+    day = due_day(task)
+    summary = f'✔ {task.title}' if task.status == 'done' else task.title
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{task.id}@taskflow',
+        f'DTSTAMP:{_format_utc(task.updated_at or task.created_at or task.due_date)}',
+        f'DTSTART;VALUE=DATE:{day.strftime("%Y%m%d")}',
+        f'DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime("%Y%m%d")}',
+        f'SUMMARY:{_escape(summary)}',
+    ]
+    if task.description:
+        lines.append(f'DESCRIPTION:{_escape(task.description)}')
+    if task.updated_at:
+        lines.append(f'LAST-MODIFIED:{_format_utc(task.updated_at)}')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
+
+
+class CalendarFeeds:
+    """Per-worker cache of the iCalendar feeds of projects.
+
+    A feed is reused as long as the project version is unchanged. When it
+    moved, only the tasks updated since the feed was built are re-read and
+    their events regenerated (the feed is rebuilt if the task count shows
+    deletions). At most ``max_projects`` feeds are kept.
+    """
+
+    def __init__(self, max_projects: int = 200):
+        self._feeds = LRUCache(max_entries=max_projects)
+        self.hits = 0
+        self.builds = 0
+        self.updates = 0
+
+    @property
+    def max_projects(self) -> int:
+        return self._feeds.max_entries
+
+    @max_projects.setter
+    def max_projects(self, value: int):
+        self._feeds.max_entries = value
+
+    def render(self, project: Project, version: str) -> str:
+        """iCalendar document of a project's due dates at ``version``"""
+        from services.firestore_service import FirestoreService, task_write_buffer
+
+        feed = self._feeds.get(project.id)
+        if feed is not None and feed['version'] == version:
+            self.hits += 1
+            return feed['body']
+
+        # The feed is read from Firestore: write buffered moves first
+        task_write_buffer.flush_group(project.id)
+        if feed is None:
+            feed = self._build(FirestoreService.get_tasks(project.id))
+        else:
+            updated = FirestoreService.get_tasks_updated_since(project.id, feed['watermark'])
+            feed = self._apply(feed, updated)
+            if FirestoreService.count_tasks(project.id) != len(feed['task_ids']):
+                feed = self._build(FirestoreService.get_tasks(project.id))
+            else:
+                self.updates += 1
+        feed['version'] = version
+        feed['body'] = self._document(project, feed['events'].values())
+        self._feeds.set(project.id, feed)
+        return feed['body']
+
+    def drop(self, project_id: str):
+        self._feeds.delete(project_id)
+
+    def stats(self) -> Dict:
+        return {'projects': len(self._feeds), 'hits': self.hits, 'builds': self.builds, 'updates': self.updates}
+
+    def _build(self, tasks: Iterable[Task]) -> Dict:
+        self.builds += 1
+        return self._apply({'events': {}, 'task_ids': set(), 'watermark': 0}, tasks)
+
+    @staticmethod
+    def _apply(feed: Dict, tasks: Iterable[Task]) -> Dict:
+        """Copy of a feed with the events of ``tasks`` regenerated"""
+        events = dict(feed['events'])
+        task_ids = set(feed['task_ids'])
+        watermark = feed['watermark']
+        for task in tasks:
+            task_ids.add(task.id)
+            if task.due_date:
+                events[task.id] = render_event(task)
+            else:
+                events.pop(task.id, None)
+            watermark = max(watermark, task.updated_at or 0)
+        return {'events': events, 'task_ids': task_ids, 'watermark': watermark}
+
+    @staticmethod
+    def _document(project: Project, events: Iterable[str]) -> str:
+        header = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//TaskFlow//Calendrier//FR',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f'X-WR-CALNAME:{_escape(project.name)}',
+        ]
+        return (''.join(_fold(line) + '\r\n' for line in header)
+                + ''.join(events)
+                + 'END:VCALENDAR\r\n')
+
+
+# Shared by the feed route
+calendar_feeds = CalendarFeeds()
@@ -0,0 +1,257 @@
+import logging
+import os
+import smtplib
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+# Deadline states stored on tasks as ``due_state`` (None when nothing is due soon),
+# one per board badge colour: red, red, orange, yellow
+DUE_STATES = ('overdue', 'due_soon', 'upcoming', 'approaching')
+
+
+def classify_due(due_date: Optional[int], status: str, now: int, due_soon_days: int = 2,
+                 upcoming_days: int = 3, approaching_days: int = 4) -> Optional[str]:
+    """Deadline state of a task from its due date (UTC epoch seconds)"""
+    if not due_date or status == 'done':
+        return None
+    if due_date < now:
+        return 'overdue'
+    days_left = (due_date - now) // DAY
+    if days_left < due_soon_days:
+        return 'due_soon'
+    if days_left < upcoming_days:
+        return 'upcoming'
+    if days_left < approaching_days:
+        return 'approaching'
+    return None
+
+
+class DueDateScheduler:
+    """Keeps the precomputed deadline flags of tasks and the overdue counts of projects current.
+
+    Flags are recomputed for the projects whose tasks had a due date or status
+    written (``request_refresh``), and for every project on a periodic sweep.
+    Only one worker sweeps at a time (a Firestore lease); the sweep also sends
+    one reminder digest per member for tasks that became due soon.
+    """
+
+    def __init__(self, interval: float = 300, due_soon_days: int = 2, upcoming_days: int = 3,
+                 approaching_days: int = 4, email_batch_size: int = 50):
+        self.interval = interval
+        self.due_soon_days = due_soon_days
+        self.upcoming_days = upcoming_days
+        self.approaching_days = approaching_days
+        self.email_batch_size = email_batch_size
+        self.enabled = False
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._requested = set()
+        self._outbox = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.sweeps = 0
+        self.refreshes = 0
+        self.flags_written = 0
+        self.reminders_sent = 0
+        self._warned_mail = False
+
+    def classify(self, due_date: Optional[int], status: str, now: Optional[int] = None) -> Optional[str]:
+        now = int(time.time()) if now is None else now
+        return classify_due(due_date, status, now, self.due_soon_days, self.upcoming_days, self.approaching_days)
+
+    def start(self):
+        """Run refreshes and periodic sweeps in a background thread of this worker"""
+        self.enabled = True
+        with self._cond:
+            self._ensure_thread()
+
+    def request_refresh(self, project_id: Optional[str]):
+        """Recompute a project's flags soon (called after due date or status writes)"""
+        if not self.enabled or not project_id:
+            return
+        with self._cond:
+            self._requested.add(project_id)
+            self._ensure_thread()
+            self._cond.notify()
+
+    @property
+    def outbox_depth(self) -> int:
+        return len(self._outbox)
+
+    @property
+    def mail_configured(self) -> bool:
+        """Whether SMTP credentials are set; reminders are only queued when they are"""
+        return bool(os.environ.get('SMTP_EMAIL') and os.environ.get('SMTP_PASSWORD'))
+
+    def refresh(self, project_id: Optional[str] = None, send_reminders: bool = False) -> Dict:
+        """Recompute deadline flags and counts of one project, or of every project"""
+        from services.firestore_service import FirestoreService
+
+        now = int(time.time())
+        horizon = datetime.now(timezone.utc) + timedelta(days=max(self.upcoming_days, self.approaching_days))
+        by_project = {}
+        for task in FirestoreService.get_due_date_candidates(horizon, project_id):
+            by_project.setdefault(task.project_id, []).append(task)
+        if project_id:
+            by_project.setdefault(project_id, [])
+
+        report = {'projects': 0, 'flags_written': 0, 'reminders_queued': 0}
+        reminders = []
+        for pid, tasks in by_project.items():
+            project = FirestoreService.get_project(pid) if pid else None
+            if project is None:
+                continue
+            states = {}
+            counts = {'overdue': 0, 'due_soon': 0}
+            for task in tasks:
+                state = self.classify(task.due_date, task.status, now)
+                if state != task.due_state:
+                    states[task.id] = state
+                if state in counts:
+                    counts[state] += 1
+                if state == 'due_soon' and not task.reminder_sent:
+                    reminders.append((project, task))
+            if states or (project.overdue_count, project.due_soon_count) != (counts['overdue'], counts['due_soon']):
+                FirestoreService.update_due_states(pid, states, counts['overdue'], counts['due_soon'])
+                report['projects'] += 1
+                report['flags_written'] += len(states)
+
+        self.flags_written += report['flags_written']
+        if send_reminders and reminders:
+            if self.mail_configured:
+                report['reminders_queued'] = self._queue_reminders(reminders)
+                self.flush_outbox()
+            elif not self._warned_mail:
+                # The tasks keep reminder_sent unset: they are reminded once mail is configured
+                logger.warning("SMTP credentials not configured, due date reminders are not sent")
+                self._warned_mail = True
+        return report
+
+    def sweep(self) -> Optional[Dict]:
+        """Refresh every project, send reminders and archive old tasks, if this worker holds the sweep lease"""
+        from services.firestore_service import FirestoreService
+
+        if not FirestoreService.acquire_lease('due-date-sweep', self.owner, ttl=self.interval * 2):
+            return None
+        from services.archive import task_archiver
+
+        self.sweeps += 1
+        report = self.refresh(send_reminders=True)
+        if task_archiver.enabled:
+            # Under the same lease, so that one worker archives at a time
+            report['archived'] = task_archiver.run()['archived']
+        return report
+
+    def flush_outbox(self) -> int:
+        """Send queued reminder emails, batching them over one SMTP connection.
+
+        Without SMTP credentials the emails stay queued.
+        """
+        from services.firestore_service import FirestoreService
+
+        if not self.mail_configured:
+            return 0
+        sender_email = os.environ.get('SMTP_EMAIL')
+        sender_password = os.environ.get('SMTP_PASSWORD')
+
+        sent = 0
+        while self._outbox:
+            batch = [self._outbox.popleft() for _ in range(min(self.email_batch_size, len(self._outbox)))]
+            sent_task_ids = set()
+            try:
+                with smtplib.SMTP("smtp.gmail.com", 587) as server:
+                    server.starttls()
+                    server.login(sender_email, sender_password)
+                    for recipient, subject, body, task_ids in batch:
+                        msg = MIMEMultipart()
+                        msg['From'] = sender_email
+                        msg['To'] = recipient
+                        msg['Subject'] = subject
+                        msg.attach(MIMEText(body, 'plain'))
+                        server.send_message(msg)
+                        sent_task_ids.update(task_ids)
+                        sent += 1
+            except Exception:
+                # Unsent tasks keep reminder_sent unset and are queued again by the next sweep
+                logger.exception("Error sending due date reminders")
+            if sent_task_ids:
+                FirestoreService.mark_reminders_sent(sent_task_ids)
+        self.reminders_sent += sent
+        return sent
+
+    def stats(self) -> Dict:
+        return {
+            'sweeps': self.sweeps,
+            'refreshes': self.refreshes,
+            'flags_written': self.flags_written,
+            'reminders_sent': self.reminders_sent,
+            'outbox_depth': self.outbox_depth
+        }
+
+    def _queue_reminders(self, reminders: Iterable) -> int:
+        """Group due-soon tasks into one digest per project member email"""
+        from services.firestore_service import FirestoreService
+
+        digests = {}
+        for project, task in reminders:
+            for user in FirestoreService.get_users_by_ids(project.members):
+                email = user.get('email')
+                if not email or '@' not in email:
+                    continue
+                digests.setdefault(email, []).append((project, task))
+
+        for email, items in digests.items():
+            lines = [
+                f"- {task.title} ({project.name}) : échéance le "
+                f"{datetime.fromtimestamp(task.due_date, timezone.utc).strftime('%d/%m/%Y')}"
+                for project, task in items
+            ]
+            body = (
+                "Les tâches suivantes arrivent bientôt à échéance :\n\n"
+                + "\n".join(lines)
+                + "\n\n---\nTaskFlow - Gestion de Projets\n"
+            )
+            self._outbox.append((email, "Tâches à échéance proche - TaskFlow", body,
+                                 [task.id for _, task in items]))
+        return len(digests)
+
+    def _ensure_thread(self):
+        # Started lazily so that each forked worker gets its own thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='due-date-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_sweep = time.monotonic()
+        while True:
+            with self._cond:
+                timeout = next_sweep - time.monotonic()
+                if not self._requested and timeout > 0:
+                    self._cond.wait(timeout)
+                requested, self._requested = self._requested, set()
+            for project_id in requested:
+                try:
+                    self.refresh(project_id)
+                    self.refreshes += 1
+                except Exception:
+                    logger.exception("Error refreshing due dates of project %s", project_id)
+            if time.monotonic() >= next_sweep:
+                next_sweep = time.monotonic() + self.interval
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Error sweeping due dates")
+
+
+# Shared by the service (write hooks), the app (background thread) and the CLI
+due_date_scheduler = DueDateScheduler()
@@ -1,6 +1,64 @@
+import atexit
 from firebase_setup import get_firestore_client
-from datetime import datetime
-from typing import Dict, List, Optional
+from services.models import ActivityEvent, Project, Task, epoch_to_datetime, to_epoch
+from services.activity import ACTIVITY_COLLECTION, get_actor
+from services.archive import ARCHIVE_COLLECTION
+from services.board import (BOARD_COLLECTION, MAX_CHUNK_BYTES, card_from, chunk_count, chunk_id, chunk_of, is_usable,
+                            size_of, tasks_from)
+from services.due_dates import DUE_STATES, due_date_scheduler
+from services.search import search_index
+from services.cache import LRUCache
+from services.write_buffer import WriteBuffer
+from services.resilience import TRANSIENT_ERRORS, ResilientExecutor, ServiceUnavailableError
+from services.shared_cache import SharedCache
+from services.replica import ReplicaManager
+from services.pagination import decode_cursor, encode_cursor
+from dataclasses import asdict
+import copy
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+TASK_STATUSES = ('todo', 'in_progress', 'done')
+
+# Server-side orderings of a user's project list: sort -> (field, direction)
+PROJECT_SORTS = {
+    'updated_at': ('updated_at', 'DESCENDING'),
+    'deadline': ('deadline', 'ASCENDING'),
+    'name': ('name', 'ASCENDING'),
+}
+
+# Firestore limit on the number of values of an 'in' filter
+IN_FILTER_LIMIT = 30
+
+# Short-lived cache for aggregate statistics (global and per user)
+_stats_cache = LRUCache(max_entries=1000)
+
+# Rate limiting, retries and circuit breaking for every Firestore call;
+# limits are configured from the app config by configure_resilience()
+firestore_guard = ResilientExecutor()
+
+# Cross-worker cache of project and user documents (disabled unless SHARED_CACHE_URL is set)
+shared_cache = SharedCache()
+
+# Per-worker read-through cache of project and user documents, keyed by
+# (kind, id); dropped by the service's writes and by other workers' ones
+document_cache = LRUCache(max_entries=1000, ttl=30)
+shared_cache.subscribe(lambda kind, key: document_cache.delete((kind, key)))
+
+# Live replicas of the projects being viewed (disabled unless PROJECT_REPLICA_MAX_PROJECTS > 0)
+project_replicas = ReplicaManager()
+
+# task id -> project id (never changes), to group buffered task writes and
+# check access to task routes without re-reading the task
+_task_projects = LRUCache(max_entries=10000)
+
+# Per-worker cache of project access decisions keyed by (user id, project id);
+# dropped when the project's membership changes, in this worker or another one
+access_cache = LRUCache(max_entries=10000, ttl=60)
+shared_cache.subscribe(
+    lambda kind, key: kind == 'access' and access_cache.delete_where(lambda cached: cached[1] == key)
+)
+
 
 class FirestoreService:
     """Service class for Firestore operations"""
@@ -13,6 +71,227 @@ class FirestoreService:
             raise Exception("Firebase not configured. Please set FIREBASE_CREDENTIALS_PATH in .env")
         return db
     
+    @staticmethod
+    def _read(op: str, fn):
+        """Run an idempotent read (op: 'read', 'query' or 'aggregate'), retried on transient errors"""
+        return firestore_guard.call(op, fn, idempotent=True)
+    
+    @staticmethod
+    def _write(fn):
+        """Run a write; never retried since increments and array unions are not idempotent"""
+        return firestore_guard.call('write', fn)
+    
+    @staticmethod
+    def configure_resilience(config) -> None:
+        """Apply the FIRESTORE_* rate limits and retry/breaker settings of the app config"""
+        firestore_guard.configure(
+            limits=config['FIRESTORE_RATE_LIMITS'],
+            max_attempts=config['FIRESTORE_RETRY_ATTEMPTS'],
+            base_delay=config['FIRESTORE_RETRY_BASE_DELAY'],
+            max_delay=config['FIRESTORE_RETRY_MAX_DELAY'],
+            max_wait=config['FIRESTORE_THROTTLE_MAX_WAIT'],
+            failure_threshold=config['FIRESTORE_BREAKER_THRESHOLD'],
+            reset_timeout=config['FIRESTORE_BREAKER_RESET_SECONDS']
+        )
+    
+    @staticmethod
+    def get_resilience_metrics() -> Dict:
+        """Limiter, retry and circuit breaker counters"""
+        return firestore_guard.metrics()
+    
+    @staticmethod
+    def get_document_cache_stats() -> Dict:
+        """Hit/miss/eviction counters of the per-worker and shared document caches"""
+        return {'local': document_cache.stats(), 'shared': shared_cache.stats()}
+    
+    @staticmethod
+    def _invalidate_project(project_id: str):
+        """Drop cached copies of a project document, locally and in every worker"""
+        shared_cache.invalidate('project', project_id)
+        project_replicas.mark_dirty(project_id)
+    
+    @staticmethod
+    def _invalidate_user(uid: str):
+        """Drop cached copies of a user profile, locally and in every worker"""
+        shared_cache.invalidate('user', uid)
+    
+    @staticmethod
+    def _invalidate_access(project_id: str):
+        """Drop cached access decisions of a project after its members changed, in every worker"""
+        shared_cache.invalidate('access', project_id)
+    
+    @staticmethod
+    def _bump_invites(db, batch, user_ids: List[str]):
+        """Bump the invitation stamp of users whose pending invitations changed (see get_page_versions)"""
+        from google.cloud.firestore import Increment
+        for uid in user_ids:
+            batch.set(db.collection('users').document(uid), {'invites_version': Increment(1)}, merge=True)
+    
+    @staticmethod
+    def has_project_access(user_id: str, project: Project) -> bool:
+        """Whether a user may open a project (owner or member), cached per (user, project)"""
+        key = (user_id, project.id)
+        allowed = access_cache.get(key)
+        if allowed is None:
+            allowed = project.created_by == user_id or user_id in project.members
+            access_cache.set(key, allowed)
+        return allowed
+    
+    @staticmethod
+    def get_task_project_id(task_id: str) -> Optional[str]:
+        """Project of a task (cached: a task never changes project)"""
+        project_id = _task_projects.get(task_id)
+        if project_id is None:
+            project_id = FirestoreService._get_task_project_id(FirestoreService._get_db(), task_id)
+            if project_id:
+                _task_projects.set(task_id, project_id)
+        return project_id
+    
+    @staticmethod
+    def _touch_project(db, project_id: str):
+        """Bump a project's version stamp after one of its tasks changed"""
+        from google.cloud.firestore import Increment
+        FirestoreService._write(lambda: db.collection('projects').document(project_id).update({
+            'updated_at': datetime.utcnow(),
+            'version': Increment(1)
+        }))
+        FirestoreService._invalidate_project(project_id)
+    
+    @staticmethod
+    def _get_task_project_id(db, task_id: str) -> Optional[str]:
+        """Read only the project_id field of a task"""
+        doc = FirestoreService._read('read', lambda: db.collection('tasks').document(task_id).get(['project_id']))
+        if doc.exists:
+            return doc.to_dict().get('project_id')
+        return None
+    
+    @staticmethod
+    def _activity(db, action: str, project_id: Optional[str], audience: Optional[List[str]] = None,
+                  project_name: Optional[str] = None, actor: Optional[str] = None, **details):
+        """Reference and body of an activity event, for the caller to write along with its mutation.
+        
+        ``audience`` (the project members by default) is stored on the event
+        so that a user's feed is a single array_contains query.
+        """
+        if audience is None or project_name is None:
+            project = FirestoreService.get_project(project_id) if project_id else None
+            if audience is None:
+                audience = project.members if project else []
+            if project_name is None:
+                project_name = project.name if project else ''
+        event = {
+            'action': action,
+            'project_id': project_id,
+            'project_name': project_name,
+            'audience': list(dict.fromkeys(audience)),
+            'actor': actor or get_actor(),
+            'created_at': datetime.utcnow()
+        }
+        event.update({name: value for name, value in details.items() if value is not None})
+        return db.collection(ACTIVITY_COLLECTION).document(), event
+    
+    @staticmethod
+    def _write_with_activity(db, write, action: str, project_id: Optional[str], **details):
+        """Commit a write (``write(batch)``) and its activity event atomically"""
+        batch = db.batch()
+        write(batch)
+        batch.set(*FirestoreService._activity(db, action, project_id, **details))
+        FirestoreService._write(batch.commit)
+    
+    @staticmethod
+    def _joining(project_id: str, user_id: str) -> Dict:
+        """Activity event details of a user joining a project (they see it in their feed too)"""
+        project = FirestoreService.get_project(project_id)
+        return {
+            'audience': (project.members if project else []) + [user_id],
+            'project_name': project.name if project else '',
+            'actor': user_id
+        }
+    
+    @staticmethod
+    def _board_head(db, project_id: Optional[str], transaction=None) -> Optional[Dict]:
+        """Layout of a project's board read model, or None if there is none to keep up to date"""
+        if not project_id:
+            return None
+        ref = db.collection(BOARD_COLLECTION).document(project_id)
+        snapshot = ref.get(['chunks', 'count', 'stale', 'sizes'], transaction=transaction)
+        head = snapshot.to_dict() if snapshot.exists else None
+        return head if is_usable(head) else None
+    
+    @staticmethod
+    def _board_writes(db, project_id: str, head: Dict, cards: Dict[str, Optional[Dict]],
+                      count_delta: int = 0) -> List[Tuple]:
+        """(reference, data) merges applying card changes (None removes a card) to a board's chunks.
+        
+        Written cards grow the chunk sizes tracked by the head; when a chunk
+        would outgrow MAX_CHUNK_BYTES the board is marked stale instead, to be
+        re-chunked by the rebuild of its next view.
+        """
+        from google.cloud.firestore import DELETE_FIELD, Increment
+        boards = db.collection(BOARD_COLLECTION)
+        changes = {}
+        added = {}
+        for task_id, card in cards.items():
+            if card == {}:
+                continue
+            index = chunk_of(task_id, head['chunks'])
+            changes.setdefault(index, {'cards': {}})['cards'][task_id] = DELETE_FIELD if card is None else card
+            if card is not None:
+                added[str(index)] = added.get(str(index), 0) + size_of({task_id: card})
+        sizes = head.get('sizes') or {}
+        if any(sizes.get(index, 0) + size > MAX_CHUNK_BYTES for index, size in added.items()):
+            return [(boards.document(project_id), {'stale': True})]
+        if added:
+            changes.setdefault(0, {})['sizes'] = {index: Increment(size) for index, size in added.items()}
+        if count_delta:
+            changes.setdefault(0, {})['count'] = Increment(count_delta)
+        return [(boards.document(chunk_id(project_id, index)), data) for index, data in changes.items()]
+    
+    @staticmethod
+    def get_project_version(project: Project) -> str:
+        """Version stamp of a project and its tasks, used for conditional responses.
+        
+        The stamp fields are read from Firestore, past the document caches, so
+        that a write made through another worker changes it at once. A cached
+        ``project`` found out of date is reloaded in place.
+        """
+        return FirestoreService._read_versions(project)[0]
+    
+    @staticmethod
+    def get_page_versions(project: Project, user_id: str) -> Tuple[str, int]:
+        """Version stamp of a project (see get_project_version) and invitation stamp of a user.
+        
+        The invitation stamp (``invites_version`` on the user document) is
+        bumped by every change of the user's pending invitations, which the
+        page layout shows; both are read in a single round trip.
+        """
+        return FirestoreService._read_versions(project, user_id)
+    
+    @staticmethod
+    def _read_versions(project: Project, user_id: Optional[str] = None) -> Tuple[str, int]:
+        db = FirestoreService._get_db()
+        project_ref = db.collection('projects').document(project.id)
+        refs = [project_ref] + ([db.collection('users').document(user_id)] if user_id else [])
+        snapshots = FirestoreService._read('read', lambda: list(
+            db.get_all(refs, field_paths=['version', 'updated_at', 'invites_version'])
+        ))
+        by_path = {snapshot.reference.path: snapshot for snapshot in snapshots if snapshot.exists}
+        data = by_path[project_ref.path].to_dict() if project_ref.path in by_path else None
+        if data is not None:
+            if data.get('version', 0) != project.version:
+                document_cache.delete(('project', project.id))
+                fresh = FirestoreService.get_project(project.id)
+                if fresh is not None:
+                    for name, value in asdict(fresh).items():
+                        setattr(project, name, value)
+            project.version = data.get('version', 0)
+            project.updated_at = to_epoch(data.get('updated_at'))
+        user = by_path.get(refs[-1].path) if user_id else None
+        invites_version = (user.to_dict() or {}).get('invites_version', 0) if user else 0
+        # Buffered task moves are not in Firestore yet but must change the stamp
+        version = f"{project.version}.{project.updated_at or 0}.{task_write_buffer.generation(project.id)}"
+        return version, invites_version
+    
     @staticmethod
     def create_project(data: Dict, current_user_id: str = 'anonymous') -> str:
         """Create a new project"""
@@ -20,49 +299,306 @@ class FirestoreService:
         data['updated_at'] = datetime.utcnow()
         data['created_by'] = current_user_id  # Track project owner
         data['members'] = [current_user_id]  # Creator is first member
+        data['version'] = 1
+        data.setdefault('deadline', None)  # Listed (last) when sorting by deadline
         db = FirestoreService._get_db()
-        doc_ref = db.collection('projects').add(data)
-        return doc_ref[1].id
+        doc_ref = db.collection('projects').document()
+        FirestoreService._write_with_activity(
+            db, lambda batch: batch.set(doc_ref, data), 'project_created', doc_ref.id,
+            audience=[current_user_id], project_name=data.get('name', ''), actor=current_user_id
+        )
+        return doc_ref.id
     
     @staticmethod
-    def get_projects() -> List[Dict]:
+    def get_projects() -> List[Project]:
         """Get all projects"""
-        projects = []
         db = FirestoreService._get_db()
-        docs = db.collection('projects').stream()
+        docs = FirestoreService._read('query', lambda: list(db.collection('projects').stream()))
+        return [Project.from_doc(doc) for doc in docs]
+    
+    @staticmethod
+    def get_user_projects(user_id: str) -> List[Project]:
+        """Get the projects a user is a member of (creators are members)"""
+        db = FirestoreService._get_db()
+        docs = FirestoreService._read(
+            'query', lambda: list(db.collection('projects').where('members', 'array_contains', user_id).stream())
+        )
+        return [Project.from_doc(doc) for doc in docs]
+    
+    @staticmethod
+    def get_user_projects_page(user_id: str, sort: str = 'updated_at', page_size: int = 24,
+                               cursor: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+        """One page of a user's projects ordered in Firestore, and the cursor of the next page.
+        
+        Sorting by deadline lists the projects that have one first, then the
+        others by id. Raises ValueError for an unknown sort or a bad cursor.
+        """
+        from google.cloud.firestore import Query
+        if sort not in PROJECT_SORTS:
+            raise ValueError(f"Unknown project sort: {sort}")
+        field, direction = PROJECT_SORTS[sort]
+        direction = getattr(Query, direction)
+        # Cursor: [phase, sort value, document id] of the last project of the previous page
+        start = decode_cursor(cursor, 3) if cursor else None
+        
+        db = FirestoreService._get_db()
+        member_of = db.collection('projects').where('members', 'array_contains', user_id)
+        if sort == 'deadline':
+            phases = [
+                (member_of.where('deadline', '>', datetime(1970, 1, 1, tzinfo=timezone.utc))
+                 .order_by('deadline').order_by('__name__'), 'deadline'),
+                (member_of.where('deadline', '==', None).order_by('__name__'), None),
+            ]
+        else:
+            phases = [(member_of.order_by(field, direction=direction).order_by('__name__', direction=direction), field)]
+        
+        # One extra document tells whether there is a next page
+        found = []
+        for phase in range(start[0] if start else 0, len(phases)):
+            query, order_field = phases[phase]
+            if start and phase == start[0]:
+                position = {'__name__': start[2]}
+                if order_field:
+                    position[order_field] = start[1]
+                query = query.start_after(position)
+            query = query.limit(page_size + 1 - len(found))
+            docs = FirestoreService._read('query', lambda query=query: list(query.stream()))
+            found.extend((phase, order_field, doc) for doc in docs)
+            if len(found) > page_size:
+                break
+        
+        next_cursor = None
+        if len(found) > page_size:
+            found = found[:page_size]
+            phase, order_field, last = found[-1]
+            next_cursor = encode_cursor([phase, last.get(order_field) if order_field else None, last.id])
+        return [Project.from_doc(doc) for _, _, doc in found], next_cursor
+    
+    @staticmethod
+    def backfill_project_sort_fields(chunk_size: int = 500) -> int:
+        """Give every project the fields its list is sorted on; returns the number of projects updated.
+        
+        A Firestore query ordered or filtered on a field leaves out the documents
+        that lack it, so projects created before these fields were always
+        written would be missing from get_user_projects_page. Deadlines stored
+        as strings (which the deadline sort skips too) are converted.
+        """
+        db = FirestoreService._get_db()
+        docs = FirestoreService._read('query', lambda: list(db.collection('projects').stream()))
+        updates = []
         for doc in docs:
-            project = doc.to_dict()
-            project['id'] = doc.id
-            projects.append(project)
-        return projects
+            data = doc.to_dict()
+            missing = {}
+            if 'deadline' not in data:
+                missing['deadline'] = None
+            elif data['deadline'] is not None and not isinstance(data['deadline'], datetime):
+                # Legacy string deadline: a timestamp if it parses, null otherwise
+                missing['deadline'] = epoch_to_datetime(to_epoch(data['deadline']))
+            if 'name' not in data:
+                missing['name'] = ''
+            if 'updated_at' not in data:
+                missing['updated_at'] = data.get('created_at') or datetime.utcnow()
+            if missing:
+                updates.append((doc.id, missing))
+        for start in range(0, len(updates), chunk_size):
+            batch = db.batch()
+            for project_id, missing in updates[start:start + chunk_size]:
+                batch.update(db.collection('projects').document(project_id), missing)
+            FirestoreService._write(batch.commit)
+        for project_id, _ in updates:
+            FirestoreService._invalidate_project(project_id)
+        return len(updates)
     
     @staticmethod
-    def get_project(project_id: str) -> Optional[Dict]:
+    def get_dashboard_stats(cache_ttl: float = 0) -> Dict:
+        """Statistics over every project and task, from server-side count() and sum() aggregations.
+        
+        No document is downloaded, so memory use and latency do not depend on
+        the size of the collections. Tasks with an unknown status count in the
+        total only. Archived tasks count as done, as in get_user_dashboard_stats.
+        Pass ``cache_ttl`` (seconds) to reuse the last result for a short while.
+        """
+        if cache_ttl:
+            cached = _stats_cache.get('dashboard')
+            if cached is not None:
+                return cached
+        
+        db = FirestoreService._get_db()
+        projects = db.collection('projects')
+        tasks = db.collection('tasks')
+        archived_tasks = FirestoreService._sum(projects, 'archived_count')
+        
+        stats = {
+            'total_projects': FirestoreService._count(projects),
+            'total_tasks': FirestoreService._count(tasks) + archived_tasks,
+            # Flag maintained by the due date scheduler
+            'overdue_tasks': FirestoreService._count(tasks.where('due_state', '==', 'overdue')),
+            'status_distribution': {
+                status: FirestoreService._count(tasks.where('status', '==', status)) for status in TASK_STATUSES
+            }
+        }
+        stats['status_distribution']['done'] += archived_tasks
+        
+        if cache_ttl:
+            _stats_cache.set('dashboard', stats, ttl=cache_ttl)
+        return stats
+    
+    @staticmethod
+    def get_user_dashboard_stats(user_id: str, cache_ttl: float = 0) -> Dict:
+        """Dashboard statistics over a user's projects, from count() aggregations.
+        
+        Only project ids and archive counts are read; tasks are counted
+        server-side over chunks of projects (``in`` filters), so no task
+        document is downloaded. Archived tasks count as done, as in
+        get_task_completion_stats.
+        """
+        if cache_ttl:
+            cached = _stats_cache.get(('user', user_id))
+            if cached is not None:
+                return cached
+        
+        db = FirestoreService._get_db()
+        docs = FirestoreService._read('query', lambda: list(
+            db.collection('projects').where('members', 'array_contains', user_id).select(['archived_count']).stream()
+        ))
+        project_ids = [doc.id for doc in docs]
+        archived_tasks = sum((doc.to_dict() or {}).get('archived_count') or 0 for doc in docs)
+        
+        stats = {
+            'total_projects': len(project_ids),
+            'total_tasks': archived_tasks,
+            'overdue_tasks': 0,
+            'status_distribution': {status: 0 for status in TASK_STATUSES}
+        }
+        stats['status_distribution']['done'] = archived_tasks
+        for i in range(0, len(project_ids), IN_FILTER_LIMIT):
+            tasks = db.collection('tasks').where('project_id', 'in', project_ids[i:i + IN_FILTER_LIMIT])
+            stats['total_tasks'] += FirestoreService._count(tasks)
+            # Flag maintained by the due date scheduler
+            stats['overdue_tasks'] += FirestoreService._count(tasks.where('due_state', '==', 'overdue'))
+            for status in TASK_STATUSES:
+                stats['status_distribution'][status] += FirestoreService._count(tasks.where('status', '==', status))
+        
+        if cache_ttl:
+            _stats_cache.set(('user', user_id), stats, ttl=cache_ttl)
+        return stats
+    
+    @staticmethod
+    def get_activity_feed(user_id: str, page_size: int = 20,
+                          cursor: Optional[str] = None) -> Tuple[List[ActivityEvent], Optional[str]]:
+        """Latest activity events of every project of a user, newest first, and the cursor of the next page.
+        
+        One ordered, limited query on the events' audience; raises ValueError for a bad cursor.
+        """
+        from google.cloud.firestore import Query
+        db = FirestoreService._get_db()
+        query = (db.collection(ACTIVITY_COLLECTION)
+                 .where('audience', 'array_contains', user_id)
+                 .order_by('created_at', direction=Query.DESCENDING)
+                 .order_by('__name__', direction=Query.DESCENDING))
+        if cursor:
+            created_at, event_id = decode_cursor(cursor, 2)
+            query = query.start_after({'created_at': created_at, '__name__': event_id})
+        query = query.limit(page_size + 1)
+        docs = FirestoreService._read('query', lambda: list(query.stream()))
+        
+        next_cursor = None
+        if len(docs) > page_size:
+            docs = docs[:page_size]
+            next_cursor = encode_cursor([docs[-1].get('created_at'), docs[-1].id])
+        return [ActivityEvent.from_doc(doc) for doc in docs], next_cursor
+    
+    @staticmethod
+    def get_project(project_id: str) -> Optional[Project]:
         """Get a specific project"""
+        if project_replicas.enabled:
+            project = project_replicas.get_project(FirestoreService._get_db(), project_id)
+            if project is not None:
+                return project
+        project = document_cache.get(('project', project_id))
+        if project is None:
+            # Not cached if a write invalidates the project while it is being read
+            generation = document_cache.generation
+            project = FirestoreService._load_project(project_id)
+            if project is None:
+                return None
+            document_cache.set(('project', project_id), project, generation=generation)
+        # Callers may modify the returned model
+        return copy.deepcopy(project)
+    
+    @staticmethod
+    def _load_project(project_id: str) -> Optional[Project]:
+        """Read a project from the shared cache, then Firestore"""
+        cached = shared_cache.get('project', project_id)
+        if cached is not None:
+            return Project(**cached)
+        stamp = shared_cache.stamp('project', project_id)
         db = FirestoreService._get_db()
-        doc = db.collection('projects').document(project_id).get()
+        doc = FirestoreService._read('read', lambda: db.collection('projects').document(project_id).get())
         if doc.exists:
-            project = doc.to_dict()
-            project['id'] = doc.id
+            project = Project.from_doc(doc)
+            shared_cache.set('project', project_id, asdict(project), stamp)
             return project
         return None
     
     @staticmethod
     def update_project(project_id: str, data: Dict) -> bool:
         """Update a project"""
+        from google.cloud.firestore import Increment
         data['updated_at'] = datetime.utcnow()
+        data['version'] = Increment(1)
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update(data)
+        project_ref = db.collection('projects').document(project_id)
+        # The invitations listed to the invited users show the project's name
+        project = FirestoreService.get_project(project_id) if 'name' in data else None
+        invited = project.pending_invites if project else []
+        
+        def update(batch):
+            batch.update(project_ref, data)
+            FirestoreService._bump_invites(db, batch, invited)
+        
+        FirestoreService._write_with_activity(db, update, 'project_updated', project_id,
+                                              project_name=data.get('name'))
+        FirestoreService._invalidate_project(project_id)
+        for uid in invited:
+            FirestoreService._invalidate_user(uid)
+        if 'members' in data or 'created_by' in data:
+            FirestoreService._invalidate_access(project_id)
         return True
     
     @staticmethod
     def delete_project(project_id: str) -> bool:
-        """Delete a project and its tasks"""
+        """Delete a project and its tasks (live and archived)"""
         db = FirestoreService._get_db()
-        tasks = db.collection('tasks').where('project_id', '==', project_id).stream()
-        for task in tasks:
-            task.reference.delete()
-        db.collection('projects').document(project_id).delete()
+        tasks = FirestoreService._read(
+            'query', lambda: list(db.collection('tasks').where('project_id', '==', project_id).stream())
+        )
+        archived = FirestoreService._read(
+            'query', lambda: list(db.collection(ARCHIVE_COLLECTION).where('project_id', '==', project_id).stream())
+        )
+        for task in tasks + archived:
+            FirestoreService._write(task.reference.delete)
+        project_ref = db.collection('projects').document(project_id)
+        board = FirestoreService._read('read', lambda: db.collection(BOARD_COLLECTION).document(project_id).get(['chunks']))
+        board_refs = [db.collection(BOARD_COLLECTION).document(chunk_id(project_id, index))
+                      for index in range((board.to_dict() or {}).get('chunks', 1) if board.exists else 0)]
+        
+        project = FirestoreService.get_project(project_id)
+        invited = project.pending_invites if project else []
+        
+        def delete(batch):
+            batch.delete(project_ref)
+            for ref in board_refs:
+                batch.delete(ref)
+            FirestoreService._bump_invites(db, batch, invited)
+        
+        FirestoreService._write_with_activity(db, delete, 'project_deleted', project_id)
+        FirestoreService._invalidate_project(project_id)
+        for uid in invited:
+            FirestoreService._invalidate_user(uid)
+        FirestoreService._invalidate_access(project_id)
+        project_replicas.drop(project_id)
+        search_index.drop(project_id)
         return True
     
     @staticmethod
@@ -70,60 +606,343 @@ class FirestoreService:
         """Create a new task"""
         data['created_at'] = datetime.utcnow()
         data['updated_at'] = datetime.utcnow()
+        data['due_state'] = due_date_scheduler.classify(to_epoch(data.get('due_date')), data.get('status', 'todo'))
+        from google.cloud import firestore
         db = FirestoreService._get_db()
-        doc_ref = db.collection('tasks').add(data)
-        return doc_ref[1].id
+        doc_ref = db.collection('tasks').document()
+        
+        @firestore.transactional
+        def commit(transaction):
+            head = FirestoreService._board_head(db, data.get('project_id'), transaction)
+            transaction.set(doc_ref, data)
+            transaction.set(*FirestoreService._activity(
+                db, 'task_created', data.get('project_id'),
+                target_id=doc_ref.id, title=data.get('title'), new_status=data.get('status', 'todo')
+            ))
+            if head:
+                for ref, card in FirestoreService._board_writes(db, data['project_id'], head,
+                                                                {doc_ref.id: card_from(data)}, count_delta=1):
+                    transaction.set(ref, card, merge=True)
+        
+        FirestoreService._write(lambda: commit(db.transaction()))
+        search_index.on_task_written(doc_ref.id, data, data.get('project_id'))
+        if data.get('project_id'):
+            FirestoreService._touch_project(db, data['project_id'])
+            if data['due_state']:
+                due_date_scheduler.request_refresh(data['project_id'])
+        return doc_ref.id
+    
+    @staticmethod
+    def create_tasks(project_id: str, tasks_data: List[Dict], chunk_size: int = 500) -> List[str]:
+        """Create many tasks of a project with chunked batch writes (the board is rebuilt on its next view)"""
+        db = FirestoreService._get_db()
+        now = datetime.utcnow()
+        task_ids = []
+        
+        # A Firestore batch accepts at most 500 writes
+        for start in range(0, len(tasks_data), chunk_size):
+            batch = db.batch()
+            for data in tasks_data[start:start + chunk_size]:
+                data['project_id'] = project_id
+                data['created_at'] = now
+                data['updated_at'] = now
+                data['due_state'] = due_date_scheduler.classify(to_epoch(data.get('due_date')),
+                                                                data.get('status', 'todo'))
+                doc_ref = db.collection('tasks').document()
+                batch.set(doc_ref, data)
+                task_ids.append(doc_ref.id)
+            # Cheaper to rebuild the board on its next view than to place each card
+            batch.set(db.collection(BOARD_COLLECTION).document(project_id), {'stale': True}, merge=True)
+            FirestoreService._write(batch.commit)
+            for task_id, data in zip(task_ids[start:], tasks_data[start:start + chunk_size]):
+                search_index.on_task_written(task_id, data, project_id)
+        
+        if task_ids:
+            # One event for the whole import rather than one per task
+            event_ref, event = FirestoreService._activity(db, 'tasks_imported', project_id, count=len(task_ids))
+            FirestoreService._write(lambda: event_ref.set(event))
+            FirestoreService._touch_project(db, project_id)
+            due_date_scheduler.request_refresh(project_id)
+        return task_ids
     
     @staticmethod
-    def get_tasks(project_id: str) -> List[Dict]:
+    def get_tasks(project_id: str) -> List[Task]:
         """Get all tasks for a project sorted by created_at descending"""
-        tasks = []
         db = FirestoreService._get_db()
-        docs = db.collection('tasks').where('project_id', '==', project_id).stream()
-        for doc in docs:
-            task = doc.to_dict()
-            task['id'] = doc.id
-            tasks.append(task)
+        tasks = project_replicas.get_tasks(db, project_id) if project_replicas.enabled else None
+        if tasks is None:
+            docs = FirestoreService._read(
+                'query', lambda: list(db.collection('tasks').where('project_id', '==', project_id).stream())
+            )
+            tasks = [Task.from_doc(doc) for doc in docs]
+        tasks = [FirestoreService._with_pending(task) for task in tasks]
         
         # Sort in Python since Firestore composite index is not available
-        tasks.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
+        tasks.sort(key=lambda x: x.created_at or 0, reverse=True)
         return tasks
     
+    @staticmethod
+    def get_board_tasks(project_id: str) -> List[Task]:
+        """Tasks of a project as shown on its board (card fields only), newest first.
+        
+        Read from the project's board read model: its first chunk, plus the
+        other ones in a single batched read for large boards. The model is
+        rebuilt from the tasks when it is missing or stale.
+        """
+        db = FirestoreService._get_db()
+        tasks = project_replicas.get_tasks(db, project_id) if project_replicas.enabled else None
+        if tasks is None:
+            boards = db.collection(BOARD_COLLECTION)
+            head = FirestoreService._read('read', lambda: boards.document(project_id).get())
+            head = head.to_dict() if head.exists else None
+            if is_usable(head):
+                refs = [boards.document(chunk_id(project_id, index)) for index in range(1, head['chunks'])]
+                chunks = FirestoreService._read('read', lambda: list(db.get_all(refs))) if refs else []
+                by_id = {doc.id: doc.to_dict() or {} for doc in chunks if doc.exists}
+                tasks = tasks_from(project_id, [head] + [by_id.get(ref.id, {}) for ref in refs])
+            else:
+                tasks = FirestoreService.rebuild_board(project_id)
+        tasks = [FirestoreService._with_pending(task) for task in tasks]
+        tasks.sort(key=lambda x: x.created_at or 0, reverse=True)
+        return tasks
+    
+    @staticmethod
+    def rebuild_board(project_id: str) -> List[Task]:
+        """Regenerate a project's board read model from its tasks; returns the board's tasks"""
+        from google.cloud import firestore
+        db = FirestoreService._get_db()
+        boards = db.collection(BOARD_COLLECTION)
+        query = db.collection('tasks').where('project_id', '==', project_id)
+        
+        @firestore.transactional
+        def rebuild(transaction):
+            # Reading the tasks in the transaction makes concurrent task writes retry after it
+            cards = {doc.id: card_from(doc.to_dict()) for doc in query.stream(transaction=transaction)}
+            old = boards.document(project_id).get(['chunks'], transaction=transaction)
+            old_chunks = (old.to_dict() or {}).get('chunks', 0) if old.exists else 0
+            chunks = [{'cards': {}} for _ in range(chunk_count(cards))]
+            for task_id, card in cards.items():
+                chunks[chunk_of(task_id, len(chunks))]['cards'][task_id] = card
+            chunks[0].update({'chunks': len(chunks), 'count': len(cards), 'stale': False,
+                              'sizes': {str(index): size_of(chunk['cards']) for index, chunk in enumerate(chunks)},
+                              'built_at': datetime.utcnow()})
+            for index, chunk in enumerate(chunks):
+                transaction.set(boards.document(chunk_id(project_id, index)), chunk)
+            for index in range(len(chunks), old_chunks):
+                transaction.delete(boards.document(chunk_id(project_id, index)))
+            return chunks
+        
+        chunks = FirestoreService._write(lambda: rebuild(db.transaction()))
+        return tasks_from(project_id, chunks)
+    
+    @staticmethod
+    def iter_tasks(project_id: str, page_size: int = 500) -> Iterator[Task]:
+        """Iterate over every task of a project, one page at a time.
+        
+        Pages are fetched with a document-id cursor, so memory use stays flat
+        however many tasks the project holds.
+        """
+        db = FirestoreService._get_db()
+        query = (db.collection('tasks')
+                 .where('project_id', '==', project_id)
+                 .order_by('__name__')
+                 .limit(page_size))
+        last_doc = None
+        while True:
+            page = query.start_after(last_doc) if last_doc else query
+            docs = FirestoreService._read('query', lambda: list(page.stream()))
+            for doc in docs:
+                yield FirestoreService._with_pending(Task.from_doc(doc))
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+    
+    @staticmethod
+    def get_tasks_updated_since(project_id: str, since: int) -> List[Task]:
+        """Tasks of a project updated at or after ``since`` (UTC epoch seconds)"""
+        db = FirestoreService._get_db()
+        query = (db.collection('tasks')
+                 .where('project_id', '==', project_id)
+                 .where('updated_at', '>=', datetime.fromtimestamp(since, timezone.utc)))
+        docs = FirestoreService._read('query', lambda: list(query.stream()))
+        return [Task.from_doc(doc) for doc in docs]
+    
+    @staticmethod
+    def count_tasks(project_id: str) -> int:
+        """Number of tasks of a project (count() aggregation)"""
+        db = FirestoreService._get_db()
+        return FirestoreService._count(db.collection('tasks').where('project_id', '==', project_id))
+    
+    @staticmethod
+    def get_recent_tasks(project_id: str, limit: int = 5) -> List[Task]:
+        """Get the most recently updated tasks of a project (ordered + limited in Firestore)"""
+        from google.cloud.firestore import Query
+        # Ordering depends on updated_at, so write buffered moves first
+        task_write_buffer.flush_group(project_id)
+        db = FirestoreService._get_db()
+        query = (db.collection('tasks')
+                 .where('project_id', '==', project_id)
+                 .order_by('updated_at', direction=Query.DESCENDING)
+                 .limit(limit))
+        docs = FirestoreService._read('query', lambda: list(query.stream()))
+        return [Task.from_doc(doc) for doc in docs]
+    
+    @staticmethod
+    def get_task_completion_stats(project_id: str) -> Dict:
+        """Get task completion statistics of a project from count() aggregations"""
+        # Counts are computed server-side, so write buffered moves first
+        task_write_buffer.flush_group(project_id)
+        db = FirestoreService._get_db()
+        project_tasks = db.collection('tasks').where('project_id', '==', project_id)
+        # Archived tasks were all completed: they are counted from the project
+        project = FirestoreService.get_project(project_id)
+        archived_tasks = project.archived_count if project else 0
+        total_tasks = FirestoreService._count(project_tasks) + archived_tasks
+        completed_tasks = FirestoreService._count(project_tasks.where('status', '==', 'done')) + archived_tasks
+        completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        
+        return {
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'completion_percentage': round(completion_percentage, 1),
+            'pending_tasks': total_tasks - completed_tasks
+        }
+    
     @staticmethod
     def update_task(task_id: str, data: Dict) -> bool:
         """Update a task"""
+        # A direct write supersedes (and absorbs) any buffered move of the task
+        pending = task_write_buffer.discard(task_id)
+        project_id = None
+        if pending:
+            data = {**pending['data'], **data}
+            project_id = pending['group']
+        FirestoreService._write_task(task_id, data, project_id)
+        return True
+    
+    @staticmethod
+    def _write_task(task_id: str, data: Dict, project_id: Optional[str] = None):
+        """Write a task update (with its activity event and board card) and bump its project's version"""
         data['updated_at'] = datetime.utcnow()
+        deadline_changed = 'due_date' in data or 'status' in data
+        if 'due_date' in data:
+            data['reminder_sent'] = False
+        if 'status' in data and ('due_date' in data or data['status'] == 'done'):
+            data['due_state'] = due_date_scheduler.classify(to_epoch(data.get('due_date')), data['status'])
+        actor = data.get('updated_by') or get_actor()
+        if actor:
+            data['updated_by'] = actor
+        from google.cloud import firestore
         db = FirestoreService._get_db()
-        db.collection('tasks').document(task_id).update(data)
+        task_ref = db.collection('tasks').document(task_id)
+        
+        @firestore.transactional
+        def commit(transaction):
+            # Previous status (and title, project) for the activity event
+            before = task_ref.get(['project_id', 'status', 'title'], transaction=transaction)
+            before = before.to_dict() if before.exists else {}
+            task_project_id = project_id or data.get('project_id') or before.get('project_id')
+            head = FirestoreService._board_head(db, task_project_id, transaction)
+            moved = 'status' in data and data['status'] != before.get('status')
+            transaction.update(task_ref, data)
+            transaction.set(*FirestoreService._activity(
+                db, 'task_moved' if moved else 'task_updated', task_project_id,
+                actor=actor, target_id=task_id, title=data.get('title') or before.get('title'),
+                old_status=before.get('status') if moved else None, new_status=data['status'] if moved else None
+            ))
+            if head:
+                for ref, card in FirestoreService._board_writes(db, task_project_id, head,
+                                                                {task_id: card_from(data)}):
+                    transaction.set(ref, card, merge=True)
+            return task_project_id
+        
+        project_id = FirestoreService._write(lambda: commit(db.transaction()))
+        search_index.on_task_written(task_id, data, project_id)
+        if project_id:
+            FirestoreService._touch_project(db, project_id)
+            if deadline_changed:
+                # Project counts (and the flag, when only one field was written)
+                due_date_scheduler.request_refresh(project_id)
+    
+    @staticmethod
+    def queue_task_update(task_id: str, data: Dict) -> bool:
+        """Buffer a task update so that rapid successive updates are coalesced.
+        
+        Used for drag-and-drop moves: only the last state within the buffer
+        window is written. Reads of the task see the pending state.
+        """
+        if task_write_buffer.delay <= 0:
+            return FirestoreService.update_task(task_id, data)
+        
+        project_id = FirestoreService.get_task_project_id(task_id)
+        # The buffered write runs outside the request: keep who made the move
+        if get_actor():
+            data = {**data, 'updated_by': get_actor()}
+        task_write_buffer.submit(task_id, data, group=project_id)
         return True
     
+    @staticmethod
+    def _with_pending(task: Task) -> Task:
+        """Overlay the buffered (not yet written) update of a task"""
+        pending = task_write_buffer.peek(task.id)
+        return task.apply_update(pending) if pending else task
+    
     @staticmethod
     def delete_task(task_id: str) -> bool:
         """Delete a task"""
+        from google.cloud import firestore
+        task_write_buffer.discard(task_id)
         db = FirestoreService._get_db()
-        db.collection('tasks').document(task_id).delete()
+        task_ref = db.collection('tasks').document(task_id)
+        
+        @firestore.transactional
+        def commit(transaction):
+            before = task_ref.get(['project_id', 'status', 'title'], transaction=transaction)
+            before = before.to_dict() if before.exists else {}
+            project_id = before.get('project_id')
+            head = FirestoreService._board_head(db, project_id, transaction)
+            transaction.delete(task_ref)
+            transaction.set(*FirestoreService._activity(
+                db, 'task_deleted', project_id,
+                target_id=task_id, title=before.get('title'), old_status=before.get('status')
+            ))
+            if head:
+                for ref, card in FirestoreService._board_writes(db, project_id, head, {task_id: None},
+                                                                count_delta=-1):
+                    transaction.set(ref, card, merge=True)
+            return project_id
+        
+        project_id = FirestoreService._write(lambda: commit(db.transaction()))
+        search_index.on_task_deleted(task_id)
+        if project_id:
+            FirestoreService._touch_project(db, project_id)
+            due_date_scheduler.request_refresh(project_id)
         return True
     
     @staticmethod
-    def find_project_by_access_code(access_code: str) -> Optional[Dict]:
+    def find_project_by_access_code(access_code: str) -> Optional[Project]:
         """Find project by access code"""
         db = FirestoreService._get_db()
-        docs = db.collection('projects').where('access_code', '==', access_code).limit(1).stream()
+        docs = FirestoreService._read(
+            'query', lambda: list(db.collection('projects').where('access_code', '==', access_code).limit(1).stream())
+        )
         for doc in docs:
-            project = doc.to_dict()
-            project['id'] = doc.id
-            return project
+            return Project.from_doc(doc)
         return None
     
     @staticmethod
     def add_member_to_project(project_id: str, user_id: str) -> bool:
         """Add user to project members"""
-        from google.cloud.firestore import ArrayUnion
+        from google.cloud.firestore import ArrayUnion, Increment
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
+        project_ref = db.collection('projects').document(project_id)
+        FirestoreService._write_with_activity(db, lambda batch: batch.update(project_ref, {
             'members': ArrayUnion([user_id]),
-            'updated_at': datetime.utcnow()
-        })
+            'updated_at': datetime.utcnow(),
+            'version': Increment(1)
+        }), 'member_joined', project_id, **FirestoreService._joining(project_id, user_id))
+        FirestoreService._invalidate_project(project_id)
+        FirestoreService._invalidate_access(project_id)
         return True
     
     @staticmethod
@@ -141,16 +960,35 @@ class FirestoreService:
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
-        db.collection('users').document(uid).set(user_data)
+        FirestoreService._write(lambda: db.collection('users').document(uid).set(user_data))
+        FirestoreService._invalidate_user(uid)
         return True
     
     @staticmethod
     def get_user_profile(uid: str) -> Optional[Dict]:
         """Get user profile from Firestore"""
+        profile = document_cache.get(('user', uid))
+        if profile is None:
+            generation = document_cache.generation
+            profile = FirestoreService._load_user_profile(uid)
+            if profile is None:
+                return None
+            document_cache.set(('user', uid), profile, generation=generation)
+        return copy.deepcopy(profile)
+    
+    @staticmethod
+    def _load_user_profile(uid: str) -> Optional[Dict]:
+        """Read a user profile from the shared cache, then Firestore"""
+        cached = shared_cache.get('user', uid)
+        if cached is not None:
+            return cached
+        stamp = shared_cache.stamp('user', uid)
         db = FirestoreService._get_db()
-        doc = db.collection('users').document(uid).get()
+        doc = FirestoreService._read('read', lambda: db.collection('users').document(uid).get())
         if doc.exists:
-            return doc.to_dict()
+            profile = doc.to_dict()
+            shared_cache.set('user', uid, profile, stamp)
+            return profile
         return None
     
     @staticmethod
@@ -158,88 +996,240 @@ class FirestoreService:
         """Update user profile in Firestore"""
         db = FirestoreService._get_db()
         data['updated_at'] = datetime.utcnow()
-        db.collection('users').document(uid).update(data)
+        FirestoreService._write(lambda: db.collection('users').document(uid).update(data))
+        FirestoreService._invalidate_user(uid)
         return True
     
     @staticmethod
     def add_invitation_to_project(project_id: str, email: str) -> bool:
         """Ajouter une invitation à un projet"""
-        from google.cloud.firestore import ArrayUnion
+        from google.cloud.firestore import ArrayUnion, Increment
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
+        project_ref = db.collection('projects').document(project_id)
+        FirestoreService._write_with_activity(db, lambda batch: batch.update(project_ref, {
             'invitations': ArrayUnion([email]),
-            'updated_at': datetime.utcnow()
-        })
+            'updated_at': datetime.utcnow(),
+            'version': Increment(1)
+        }), 'member_invited', project_id)
+        FirestoreService._invalidate_project(project_id)
         return True
     
     @staticmethod
-    def get_user_invitations(email: str) -> List[Dict]:
+    def get_user_invitations(email: str) -> List[Project]:
         """Récupérer les invitations d'un utilisateur"""
         db = FirestoreService._get_db()
-        docs = db.collection('projects').where('invitations', 'array_contains', email).stream()
-        return [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        docs = FirestoreService._read(
+            'query', lambda: list(db.collection('projects').where('invitations', 'array_contains', email).stream())
+        )
+        return [Project.from_doc(doc) for doc in docs]
     
     @staticmethod
     def join_project_with_code(project_id: str, user_id: str, access_code: str) -> Dict:
         """Join project using access code - adds user to members array"""
-        from google.cloud.firestore import ArrayUnion
+        from google.cloud.firestore import ArrayUnion, Increment
         
         project = FirestoreService.get_project(project_id)
         if not project:
             return {'success': False, 'message': 'Project not found'}
         
         # Verify access code
-        if project.get('access_code') != access_code:
+        if project.access_code != access_code:
             return {'success': False, 'message': 'Invalid access code'}
         
         # Check if already a member
-        if user_id in project.get('members', []):
+        if user_id in project.members:
             return {'success': True, 'message': 'Already a member', 'already_member': True}
         
         # Add user to members array using arrayUnion
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
+        project_ref = db.collection('projects').document(project_id)
+        FirestoreService._write_with_activity(db, lambda batch: batch.update(project_ref, {
             'members': ArrayUnion([user_id]),
-            'updated_at': datetime.utcnow()
-        })
+            'updated_at': datetime.utcnow(),
+            'version': Increment(1)
+        }), 'member_joined', project_id, audience=project.members + [user_id], project_name=project.name,
+            actor=user_id)
+        FirestoreService._invalidate_project(project_id)
+        FirestoreService._invalidate_access(project_id)
         
         return {'success': True, 'message': 'Successfully joined project'}
     
     @staticmethod
-    def get_dashboard_stats() -> Dict:
-        """Get dashboard statistics"""
+    def get_archivable_tasks(cutoff: datetime, project_id: Optional[str] = None, limit: int = 200) -> List[Task]:
+        """Completed tasks last updated before ``cutoff`` (of one project, or all), at most ``limit``"""
         db = FirestoreService._get_db()
-        projects = list(db.collection('projects').stream())
-        tasks = list(db.collection('tasks').stream())
+        tasks = db.collection('tasks')
+        if project_id:
+            tasks = tasks.where('project_id', '==', project_id)
+        query = tasks.where('status', '==', 'done').where('updated_at', '<', cutoff).limit(limit)
+        docs = FirestoreService._read('query', lambda: list(query.stream()))
+        return [Task.from_doc(doc) for doc in docs]
+    
+    @staticmethod
+    def archive_tasks(project_id: str, task_ids: List[str], cutoff: datetime) -> int:
+        """Move completed tasks of a project to the archive in one transaction; returns how many moved.
+        
+        The project's ``archived_count`` keeps them in its totals, so tasks
+        without a project (which would drop out of them) are not archived.
+        """
+        from google.cloud import firestore
+        from google.cloud.firestore import Increment
+        if not project_id:
+            return 0
+        db = FirestoreService._get_db()
+        archive = db.collection(ARCHIVE_COLLECTION)
+        # A task with a buffered move is being worked on
+        refs = [db.collection('tasks').document(task_id) for task_id in task_ids
+                if task_write_buffer.peek(task_id) is None]
+        
+        @firestore.transactional
+        def move(transaction):
+            snapshots = list(transaction.get_all(refs))
+            head = FirestoreService._board_head(db, project_id, transaction)
+            now = datetime.utcnow()
+            moved = []
+            for snapshot in snapshots:
+                data = snapshot.to_dict() if snapshot.exists else None
+                # Re-checked: the task may have been reopened or edited since it was selected
+                if not data or data.get('status') != 'done' or to_epoch(data.get('updated_at')) >= to_epoch(cutoff):
+                    continue
+                transaction.set(archive.document(snapshot.id), {**data, 'archived_at': now})
+                transaction.delete(snapshot.reference)
+                moved.append(snapshot.id)
+            if moved:
+                if head:
+                    for ref, card in FirestoreService._board_writes(db, project_id, head,
+                                                                    dict.fromkeys(moved), count_delta=-len(moved)):
+                        transaction.set(ref, card, merge=True)
+                transaction.update(db.collection('projects').document(project_id), {
+                    'archived_count': Increment(len(moved)),
+                    'version': Increment(1)
+                })
+            return moved
         
-        total_projects = len(projects)
-        total_tasks = len(tasks)
+        moved = FirestoreService._write(lambda: move(db.transaction())) if refs else []
+        for task_id in moved:
+            search_index.on_task_deleted(task_id)
+        if moved:
+            FirestoreService._invalidate_project(project_id)
+        return len(moved)
+    
+    @staticmethod
+    def get_archived_tasks(project_id: str, page_size: int = 50,
+                           cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """One page of a project's archived tasks, most recently archived first, and the next page's cursor.
         
-        # Task status distribution
-        status_counts = {'todo': 0, 'in_progress': 0, 'done': 0}
-        overdue_tasks = 0
+        Raises ValueError for a bad cursor.
+        """
+        from google.cloud.firestore import Query
+        db = FirestoreService._get_db()
+        query = (db.collection(ARCHIVE_COLLECTION)
+                 .where('project_id', '==', project_id)
+                 .order_by('archived_at', direction=Query.DESCENDING)
+                 .order_by('__name__', direction=Query.DESCENDING))
+        if cursor:
+            archived_at, task_id = decode_cursor(cursor, 2)
+            query = query.start_after({'archived_at': archived_at, '__name__': task_id})
+        # One extra document tells whether there is a next page
+        docs = FirestoreService._read('query', lambda: list(query.limit(page_size + 1).stream()))
+        next_cursor = None
+        if len(docs) > page_size:
+            docs = docs[:page_size]
+            next_cursor = encode_cursor([docs[-1].get('archived_at'), docs[-1].id])
+        return [Task.from_doc(doc) for doc in docs], next_cursor
+    
+    @staticmethod
+    def get_due_date_candidates(horizon: datetime, project_id: Optional[str] = None) -> List[Task]:
+        """Tasks whose deadline flag may need to change: open tasks due before
+        ``horizon`` and tasks currently flagged (of one project, or all)"""
+        db = FirestoreService._get_db()
+        tasks = db.collection('tasks')
+        if project_id:
+            tasks = tasks.where('project_id', '==', project_id)
+        open_statuses = [status for status in TASK_STATUSES if status != 'done']
+        due = tasks.where('status', 'in', open_statuses).where('due_date', '<', horizon)
+        flagged = tasks.where('due_state', 'in', list(DUE_STATES))
+        candidates = {}
+        for query in (due, flagged):
+            for doc in FirestoreService._read('query', lambda: list(query.stream())):
+                candidates[doc.id] = Task.from_doc(doc)
+        return list(candidates.values())
+    
+    @staticmethod
+    def update_due_states(project_id: str, states: Dict[str, Optional[str]], overdue_count: int,
+                          due_soon_count: int, chunk_size: int = 500) -> bool:
+        """Write recomputed task deadline flags and the project's counts"""
+        from google.cloud import firestore
+        from google.cloud.firestore import Increment
+        db = FirestoreService._get_db()
+        items = list(states.items())
         
-        for task in tasks:
-            task_data = task.to_dict()
-            status = task_data.get('status', 'todo')
-            status_counts[status] += 1
-            
-            # Check if task is overdue
-            due_date = task_data.get('due_date')
-            if due_date and status != 'done':
-                # Handle timezone comparison
-                now = datetime.utcnow()
-                if hasattr(due_date, 'replace'):
-                    due_date = due_date.replace(tzinfo=None) if due_date.tzinfo else due_date
-                if due_date < now:
-                    overdue_tasks += 1
+        @firestore.transactional
+        def commit(transaction, chunk):
+            head = FirestoreService._board_head(db, project_id, transaction)
+            for task_id, state in chunk:
+                transaction.update(db.collection('tasks').document(task_id), {'due_state': state})
+            if head:
+                cards = {task_id: {'due_state': state} for task_id, state in chunk}
+                for ref, card in FirestoreService._board_writes(db, project_id, head, cards):
+                    transaction.set(ref, card, merge=True)
         
-        return {
-            'total_projects': total_projects,
-            'total_tasks': total_tasks,
-            'overdue_tasks': overdue_tasks,
-            'status_distribution': status_counts
-        }
+        # Leave room in each commit for the writes to the board chunks
+        head = FirestoreService._board_head(db, project_id)
+        step = max(1, chunk_size - (head['chunks'] if head else 0))
+        for start in range(0, len(items), step):
+            chunk = items[start:start + step]
+            FirestoreService._write(lambda: commit(db.transaction(), chunk))
+        FirestoreService._write(lambda: db.collection('projects').document(project_id).update({
+            'overdue_count': overdue_count,
+            'due_soon_count': due_soon_count,
+            'version': Increment(1)
+        }))
+        FirestoreService._invalidate_project(project_id)
+        return True
+    
+    @staticmethod
+    def mark_reminders_sent(task_ids, chunk_size: int = 500) -> bool:
+        """Record that the due-soon reminder of these tasks went out"""
+        db = FirestoreService._get_db()
+        task_ids = list(task_ids)
+        for start in range(0, len(task_ids), chunk_size):
+            batch = db.batch()
+            for task_id in task_ids[start:start + chunk_size]:
+                batch.update(db.collection('tasks').document(task_id), {'reminder_sent': True})
+            FirestoreService._write(batch.commit)
+        return True
+    
+    @staticmethod
+    def acquire_lease(name: str, owner: str, ttl: float) -> bool:
+        """Take or renew a named lease, so that only one worker runs a periodic job"""
+        from google.cloud import firestore
+        db = FirestoreService._get_db()
+        lease_ref = db.collection('leases').document(name)
+        
+        @firestore.transactional
+        def claim(transaction):
+            snapshot = lease_ref.get(transaction=transaction)
+            lease = snapshot.to_dict() if snapshot.exists else None
+            now = datetime.now(timezone.utc)
+            if lease and lease.get('owner') != owner and lease.get('expires_at') and lease['expires_at'] > now:
+                return False
+            transaction.set(lease_ref, {'owner': owner, 'expires_at': now + timedelta(seconds=ttl)})
+            return True
+        
+        return FirestoreService._write(lambda: claim(db.transaction()))
+    
+    @staticmethod
+    def _count(query) -> int:
+        """Run a server-side count() aggregation for a query"""
+        result = FirestoreService._read('aggregate', query.count().get)
+        return int(result[0][0].value)
+    
+    @staticmethod
+    def _sum(query, field: str) -> int:
+        """Run a server-side sum() aggregation of a numeric field for a query"""
+        result = FirestoreService._read('aggregate', query.sum(field).get)
+        return int(result[0][0].value or 0)
     
     @staticmethod
     def get_users_by_ids(user_id_list: List[str]) -> List[Dict]:
@@ -247,13 +1237,11 @@ class FirestoreService:
         if not user_id_list:
             return []
         
-        db = FirestoreService._get_db()
         users_data = []
         
         for user_id in user_id_list:
-            user_doc = db.collection('users').document(user_id).get()
-            if user_doc.exists:
-                user_data = user_doc.to_dict()
+            user_data = FirestoreService.get_user_profile(user_id)
+            if user_data:
                 users_data.append({
                     'uid': user_id,
                     'username': user_data.get('username', 'Utilisateur'),
@@ -277,7 +1265,9 @@ class FirestoreService:
     def find_user_by_email(email: str) -> Optional[Dict]:
         """Find user by email address"""
         db = FirestoreService._get_db()
-        docs = db.collection('users').where('email', '==', email).limit(1).stream()
+        docs = FirestoreService._read(
+            'query', lambda: list(db.collection('users').where('email', '==', email).limit(1).stream())
+        )
         for doc in docs:
             user_data = doc.to_dict()
             user_data['uid'] = doc.id
@@ -287,40 +1277,80 @@ class FirestoreService:
     @staticmethod
     def add_pending_invite(project_id: str, user_id: str) -> bool:
         """Add user to project pending invites"""
-        from google.cloud.firestore import ArrayUnion
+        from google.cloud.firestore import ArrayUnion, Increment
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
-            'pending_invites': ArrayUnion([user_id]),
-            'updated_at': datetime.utcnow()
-        })
+        project_ref = db.collection('projects').document(project_id)
+        
+        def invite(batch):
+            batch.update(project_ref, {
+                'pending_invites': ArrayUnion([user_id]),
+                'updated_at': datetime.utcnow(),
+                'version': Increment(1)
+            })
+            FirestoreService._bump_invites(db, batch, [user_id])
+        
+        FirestoreService._write_with_activity(db, invite, 'member_invited', project_id, target_id=user_id)
+        FirestoreService._invalidate_project(project_id)
+        FirestoreService._invalidate_user(user_id)
         return True
     
     @staticmethod
     def accept_invitation(project_id: str, user_id: str) -> bool:
         """Accept invitation - move from pending to members"""
-        from google.cloud.firestore import ArrayUnion, ArrayRemove
+        from google.cloud.firestore import ArrayUnion, ArrayRemove, Increment
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
-            'pending_invites': ArrayRemove([user_id]),
-            'members': ArrayUnion([user_id]),
-            'updated_at': datetime.utcnow()
-        })
+        project_ref = db.collection('projects').document(project_id)
+        
+        def accept(batch):
+            batch.update(project_ref, {
+                'pending_invites': ArrayRemove([user_id]),
+                'members': ArrayUnion([user_id]),
+                'updated_at': datetime.utcnow(),
+                'version': Increment(1)
+            })
+            FirestoreService._bump_invites(db, batch, [user_id])
+        
+        FirestoreService._write_with_activity(db, accept, 'member_joined', project_id,
+                                              **FirestoreService._joining(project_id, user_id))
+        FirestoreService._invalidate_project(project_id)
+        FirestoreService._invalidate_access(project_id)
+        FirestoreService._invalidate_user(user_id)
         return True
     
     @staticmethod
     def decline_invitation(project_id: str, user_id: str) -> bool:
         """Decline invitation - remove from pending invites"""
-        from google.cloud.firestore import ArrayRemove
+        from google.cloud.firestore import ArrayRemove, Increment
         db = FirestoreService._get_db()
-        db.collection('projects').document(project_id).update({
-            'pending_invites': ArrayRemove([user_id]),
-            'updated_at': datetime.utcnow()
-        })
+        project_ref = db.collection('projects').document(project_id)
+        
+        def decline(batch):
+            batch.update(project_ref, {
+                'pending_invites': ArrayRemove([user_id]),
+                'updated_at': datetime.utcnow(),
+                'version': Increment(1)
+            })
+            FirestoreService._bump_invites(db, batch, [user_id])
+        
+        FirestoreService._write_with_activity(db, decline, 'invitation_declined', project_id, actor=user_id)
+        FirestoreService._invalidate_project(project_id)
+        FirestoreService._invalidate_user(user_id)
         return True
     
     @staticmethod
-    def get_user_pending_invites(user_id: str) -> List[Dict]:
+    def get_user_pending_invites(user_id: str) -> List[Project]:
         """Get projects where user has pending invites"""
         db = FirestoreService._get_db()
-        docs = db.collection('projects').where('pending_invites', 'array_contains', user_id).stream()
-        return [{'id': doc.id, **doc.to_dict()} for doc in docs]
\ No newline at end of file
+        docs = FirestoreService._read(
+            'query', lambda: list(db.collection('projects').where('pending_invites', 'array_contains', user_id).stream())
+        )
+        return [Project.from_doc(doc) for doc in docs]
+
+
+# Write-behind buffer for drag-and-drop moves, flushed on interpreter exit;
+# only throttled or transient failures are retried (a deleted task is not)
+task_write_buffer = WriteBuffer(
+    writer=lambda task_id, data, project_id: FirestoreService._write_task(task_id, data, project_id),
+    retry_on=(ServiceUnavailableError,) + TRANSIENT_ERRORS
+)
+atexit.register(task_write_buffer.flush_all)
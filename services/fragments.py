@@ -0,0 +1,46 @@
+import sys
+
+from flask import current_app, session
+from markupsafe import Markup
+from typing import Callable, Dict, List
+
+from services.cache import LRUCache
+
+
+def init_fragment_cache(app):
+    """Attach the rendered-fragment cache to the application"""
+    app.extensions['fragment_cache'] = LRUCache(
+        max_bytes=app.config['FRAGMENT_CACHE_MAX_BYTES'],
+        sizeof=lambda fragments: sum(sys.getsizeof(f) for f in fragments)
+    )
+
+
+def get_fragment_cache() -> LRUCache:
+    """Fragment cache of the current application"""
+    return current_app.extensions['fragment_cache']
+
+
+def current_locale() -> str:
+    """Locale the page is rendered in"""
+    return session.get('locale') or current_app.config['DEFAULT_LOCALE']
+
+
+def render_fragments(key: tuple, build_context: Callable[[], Dict], *template_names: str) -> List[Markup]:
+    """Render project-specific template fragments, reusing cached HTML.
+
+    ``key`` must capture everything the fragments depend on (typically the
+    project id and version stamp); the locale is appended automatically.
+    ``build_context`` is only called on a miss, so callers can defer the
+    data loading needed by the fragments. Fragments are shared by every user,
+    so they are rendered from that context alone: no context processor runs
+    (they would add per-user data, and inject_notifications a query).
+    """
+    cache = get_fragment_cache()
+    key = key + (current_locale(),) + template_names
+    fragments = cache.get(key)
+    if fragments is None:
+        context = build_context()
+        env = current_app.jinja_env
+        fragments = tuple(Markup(env.get_template(name).render(**context)) for name in template_names)
+        cache.set(key, fragments)
+    return list(fragments)
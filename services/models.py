@@ -0,0 +1,171 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+TIMESTAMP_FIELDS = ('due_date', 'deadline', 'created_at', 'updated_at')
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Normalize a Firestore timestamp, datetime or ISO string to UTC epoch seconds.
+
+    Naive datetimes are treated as UTC, which is how the service writes them
+    (``datetime.utcnow()``). Empty or unparseable values become ``None``.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    if hasattr(value, 'seconds'):
+        return int(value.seconds)
+    if isinstance(value, str):
+        try:
+            return to_epoch(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        except ValueError:
+            return None
+    return None
+
+
+def epoch_to_datetime(value: Optional[int]) -> Optional[datetime]:
+    """Convert UTC epoch seconds back to an aware datetime"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+@dataclass(slots=True)
+class Task:
+    """A task as used by routes and templates, timestamps in UTC epoch seconds"""
+    id: str
+    project_id: Optional[str] = None
+    title: str = ''
+    description: str = ''
+    status: str = 'todo'
+    priority: Optional[str] = None
+    assignee: str = ''
+    due_date: Optional[int] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    due_state: Optional[str] = None
+    reminder_sent: bool = False
+
+    @classmethod
+    def from_dict(cls, task_id: str, data: Dict) -> 'Task':
+        """Build a task from a Firestore document dictionary"""
+        return cls(
+            id=task_id,
+            project_id=data.get('project_id'),
+            title=data.get('title') or '',
+            description=data.get('description') or '',
+            status=data.get('status') or 'todo',
+            priority=data.get('priority'),
+            assignee=data.get('assignee') or '',
+            due_date=to_epoch(data.get('due_date')),
+            created_at=to_epoch(data.get('created_at')),
+            updated_at=to_epoch(data.get('updated_at')),
+            due_state=data.get('due_state'),
+            reminder_sent=bool(data.get('reminder_sent'))
+        )
+
+    @classmethod
+    def from_doc(cls, doc) -> 'Task':
+        """Build a task from a Firestore document snapshot"""
+        return cls.from_dict(doc.id, doc.to_dict())
+
+    def apply_update(self, data: Dict) -> 'Task':
+        """Apply a partial update in Firestore form (e.g. a buffered write) in place"""
+        for name, value in data.items():
+            if name in TIMESTAMP_FIELDS:
+                value = to_epoch(value)
+            if name in self.__slots__:
+                setattr(self, name, value)
+        return self
+
+
+@dataclass(slots=True)
+class Project:
+    """A project as used by routes and templates, timestamps in UTC epoch seconds"""
+    id: str
+    name: str = ''
+    description: str = ''
+    status: Optional[str] = None
+    access_code: str = ''
+    created_by: Optional[str] = None
+    members: List[str] = field(default_factory=list)
+    pending_invites: List[str] = field(default_factory=list)
+    invitations: List[str] = field(default_factory=list)
+    deadline: Optional[int] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    version: int = 0
+    overdue_count: int = 0
+    due_soon_count: int = 0
+    archived_count: int = 0
+
+    @classmethod
+    def from_dict(cls, project_id: str, data: Dict) -> 'Project':
+        """Build a project from a Firestore document dictionary"""
+        return cls(
+            id=project_id,
+            name=data.get('name') or '',
+            description=data.get('description') or '',
+            status=data.get('status'),
+            access_code=data.get('access_code') or '',
+            created_by=data.get('created_by'),
+            members=list(data.get('members') or []),
+            pending_invites=list(data.get('pending_invites') or []),
+            invitations=list(data.get('invitations') or []),
+            deadline=to_epoch(data.get('deadline')),
+            created_at=to_epoch(data.get('created_at')),
+            updated_at=to_epoch(data.get('updated_at')),
+            version=data.get('version') or 0,
+            overdue_count=data.get('overdue_count') or 0,
+            due_soon_count=data.get('due_soon_count') or 0,
+            archived_count=data.get('archived_count') or 0
+        )
+
+    @classmethod
+    def from_doc(cls, doc) -> 'Project':
+        """Build a project from a Firestore document snapshot"""
+        return cls.from_dict(doc.id, doc.to_dict())
+
+
+@dataclass(slots=True)
+class ActivityEvent:
+    """An entry of the activity log, timestamps in UTC epoch seconds"""
+    id: str
+    action: str = ''
+    project_id: Optional[str] = None
+    project_name: str = ''
+    actor: Optional[str] = None
+    target_id: Optional[str] = None
+    title: str = ''
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    count: Optional[int] = None
+    created_at: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, event_id: str, data: Dict) -> 'ActivityEvent':
+        """Build an event from a Firestore document dictionary"""
+        return cls(
+            id=event_id,
+            action=data.get('action') or '',
+            project_id=data.get('project_id'),
+            project_name=data.get('project_name') or '',
+            actor=data.get('actor'),
+            target_id=data.get('target_id'),
+            title=data.get('title') or '',
+            old_status=data.get('old_status'),
+            new_status=data.get('new_status'),
+            count=data.get('count'),
+            created_at=to_epoch(data.get('created_at'))
+        )
+
+    @classmethod
+    def from_doc(cls, doc) -> 'ActivityEvent':
+        """Build an event from a Firestore document snapshot"""
+        return cls.from_dict(doc.id, doc.to_dict())
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+from typing import List
+
+
+def encode_cursor(values: List) -> str:
+    """Opaque, URL-safe page cursor from the sort values of the last item of a page"""
+    def default(obj):
+        if isinstance(obj, datetime):
+            # Full precision: a truncated timestamp would skip or repeat items
+            return {'__datetime__': obj.isoformat()}
+        raise TypeError(f"Cannot encode cursor value of type {type(obj).__name__}")
+    raw = json.dumps(values, default=default, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, length: int) -> List:
+    """Sort values of a cursor built by ``encode_cursor``; ValueError if it is malformed"""
+    def object_hook(obj):
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        return obj
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw, object_hook=object_hook)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,194 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from services.models import Project, Task
+
+logger = logging.getLogger(__name__)
+
+# How long a local write may keep a replica from serving while the listener catches up
+DIRTY_GRACE_SECONDS = 2.0
+
+
+class ProjectReplica:
+    """Live in-memory copy of one project document and its tasks"""
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.project: Optional[Project] = None
+        self.tasks: Dict[str, Task] = {}
+        self.project_synced = False
+        self.tasks_synced = False
+        self.synced_at = 0.0
+        self.dirty_since = 0.0
+        self.last_access = time.monotonic()
+        self.watches = []
+        self.lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        # After a local write, wait for a snapshot that includes it (the
+        # snapshot may also have arrived just before the write was recorded)
+        caught_up = (self.synced_at >= self.dirty_since or
+                     time.monotonic() - self.dirty_since > DIRTY_GRACE_SECONDS)
+        return self.project_synced and self.tasks_synced and caught_up
+
+    def on_project_snapshot(self, docs, changes, read_time):
+        with self.lock:
+            doc = docs[0] if docs else None
+            self.project = Project.from_doc(doc) if doc is not None and doc.exists else None
+            self.project_synced = True
+            self.synced_at = time.monotonic()
+
+    def on_tasks_snapshot(self, docs, changes, read_time):
+        with self.lock:
+            for change in changes:
+                if change.type.name == 'REMOVED':
+                    self.tasks.pop(change.document.id, None)
+                else:
+                    self.tasks[change.document.id] = Task.from_doc(change.document)
+            self.tasks_synced = True
+            self.synced_at = time.monotonic()
+
+    def is_alive(self) -> bool:
+        return all(getattr(watch, 'is_active', True) for watch in self.watches)
+
+    def close(self):
+        for watch in self.watches:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logger.warning("Error closing snapshot listener for project %s: %s", self.project_id, e)
+        self.watches = []
+
+
+class ReplicaManager:
+    """Per-worker replicas of the projects being viewed, kept current by Firestore snapshot listeners.
+
+    A project is replicated on first access; until its listeners deliver the
+    initial snapshots (and after a local write, until they deliver the next
+    one) reads return None and callers fall back to a normal query. Replicas
+    idle for ``idle_seconds`` are closed, and the least recently used ones are
+    closed when more than ``max_projects`` replicas or ``max_tasks`` tasks
+    are held.
+    """
+
+    def __init__(self, max_projects: int = 0, max_tasks: int = 20000, idle_seconds: float = 300):
+        self.max_projects = max_projects
+        self.max_tasks = max_tasks
+        self.idle_seconds = idle_seconds
+        self._replicas = OrderedDict()
+        self._oversized = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_projects > 0
+
+    def get_project(self, db, project_id: str) -> Optional[Project]:
+        """Replicated project (a copy), or None if it is not available from memory"""
+        replica = self._acquire(db, project_id)
+        if replica is None:
+            return None
+        with replica.lock:
+            return copy.deepcopy(replica.project)
+
+    def get_tasks(self, db, project_id: str) -> Optional[List[Task]]:
+        """Replicated tasks of a project (copies), or None if they are not available from memory"""
+        replica = self._acquire(db, project_id)
+        if replica is None:
+            return None
+        with replica.lock:
+            return [copy.copy(task) for task in replica.tasks.values()]
+
+    def mark_dirty(self, project_id: str):
+        """Record a local write so reads wait for the listener to deliver it"""
+        replica = self._replicas.get(project_id)
+        if replica is not None:
+            replica.dirty_since = time.monotonic()
+
+    def drop(self, project_id: str):
+        """Stop replicating a project"""
+        with self._lock:
+            replica = self._replicas.pop(project_id, None)
+        if replica is not None:
+            replica.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            replicas = list(self._replicas.values())
+        lookups = self.hits + self.misses
+        return {
+            'projects': len(replicas),
+            'tasks': sum(len(replica.tasks) for replica in replicas),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+    def _acquire(self, db, project_id: str) -> Optional[ProjectReplica]:
+        if not self.enabled:
+            return None
+        self._evict()
+        with self._lock:
+            replica = self._replicas.get(project_id)
+            if replica is not None:
+                self._replicas.move_to_end(project_id)
+                replica.last_access = time.monotonic()
+        if replica is None:
+            if project_id not in self._oversized:
+                self._start(db, project_id)
+                self._evict()
+            self.misses += 1
+            return None
+        if not replica.is_alive():
+            self.drop(project_id)
+            self.misses += 1
+            return None
+        if not replica.ready:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return replica
+
+    def _start(self, db, project_id: str):
+        replica = ProjectReplica(project_id)
+        with self._lock:
+            if project_id in self._replicas:
+                return
+            self._replicas[project_id] = replica
+        try:
+            replica.watches.append(
+                db.collection('projects').document(project_id).on_snapshot(replica.on_project_snapshot)
+            )
+            replica.watches.append(
+                db.collection('tasks').where('project_id', '==', project_id).on_snapshot(replica.on_tasks_snapshot)
+            )
+        except Exception as e:
+            logger.warning("Error starting snapshot listeners for project %s: %s", project_id, e)
+            self.drop(project_id)
+
+    def _evict(self):
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for project_id, replica in list(self._replicas.items()):
+                if now - replica.last_access > self.idle_seconds:
+                    evicted.append(self._replicas.pop(project_id))
+                elif len(replica.tasks) > self.max_tasks:
+                    # Too large to ever fit: keep serving it from Firestore
+                    self._oversized.add(project_id)
+                    evicted.append(self._replicas.pop(project_id))
+            while self._replicas and (len(self._replicas) > self.max_projects or
+                                      sum(len(r.tasks) for r in self._replicas.values()) > self.max_tasks):
+                evicted.append(self._replicas.popitem(last=False)[1])
+        for replica in evicted:
+            replica.close()
+        self.evictions += len(evicted)
@@ -0,0 +1,210 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+logger = logging.getLogger(__name__)
+
+# Errors that signal overload or a transient backend problem
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.Aborted,
+)
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when a backend call is throttled, or rejected because the backend is failing"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token-bucket rate limiter (``rate`` tokens per second, up to ``burst``)"""
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """Take a token, waiting at most ``timeout`` seconds for one"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated transient failures, probing again after ``reset_timeout``.
+
+    While half-open a single trial call is let through; calls nested in it
+    (same thread, e.g. reads inside a transaction) share its slot.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_thread = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise ServiceUnavailableError if calls are currently rejected"""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise ServiceUnavailableError('Firestore circuit open', retry_after=max(1, int(remaining)))
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    if self._trial_thread == threading.get_ident():
+                        return
+                    raise ServiceUnavailableError('Firestore circuit half-open', retry_after=1)
+                self._trial_in_flight = True
+                self._trial_thread = threading.get_ident()
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Firestore circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._end_trial()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._end_trial()
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Firestore circuit opened after %d failures", self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about the backend's health (e.g. rejected by this worker)"""
+        with self._lock:
+            if self._trial_thread == threading.get_ident():
+                self._end_trial()
+
+    def _end_trial(self):
+        self._trial_in_flight = False
+        self._trial_thread = None
+
+
+class ResilientExecutor:
+    """Run backend calls through a per-operation rate limiter, retries and a circuit breaker.
+
+    Only idempotent calls are retried, with full-jitter exponential backoff.
+    When no token is available within ``max_wait`` the call fails fast with
+    ServiceUnavailableError instead of blocking the worker. An operation type
+    with a rate of 0 (or less) is not limited.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, max_attempts: int = 3,
+                 base_delay: float = 0.1, max_delay: float = 2.0, max_wait: float = 0.05,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.configure(limits or {}, max_attempts, base_delay, max_delay, max_wait,
+                       failure_threshold, reset_timeout)
+
+    def configure(self, limits: Dict[str, Tuple[float, float]], max_attempts: int = 3,
+                  base_delay: float = 0.1, max_delay: float = 2.0, max_wait: float = 0.05,
+                  failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """(Re)configure limits and policies"""
+        self.buckets = {op: TokenBucket(rate, burst) for op, (rate, burst) in limits.items() if rate > 0}
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def call(self, op: str, fn: Callable, idempotent: bool = False):
+        """Run ``fn`` as an operation of type ``op``"""
+        self._count(op, 'calls')
+        bucket = self.buckets.get(op)
+        if bucket is not None and not bucket.acquire(self.max_wait):
+            self._count(op, 'throttled')
+            raise ServiceUnavailableError(f'Firestore {op} rate limit reached')
+
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                self.breaker.before_call()
+            except ServiceUnavailableError:
+                self._count(op, 'rejected')
+                raise
+            try:
+                result = fn()
+            except ServiceUnavailableError:
+                # Throttled or rejected by this worker (a nested call): no backend outcome to record
+                self.breaker.release()
+                raise
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure()
+                self._count(op, 'failures')
+                if attempt == attempts:
+                    raise ServiceUnavailableError(f'Firestore {op} failed: {e}') from e
+                self._count(op, 'retries')
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))))
+            except Exception:
+                # The backend answered (e.g. NotFound): it is healthy
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def metrics(self) -> Dict:
+        """Counters per operation type, limiter levels and breaker state"""
+        with self._stats_lock:
+            operations = {op: dict(counters) for op, counters in self._stats.items()}
+        return {
+            'operations': operations,
+            'tokens_available': {op: bucket.available for op, bucket in self.buckets.items()},
+            'circuit_state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures
+        }
+
+    def _count(self, op: str, counter: str):
+        with self._stats_lock:
+            counters = self._stats.setdefault(op, {'calls': 0, 'throttled': 0, 'rejected': 0,
+                                                   'failures': 0, 'retries': 0})
+            counters[counter] += 1
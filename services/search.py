@@ -0,0 +1,257 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from services.models import Task
+
+# Weight of a token depending on the field it comes from
+FIELD_WEIGHTS = {'title': 3.0, 'assignee': 2.0, 'description': 1.0}
+
+# Score multipliers by kind of match
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+FUZZY_MATCH = 0.5
+
+# Minimum trigram similarity for a fuzzy (typo-tolerant) match
+FUZZY_THRESHOLD = 0.4
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded alphanumeric tokens"""
+    if not text:
+        return []
+    folded = unicodedata.normalize('NFKD', text.lower())
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(folded)
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProjectIndex:
+    """Inverted index of the tasks of one project"""
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.version = None
+        self.watermark = 0
+        self.docs: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.vocabulary: List[str] = []
+        self.trigram_tokens: Dict[str, Set[str]] = {}
+
+    def add(self, task: Task):
+        self.remove(task.id)
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(task, field)):
+                weights[token] = weights.get(token, 0.0) + weight
+        self.docs[task.id] = {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description,
+            'status': task.status,
+            'assignee': task.assignee,
+            'due_date': task.due_date,
+            'tokens': list(weights)
+        }
+        for token, weight in weights.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+                for gram in trigrams(token):
+                    self.trigram_tokens.setdefault(gram, set()).add(token)
+            postings[task.id] = weight
+        self.watermark = max(self.watermark, task.updated_at or 0)
+
+    def remove(self, task_id: str):
+        doc = self.docs.pop(task_id, None)
+        if doc is None:
+            return
+        for token in doc['tokens']:
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(task_id, None)
+            if not postings:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+                for gram in trigrams(token):
+                    tokens = self.trigram_tokens.get(gram)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self.trigram_tokens[gram]
+
+    def matches(self, term: str) -> Dict[str, float]:
+        """Best match quality of ``term`` for each matching token of the vocabulary"""
+        found = {}
+        if term in self.postings:
+            found[term] = EXACT_MATCH
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            found.setdefault(token, PREFIX_MATCH)
+        if not found and len(term) >= 3:
+            grams = trigrams(term)
+            candidates = {}
+            for gram in grams:
+                for token in self.trigram_tokens.get(gram, ()):
+                    candidates[token] = candidates.get(token, 0) + 1
+            for token, shared in candidates.items():
+                similarity = shared / len(grams | trigrams(token))
+                if similarity >= FUZZY_THRESHOLD:
+                    found[token] = FUZZY_MATCH * similarity
+        return found
+
+    def search(self, terms: List[str]) -> Dict[str, tuple]:
+        """task id -> (matched terms, score)"""
+        results = {}
+        for term in terms:
+            best = {}
+            for token, quality in self.matches(term).items():
+                for task_id, weight in self.postings[token].items():
+                    best[task_id] = max(best.get(task_id, 0.0), weight * quality)
+            for task_id, score in best.items():
+                matched, total = results.get(task_id, (0, 0.0))
+                results[task_id] = (matched + 1, total + score)
+        return results
+
+
+class SearchIndex:
+    """Per-worker inverted index over task titles, descriptions and assignees.
+
+    Projects are indexed on their first search and kept current by the task
+    write hooks. Writes made by other workers are picked up when the project
+    version moved: tasks updated since the last indexed ``updated_at`` are
+    re-read, and the index is rebuilt if the task count no longer matches
+    (deletions). At most ``max_projects`` project indexes are kept.
+    """
+
+    def __init__(self, max_projects: int = 200):
+        self.max_projects = max_projects
+        self._projects = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.builds = 0
+        self.catch_ups = 0
+
+    def search(self, query: str, projects: Iterable, limit: int = 20) -> List[Dict]:
+        """Rank the tasks of ``projects`` (Project models) matching every term of ``query`` first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        scored = []
+        for project in projects:
+            index = self._get_current(project)
+            with self._lock:
+                for task_id, (matched, score) in index.search(terms).items():
+                    doc = index.docs[task_id]
+                    scored.append((matched, score, project, doc))
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], item[1]))
+        return [
+            {
+                'id': doc['id'],
+                'title': doc['title'],
+                'status': doc['status'],
+                'assignee': doc['assignee'],
+                'due_date': doc['due_date'],
+                'project_id': project.id,
+                'project_name': project.name,
+                'score': round(score, 3),
+                'matched_all': matched == len(terms)
+            }
+            for matched, score, project, doc in top
+        ]
+
+    def on_task_written(self, task_id: str, data: Dict, project_id: Optional[str] = None):
+        """Apply a created or updated task to the index of its project, if loaded"""
+        with self._lock:
+            for index in self._indexes_for(task_id, project_id):
+                existing = index.docs.get(task_id)
+                task = Task(id=task_id, project_id=index.project_id)
+                if existing is not None:
+                    task.apply_update({name: existing[name] for name in
+                                       ('title', 'description', 'status', 'assignee', 'due_date')})
+                task.apply_update(data)
+                index.add(task)
+
+    def on_task_deleted(self, task_id: str):
+        with self._lock:
+            for index in self._indexes_for(task_id, None):
+                index.remove(task_id)
+
+    def drop(self, project_id: str):
+        with self._lock:
+            self._projects.pop(project_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'projects': len(self._projects),
+                'tasks': sum(len(index.docs) for index in self._projects.values()),
+                'tokens': sum(len(index.postings) for index in self._projects.values()),
+                'hits': self.hits,
+                'builds': self.builds,
+                'catch_ups': self.catch_ups
+            }
+
+    def _indexes_for(self, task_id: str, project_id: Optional[str]) -> List[ProjectIndex]:
+        if project_id:
+            index = self._projects.get(project_id)
+            return [index] if index is not None else []
+        return [index for index in self._projects.values() if task_id in index.docs]
+
+    def _get_current(self, project) -> ProjectIndex:
+        from services.firestore_service import FirestoreService
+
+        with self._lock:
+            index = self._projects.get(project.id)
+            if index is not None:
+                self._projects.move_to_end(project.id)
+        if index is None:
+            index = self._build(project)
+        elif index.version != project.version:
+            updated = FirestoreService.get_tasks_updated_since(project.id, index.watermark)
+            with self._lock:
+                for task in updated:
+                    index.add(task)
+            if FirestoreService.count_tasks(project.id) != len(index.docs):
+                index = self._build(project)
+            else:
+                index.version = project.version
+                self.catch_ups += 1
+        else:
+            self.hits += 1
+        return index
+
+    def _build(self, project) -> ProjectIndex:
+        from services.firestore_service import FirestoreService
+
+        index = ProjectIndex(project.id)
+        index.version = project.version
+        tasks = list(FirestoreService.iter_tasks(project.id))
+        with self._lock:
+            for task in tasks:
+                index.add(task)
+            self._projects[project.id] = index
+            self._projects.move_to_end(project.id)
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+            self.builds += 1
+        return index
+
+
+
+# Shared by the service (write hooks) and the search endpoint
+search_index = SearchIndex()
@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # optional, only needed for a redis:// SHARED_CACHE_URL
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'invalidate'
+
+
+def _encode(value) -> str:
+    def default(obj):
+        if isinstance(obj, datetime):
+            return {'__datetime__': obj.isoformat()}
+        raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+    return json.dumps(value, default=default)
+
+
+def _decode(raw):
+    def object_hook(obj):
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        return obj
+    return json.loads(raw, object_hook=object_hook)
+
+
+class InMemoryRedis:
+    """In-process stand-in for a Redis client (the subset SharedCache uses), for tests and single-process runs"""
+
+    def __init__(self):
+        self._data = {}
+        self._handlers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def publish(self, channel, message):
+        handlers = list(self._handlers.get(channel, []))
+        for handler in handlers:
+            handler({'type': 'message', 'channel': channel, 'data': message})
+        return len(handlers)
+
+    def subscribe(self, channel, handler):
+        """Register a pub/sub handler (redis-py does this through client.pubsub())"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+
+class SharedCache:
+    """Cross-worker (L2) cache of documents in a Redis-protocol server.
+
+    Values are JSON encoded under ``<prefix><kind>:<key>`` with a TTL. Writers
+    call ``invalidate`` which deletes the entry and publishes the key so that
+    every worker can drop its own local copies. Redis errors never fail a
+    request: they count as misses. Disabled (every call a no-op) until
+    configured with a URL.
+
+    Each invalidation also replaces a stamp of the entry. Readers take the
+    ``stamp`` before loading a value from the source and hand it to ``set``,
+    which deletes the value again if the stamp changed meanwhile: a read
+    racing with a write in another worker cannot leave the old document
+    cached for ``ttl`` seconds.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, str], None]] = []
+        self.configure(None)
+
+    def configure(self, url: Optional[str], ttl: int = 300, prefix: str = 'taskflow:'):
+        """Connect to ``redis://...``, use the in-process fake (``memory://``) or disable (None)"""
+        self.url = url
+        self.ttl = ttl
+        self.prefix = prefix
+        self.channel = prefix + INVALIDATION_CHANNEL
+        self._client = None
+        self._client_pid = None
+        self._pubsub_thread = None
+        self._origin = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        if url and url.startswith('memory://'):
+            self._client = InMemoryRedis()
+        elif url and redis is None:
+            logger.warning("SHARED_CACHE_URL is set but the redis package is not installed. Shared cache disabled.")
+            self.url = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def _get_client(self):
+        if not isinstance(self._client, InMemoryRedis) and self._client_pid != os.getpid():
+            # Connections and the pub/sub thread do not survive fork: each worker opens its own
+            self._client = redis.Redis.from_url(self.url, socket_timeout=0.25, socket_connect_timeout=0.25)
+            self._client_pid = os.getpid()
+            self._origin = uuid.uuid4().hex
+            self._pubsub_thread = None
+        if self._listeners and self._pubsub_thread is None:
+            self._start_listener(self._client)
+        return self._client
+
+    def get(self, kind: str, key: str):
+        """Cached value, or None on a miss (or when the server is unreachable)"""
+        if not self.enabled:
+            return None
+        try:
+            raw = self._get_client().get(f'{self.prefix}{kind}:{key}')
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Error reading shared cache: %s", e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(raw)
+
+    def stamp(self, kind: str, key: str) -> Optional[str]:
+        """Invalidation stamp of an entry ('' if never invalidated), None when it cannot be read"""
+        if not self.enabled:
+            return None
+        try:
+            raw = self._get_client().get(f'{self.prefix}stamp:{kind}:{key}')
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Error reading shared cache: %s", e)
+            return None
+        return raw.decode() if isinstance(raw, bytes) else (raw or '')
+
+    def set(self, kind: str, key: str, value, stamp: Optional[str]):
+        """Store a JSON-serializable value for ``ttl`` seconds.
+
+        ``stamp`` is the entry's stamp taken before the value was loaded: the
+        value is not kept if the entry was invalidated since (or if the stamp
+        could not be read).
+        """
+        if not self.enabled or stamp is None:
+            return
+        name = f'{self.prefix}{kind}:{key}'
+        try:
+            client = self._get_client()
+            client.set(name, _encode(value), ex=self.ttl)
+            # Checked after the write: an invalidation landing before this
+            # check is seen here, and one landing after it deletes the value
+            if self.stamp(kind, key) != stamp:
+                client.delete(name)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Error writing shared cache: %s", e)
+
+    def invalidate(self, kind: str, key: str):
+        """Drop an entry everywhere: in the server, and (via pub/sub) in every worker"""
+        for listener in self._listeners:
+            listener(kind, key)
+        if not self.enabled:
+            return
+        try:
+            client = self._get_client()
+            client.set(f'{self.prefix}stamp:{kind}:{key}', uuid.uuid4().hex, ex=self.ttl)
+            client.delete(f'{self.prefix}{kind}:{key}')
+            client.publish(self.channel, f'{self._origin}|{kind}:{key}')
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Error invalidating shared cache: %s", e)
+
+    def subscribe(self, listener: Callable[[str, str], None]):
+        """Call ``listener(kind, key)`` whenever any worker invalidates an entry"""
+        self._listeners.append(listener)
+        if self.enabled:
+            self._get_client()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+    def _on_message(self, message):
+        data = message.get('data')
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, _, entry = str(data).partition('|')
+        if origin == self._origin:
+            return  # already applied locally by invalidate()
+        kind, _, key = entry.partition(':')
+        for listener in self._listeners:
+            listener(kind, key)
+
+    def _start_listener(self, client):
+        if isinstance(client, InMemoryRedis):
+            client.subscribe(self.channel, self._on_message)
+            self._pubsub_thread = True
+            return
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._on_message})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Error subscribing to shared cache invalidations: %s", e)
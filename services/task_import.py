@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from services.firestore_service import FirestoreService, TASK_STATUSES
+
+TASK_PRIORITIES = ('low', 'medium', 'high')
+
+
+def parse_rows(content: str, import_format: str) -> List[Dict]:
+    """Parse CSV (with a header line) or NDJSON content into row dicts"""
+    if import_format == 'csv':
+        return list(csv.DictReader(io.StringIO(content)))
+    if import_format == 'ndjson':
+        rows = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            rows.append(row if isinstance(row, dict) else {'__invalid__': line})
+        return rows
+    raise ValueError(f"Unsupported import format: {import_format}")
+
+
+def _text(row: Dict, key: str) -> str:
+    """Read a field as a stripped string, whatever the source type"""
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def _parse_dates(values: Iterable[str]) -> Dict[str, object]:
+    """Parse every distinct date string once; invalid ones map to None"""
+    parsed = {}
+    for value in set(values):
+        try:
+            parsed[value] = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            parsed[value] = None
+    return parsed
+
+
+def validate_rows(project_id: str, rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Validate rows against one snapshot of the project's task titles.
+
+    Returns the task documents ready to be written and a per-row error
+    report (rows are numbered from 1, not counting the CSV header).
+    """
+    existing_titles = {task.title.strip().lower() for task in FirestoreService.iter_tasks(project_id)}
+    dates = _parse_dates(_text(row, 'due_date') for row in rows if _text(row, 'due_date'))
+
+    tasks, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        if '__invalid__' in row:
+            errors.append({'row': number, 'error': 'Ligne JSON invalide'})
+            continue
+
+        title = _text(row, 'title')
+        if not title:
+            errors.append({'row': number, 'error': 'Titre manquant'})
+            continue
+        if title.lower() in existing_titles:
+            errors.append({'row': number, 'error': f'Le nom de la tâche "{title}" doit être unique dans ce projet.'})
+            continue
+
+        status = _text(row, 'status') or 'todo'
+        if status not in TASK_STATUSES:
+            errors.append({'row': number, 'error': f'Statut invalide: {status}'})
+            continue
+
+        priority = _text(row, 'priority') or 'low'
+        if priority not in TASK_PRIORITIES:
+            errors.append({'row': number, 'error': f'Priorité invalide: {priority}'})
+            continue
+
+        due_date = _text(row, 'due_date')
+        if due_date and dates.get(due_date) is None:
+            errors.append({'row': number, 'error': f'Date invalide: {due_date}'})
+            continue
+
+        existing_titles.add(title.lower())
+        task = {
+            'project_id': project_id,
+            'title': title,
+            'description': _text(row, 'description'),
+            'status': status,
+            'priority': priority,
+            'assignee': _text(row, 'assignee')
+        }
+        if due_date:
+            task['due_date'] = dates[due_date]
+        tasks.append(task)
+
+    return tasks, errors
+
+
+def import_tasks(project_id: str, content: str, import_format: str, dry_run: bool = False) -> Dict:
+    """Validate and import tasks, writing them in chunked batches.
+
+    With ``dry_run`` nothing is written; the report shows what would be
+    created.
+    """
+    rows = parse_rows(content, import_format)
+    tasks, errors = validate_rows(project_id, rows)
+
+    created = 0
+    if tasks and not dry_run:
+        created = len(FirestoreService.create_tasks(project_id, tasks))
+
+    return {
+        'dry_run': dry_run,
+        'total_rows': len(rows),
+        'valid_rows': len(tasks),
+        'created': created,
+        'errors': errors
+    }
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """Write-behind buffer coalescing updates to the same document.
+
+    Updates submitted for a key within ``delay`` seconds of the first one
+    are merged and written once, with the last state winning. Keys can be
+    attached to a group (e.g. the project of a task) so callers can flush or
+    version everything pending for that group. A daemon thread performs the
+    delayed writes; ``flush_all`` must be called on shutdown to make them
+    durable. Writes of the same key never overlap, and ``discard`` waits for
+    one in progress, so a direct write made after it cannot be overwritten
+    by an older buffered one. A write failing with one of ``retry_on`` is
+    retried with backoff, at most ``max_retries`` times; any other failure
+    (e.g. the document was deleted meanwhile) drops the update.
+    """
+
+    def __init__(self, writer: Callable[[Hashable, Dict, Optional[Hashable]], None], delay: float = 0.5,
+                 retry_on: Tuple[type, ...] = (), max_retries: int = 5):
+        self.writer = writer
+        self.delay = delay
+        self.retry_on = retry_on
+        self.max_retries = max_retries
+        self._pending = {}
+        self._writing = set()
+        self._generations = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self.submitted = 0
+        self.flushed = 0
+        self.dropped = 0
+
+    def submit(self, key: Hashable, data: Dict, group: Optional[Hashable] = None):
+        """Queue an update, merging it with any update still pending for the key"""
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = {'data': {}, 'group': group, 'deadline': time.monotonic() + self.delay}
+                self._pending[key] = entry
+            entry['data'].update(data)
+            if group is not None:
+                entry['group'] = group
+                self._generations[group] = self._generations.get(group, 0) + 1
+            self.submitted += 1
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def peek(self, key: Hashable) -> Optional[Dict]:
+        """Pending (not yet written) data for a key"""
+        with self._cond:
+            entry = self._pending.get(key)
+            return dict(entry['data']) if entry else None
+
+    def discard(self, key: Hashable) -> Optional[Dict]:
+        """Remove and return the pending entry of a key (to merge it into a direct write).
+
+        Waits for a write of the key already in progress: if it fails, its
+        update is put back and returned here.
+        """
+        with self._cond:
+            while key in self._writing:
+                self._cond.wait()
+            return self._pending.pop(key, None)
+
+    def generation(self, group: Hashable) -> int:
+        """Counter bumped on every submission for the group"""
+        with self._cond:
+            return self._generations.get(group, 0)
+
+    def has_pending(self, group: Hashable) -> bool:
+        """Whether any key of the group still has an unwritten update"""
+        with self._cond:
+            return any(entry['group'] == group for entry in self._pending.values())
+
+    def flush(self, keys: Iterable[Hashable]):
+        """Write the given keys now (after any write of them already in progress)"""
+        keys = list(keys)
+        with self._cond:
+            while any(key in self._writing for key in keys):
+                self._cond.wait()
+            entries = self._take([key for key in keys if key in self._pending])
+        self._write(entries)
+
+    def flush_group(self, group: Hashable):
+        """Write everything pending for a group now"""
+        with self._cond:
+            keys = [key for key, entry in self._pending.items() if entry['group'] == group]
+        self.flush(keys)
+
+    def flush_all(self):
+        """Write everything pending now (call on worker shutdown)"""
+        with self._cond:
+            keys = list(self._pending)
+        self.flush(keys)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _take(self, keys):
+        # Called with the lock held: keys stay marked as being written until _write is done with them
+        keys = [key for key in keys if key not in self._writing]
+        self._writing.update(keys)
+        return [(key, self._pending.pop(key)) for key in keys]
+
+    def _write(self, entries):
+        for key, entry in entries:
+            try:
+                self.writer(key, entry['data'], entry['group'])
+                self.flushed += 1
+            except self.retry_on as e:
+                if entry.get('retries', 0) >= self.max_retries:
+                    logger.error("Dropping buffered write for %s after %d retries: %s", key, self.max_retries, e)
+                    self.dropped += 1
+                else:
+                    logger.warning("Buffered write for %s failed, retrying: %s", key, e)
+                    self._requeue(key, entry)
+            except Exception:
+                logger.exception("Dropping buffered write for %s", key)
+                self.dropped += 1
+            finally:
+                with self._cond:
+                    self._writing.discard(key)
+                    self._cond.notify_all()
+
+    def _requeue(self, key, entry):
+        """Put a failed write back, unless a newer update already replaced it"""
+        with self._cond:
+            newer = self._pending.get(key)
+            if newer is not None:
+                entry['data'].update(newer['data'])
+            entry['retries'] = entry.get('retries', 0) + 1
+            entry['deadline'] = time.monotonic() + min(max(self.delay, 1.0) * 2 ** (entry['retries'] - 1), 30.0)
+            self._pending[key] = entry
+
+    def _ensure_thread(self):
+        # Started lazily so that each forked worker gets its own thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='write-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = [key for key, entry in self._pending.items()
+                       if entry['deadline'] <= now and key not in self._writing]
+                if not due:
+                    next_deadline = min(entry['deadline'] for entry in self._pending.values())
+                    self._cond.wait(max(next_deadline - now, 0.05))
+                    continue
+                entries = self._take(due)
+            self._write(entries)
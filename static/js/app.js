@@ -0,0 +1,307 @@
+// Navigation dynamique
+function switchToProjectNav(projectId, projectName) {
+    const globalNav = document.getElementById('globalNav');
+    const projectNav = document.getElementById('projectNav');
+    const projectTitle = document.getElementById('projectTitle');
+    
+    // Mettre à jour le titre du projet
+    projectTitle.textContent = projectName;
+    
+    // Mettre à jour les liens des onglets
+    document.getElementById('overviewTab').href = `/projects/${projectId}/overview`;
+    document.getElementById('kanbanTab').href = `/projects/${projectId}/board`;
+    document.getElementById('calendarTab').href = `/projects/${projectId}/calendar`;
+    document.getElementById('archiveTab').href = `/projects/${projectId}/archive`;
+    
+    // Transition fluide
+    globalNav.classList.add('hidden');
+    projectNav.classList.remove('hidden');
+}
+
+function switchToGlobalNav() {
+    const globalNav = document.getElementById('globalNav');
+    const projectNav = document.getElementById('projectNav');
+    
+    projectNav.classList.add('hidden');
+    globalNav.classList.remove('hidden');
+}
+
+// Theme Management
+function initTheme() {
+    const theme = localStorage.getItem('theme') || 
+                 (window.matchMedia('(prefers-color-scheme: dark)').matches ? 'dark' : 'light');
+    document.documentElement.classList.toggle('dark', theme === 'dark');
+    updateThemeIcon(theme);
+}
+
+function toggleTheme() {
+    const isDark = document.documentElement.classList.contains('dark');
+    const newTheme = isDark ? 'light' : 'dark';
+    document.documentElement.classList.toggle('dark', newTheme === 'dark');
+    localStorage.setItem('theme', newTheme);
+    updateThemeIcon(newTheme);
+}
+
+function updateThemeIcon(theme) {
+    const icon = document.getElementById('themeIcon');
+    icon.className = theme === 'dark' ? 'fa-solid fa-sun' : 'fa-solid fa-moon';
+}
+
+// Initialize theme on load
+initTheme();
+document.getElementById('themeToggle').addEventListener('click', toggleTheme);
+
+// User menu toggle
+const userMenuBtn = document.getElementById('userMenuBtn');
+const userMenu = document.getElementById('userMenu');
+if (userMenuBtn && userMenu) {
+    userMenuBtn.addEventListener('click', function(e) {
+        e.stopPropagation();
+        userMenu.classList.toggle('hidden');
+        // Close notification dropdown if open
+        const notificationDropdown = document.getElementById('notificationDropdown');
+        if (notificationDropdown) {
+            notificationDropdown.classList.add('hidden');
+        }
+    });
+    
+    // Close menu when clicking outside
+    document.addEventListener('click', function() {
+        userMenu.classList.add('hidden');
+    });
+}
+
+// Notification bell toggle
+const notificationBtn = document.getElementById('notificationBtn');
+const notificationDropdown = document.getElementById('notificationDropdown');
+if (notificationBtn && notificationDropdown) {
+    notificationBtn.addEventListener('click', function(e) {
+        e.stopPropagation();
+        notificationDropdown.classList.toggle('hidden');
+        // Close user menu if open
+        if (userMenu) {
+            userMenu.classList.add('hidden');
+        }
+    });
+    
+    // Close dropdown when clicking outside
+    document.addEventListener('click', function() {
+        notificationDropdown.classList.add('hidden');
+    });
+}
+
+// Join Project Modal
+const joinBtn = document.getElementById('joinBtn');
+if (joinBtn) {
+    joinBtn.addEventListener('click', function() {
+        showModal(`
+            <h3 class="text-xl font-semibold text-slate-900 dark:text-white mb-4">Rejoindre un Projet</h3>
+            <form id="joinForm">
+                <div class="space-y-4">
+                    <div>
+                        <label class="block text-slate-700 dark:text-slate-300 text-sm font-medium mb-2">Nom du Projet</label>
+                        <input type="text" name="project_name" required placeholder="Nom exact du projet"
+                               class="w-full px-3 py-2 bg-white dark:bg-slate-700 border border-slate-300 dark:border-slate-600 rounded-lg text-slate-900 dark:text-white focus:outline-none focus:border-indigo-500">
+                    </div>
+                    <div>
+                        <label class="block text-slate-700 dark:text-slate-300 text-sm font-medium mb-2">Code d'Accès</label>
+                        <input type="password" name="access_code" required placeholder="Code d'accès du projet"
+                               class="w-full px-3 py-2 bg-white dark:bg-slate-700 border border-slate-300 dark:border-slate-600 rounded-lg text-slate-900 dark:text-white focus:outline-none focus:border-indigo-500">
+                        <p class="text-slate-500 dark:text-slate-400 text-xs mt-1">Demandez ces informations à votre chef d'équipe</p>
+                    </div>
+                    <div class="flex space-x-3 pt-4">
+                        <button type="submit" class="flex-1 bg-indigo-600 hover:bg-indigo-700 text-white py-2 rounded-lg transition-colors">
+                            Rejoindre le Projet
+                        </button>
+                        <button type="button" onclick="hideModal()" class="flex-1 bg-slate-500 dark:bg-slate-600 hover:bg-slate-600 dark:hover:bg-slate-700 text-white py-2 rounded-lg transition-colors">
+                            Annuler
+                        </button>
+                    </div>
+                </div>
+            </form>
+        `);
+
+        document.getElementById('joinForm').addEventListener('submit', async function(e) {
+            e.preventDefault();
+            const formData = new FormData(e.target);
+            const data = Object.fromEntries(formData);
+            
+            try {
+                const result = await apiCall('/projects/search_and_join', {
+                    method: 'POST',
+                    body: JSON.stringify(data)
+                });
+                
+                if (result.success) {
+                    hideModal();
+                    showToast(result.message, 'success');
+                    setTimeout(() => location.reload(), 1500);
+                } else {
+                    showToast(result.error || 'Échec de la connexion au projet', 'error');
+                }
+            } catch (error) {
+                showToast('Erreur lors de la connexion au projet', 'error');
+            }
+        });
+    });
+}
+
+// Delete Confirmation Modal
+let deleteCallback = null;
+
+function showDeleteConfirm(title, message, onConfirm) {
+    document.getElementById('deleteTitle').textContent = title;
+    document.getElementById('deleteMessage').textContent = message;
+    deleteCallback = onConfirm;
+    
+    const modal = document.getElementById('deleteModal');
+    modal.classList.remove('hidden');
+    
+    // Animation
+    setTimeout(() => {
+        modal.querySelector('.transform').classList.remove('scale-95');
+        modal.querySelector('.transform').classList.add('scale-100');
+    }, 10);
+}
+
+function hideDeleteModal() {
+    const modal = document.getElementById('deleteModal');
+    modal.querySelector('.transform').classList.add('scale-95');
+    modal.querySelector('.transform').classList.remove('scale-100');
+    
+    setTimeout(() => {
+        modal.classList.add('hidden');
+        deleteCallback = null;
+    }, 200);
+}
+
+// Confirm Delete Helper
+function confirmDelete(elementId, title = 'Supprimer cet élément ?', message = 'Cette action ne peut pas être annulée.') {
+    return new Promise((resolve) => {
+        showDeleteConfirm(title, message, () => {
+            resolve(true);
+        });
+        
+        // Override cancel to resolve false
+        const cancelBtn = document.getElementById('deleteCancelBtn');
+        const originalCancel = cancelBtn.onclick;
+        cancelBtn.onclick = () => {
+            resolve(false);
+            hideDeleteModal();
+        };
+    });
+}
+
+// Delete modal event listeners
+document.getElementById('deleteCancelBtn').addEventListener('click', hideDeleteModal);
+document.getElementById('deleteConfirmBtn').addEventListener('click', function() {
+    if (deleteCallback) {
+        deleteCallback();
+    }
+    hideDeleteModal();
+});
+
+// Close delete modal on backdrop click
+document.getElementById('deleteModal').addEventListener('click', function(e) {
+    if (e.target === this) hideDeleteModal();
+});
+
+// Updated Toast Function for Pro Look
+function showToast(message, type = 'success') {
+    const container = document.getElementById('toastContainer');
+    const toast = document.createElement('div');
+    
+    const colors = type === 'success' 
+        ? 'bg-white dark:bg-slate-800 border-l-4 border-brand-500 text-slate-800 dark:text-white' 
+        : 'bg-white dark:bg-slate-800 border-l-4 border-rose-500 text-slate-800 dark:text-white';
+    
+    const icon = type === 'success' 
+        ? '<i class="fa-solid fa-circle-check text-brand-500 text-xl"></i>' 
+        : '<i class="fa-solid fa-circle-exclamation text-rose-500 text-xl"></i>';
+
+    toast.className = `pointer-events-auto flex items-center gap-3 p-4 rounded-lg shadow-xl border border-slate-100 dark:border-slate-700 transform translate-x-full transition-all duration-300 w-80 ${colors}`;
+    toast.innerHTML = `
+        ${icon}
+        <div class="flex-1 text-sm font-medium">${message}</div>
+        <button onclick="this.parentElement.remove()" class="text-slate-400 hover:text-slate-600"><i class="fa-solid fa-xmark"></i></button>
+    `;
+
+    container.appendChild(toast);
+    
+    // Animate in
+    requestAnimationFrame(() => {
+        toast.classList.remove('translate-x-full');
+    });
+
+    setTimeout(() => {
+        toast.classList.add('translate-x-full', 'opacity-0');
+        setTimeout(() => toast.remove(), 300);
+    }, 4000);
+}
+
+// Modal functionality
+function showModal(content) {
+    document.getElementById('modalContent').innerHTML = content;
+    document.getElementById('modalContainer').classList.remove('hidden');
+}
+
+function hideModal() {
+    document.getElementById('modalContainer').classList.add('hidden');
+}
+
+// Close modal on backdrop click
+document.getElementById('modalContainer').addEventListener('click', function(e) {
+    if (e.target === this) hideModal();
+});
+
+// API helper
+async function apiCall(url, options = {}) {
+    const response = await fetch(url, {
+        headers: {
+            'Content-Type': 'application/json',
+            ...options.headers
+        },
+        ...options
+    });
+    return response.json();
+}
+
+// Accept invitation function
+async function acceptInvite(projectId) {
+    try {
+        const result = await apiCall(`/projects/accept_invite/${projectId}`, {
+            method: 'POST'
+        });
+        
+        if (result.success) {
+            showToast('Invitation acceptée !', 'success');
+            if (result.redirect) {
+                setTimeout(() => window.location.href = result.redirect, 1000);
+            } else {
+                setTimeout(() => location.reload(), 1000);
+            }
+        } else {
+            showToast(result.error || 'Erreur lors de l\'acceptation', 'error');
+        }
+    } catch (error) {
+        showToast('Erreur lors de l\'acceptation de l\'invitation', 'error');
+    }
+}
+
+// Decline invitation function
+async function declineInvite(projectId) {
+    try {
+        const result = await apiCall(`/projects/decline_invite/${projectId}`, {
+            method: 'POST'
+        });
+        
+        if (result.success) {
+            showToast('Invitation refusée', 'success');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showToast(result.error || 'Erreur lors du refus', 'error');
+        }
+    } catch (error) {
+        showToast('Erreur lors du refus de l\'invitation', 'error');
+    }
+}
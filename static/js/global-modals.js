@@ -0,0 +1,111 @@
+// Member Info Modal Functions
+function showMemberInfo(element) {
+    const username = element.getAttribute('data-username');
+    const email = element.getAttribute('data-email');
+    const phone = element.getAttribute('data-phone');
+    
+    const usernameEl = document.getElementById('memberUsername');
+    const emailEl = document.getElementById('memberEmail');
+    const phoneEl = document.getElementById('memberPhone');
+    const initialsEl = document.getElementById('memberInitials');
+    const modal = document.getElementById('memberModal');
+    
+    if (usernameEl && emailEl && phoneEl && initialsEl && modal) {
+        usernameEl.textContent = username;
+        emailEl.textContent = email;
+        phoneEl.textContent = 'Téléphone: ' + phone;
+        
+        // Generate initials
+        const words = username.trim().split(' ');
+        let initials = 'U';
+        if (words.length >= 2) {
+            initials = (words[0][0] + words[words.length - 1][0]).toUpperCase();
+        } else if (words.length === 1 && words[0].length >= 2) {
+            initials = words[0].substring(0, 2).toUpperCase();
+        } else if (words.length === 1) {
+            initials = words[0][0].toUpperCase();
+        }
+        initialsEl.textContent = initials;
+        
+        modal.classList.remove('hidden');
+    }
+}
+
+function hideMemberModal() {
+    const modal = document.getElementById('memberModal');
+    if (modal) {
+        modal.classList.add('hidden');
+    }
+}
+
+// Close member modal on backdrop click
+const memberModal = document.getElementById('memberModal');
+if (memberModal) {
+    memberModal.addEventListener('click', function(e) {
+        if (e.target === this) hideMemberModal();
+    });
+}
+
+// Global function to open the Join Modal (works from Navbar)
+function openJoinModalGlobal() {
+    // Reuse your existing modal logic
+    showModal(`
+        <div class="text-left">
+            <div class="mb-6 text-center">
+                <div class="w-12 h-12 bg-amber-100 dark:bg-amber-900/30 rounded-full flex items-center justify-center mx-auto mb-3 text-amber-600">
+                    <i class="fa-solid fa-link text-xl"></i>
+                </div>
+                <h3 class="text-xl font-bold text-slate-900 dark:text-white">Rejoindre un Projet</h3>
+                <p class="text-sm text-slate-500 mt-1">Vous avez un code d'accès ? Entrez-le ci-dessous.</p>
+            </div>
+            
+            <form id="globalJoinForm" class="space-y-5">
+                <div>
+                    <input type="password" name="access_code" required placeholder="Code du projet (ex: TEAM24)"
+                        class="w-full px-4 py-3 text-center text-lg tracking-widest bg-slate-50 dark:bg-slate-800 border border-slate-200 dark:border-slate-700 rounded-xl focus:ring-2 focus:ring-amber-500 focus:border-transparent outline-none transition-all font-mono">
+                    <div id="globalJoinError" class="text-rose-500 text-xs text-center mt-2 font-bold hidden"></div>
+                </div>
+                
+                <div class="flex gap-3 pt-2">
+                    <button type="button" onclick="hideModal()" class="flex-1 px-4 py-3 bg-slate-100 dark:bg-slate-700 text-slate-700 dark:text-slate-300 font-bold rounded-xl hover:bg-slate-200 transition-colors">
+                        Annuler
+                    </button>
+                    <button type="submit" class="flex-1 px-4 py-3 bg-amber-600 text-white font-bold rounded-xl hover:bg-amber-700 shadow-lg shadow-amber-500/30 transition-all hover:-translate-y-0.5">
+                        Rejoindre
+                    </button>
+                </div>
+            </form>
+        </div>
+    `);
+
+    // Handle the form submit
+    document.getElementById('globalJoinForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+        const formData = new FormData(e.target);
+        const data = Object.fromEntries(formData);
+        const errorDiv = document.getElementById('globalJoinError');
+        
+        try {
+            // Ensure you have this route: @projects_bp.route('/join_by_code', methods=['POST'])
+            // Or reuse existing logic if you can find the project ID first. 
+            // A dedicated "search and join" route is best here.
+            const result = await apiCall('/projects/search_and_join', {
+                method: 'POST',
+                body: JSON.stringify(data)
+            });
+            
+            if (result.success) {
+                hideModal();
+                showToast('Projet rejoint avec succès !', 'success');
+                // Reload to see the new project
+                setTimeout(() => window.location.reload(), 1000);
+            } else {
+                errorDiv.textContent = result.message || 'Code invalide ou projet introuvable';
+                errorDiv.classList.remove('hidden');
+            }
+        } catch (error) {
+            errorDiv.textContent = 'Erreur de connexion';
+            errorDiv.classList.remove('hidden');
+        }
+    });
+}
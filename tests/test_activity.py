@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+
+from services.activity import get_actor, set_actor
+from services.firestore_service import FirestoreService
+from services.models import Project
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def get(self, field):
+        return self._data[field]
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Activity query stand-in: audience filter, newest first, start_after cursor and limit"""
+
+    def __init__(self, events, user_id=None, after=None, limit=None):
+        self.events = events
+        self.user_id = user_id
+        self.after = after
+        self.limit_value = limit
+
+    def where(self, field, op, value):
+        return FakeQuery(self.events, value, self.after, self.limit_value)
+
+    def order_by(self, field, direction=None):
+        return self
+
+    def start_after(self, values):
+        return FakeQuery(self.events, self.user_id, (values['created_at'], values['__name__']), self.limit_value)
+
+    def limit(self, count):
+        return FakeQuery(self.events, self.user_id, self.after, count)
+
+    def stream(self):
+        docs = sorted(((event['created_at'], event_id) for event_id, event in self.events.items()
+                       if self.user_id in event['audience']), reverse=True)
+        if self.after:
+            docs = [key for key in docs if key < tuple(self.after)]
+        return iter(FakeDoc(event_id, self.events[event_id]) for _, event_id in docs[:self.limit_value])
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, name, events):
+        super().__init__(events)
+        self.name = name
+
+    def document(self, doc_id=None):
+        return (self.name, doc_id)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append(('set', ref, data))
+
+    def update(self, ref, data):
+        self.writes.append(('update', ref, data))
+
+    def commit(self):
+        self.db.committed.append(self.writes)
+
+
+class FakeDb:
+    def __init__(self, events=None):
+        self.events = events or {}
+        self.committed = []
+
+    def collection(self, name):
+        return FakeCollection(name, self.events)
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    events = {
+        f'e{i}': {'action': 'task_created', 'project_id': 'p1', 'audience': ['u1', 'u2'] if i % 2 else ['u2'],
+                  'created_at': datetime(2024, 6, 30, 8, i), 'title': f'Task {i}'}
+        for i in range(7)
+    }
+    db = FakeDb(events)
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: db))
+    monkeypatch.setattr(FirestoreService, 'get_project',
+                        staticmethod(lambda project_id: Project(id=project_id, name='P', members=['u1', 'u2', 'u1'])))
+    yield db
+    set_actor(None)
+
+
+def test_event_is_addressed_to_the_members_and_records_the_actor(db):
+    set_actor('u1')
+    ref, event = FirestoreService._activity(db, 'task_moved', 'p1', target_id='t1', old_status='todo',
+                                            new_status=None)
+    assert ref == ('activity', None)
+    assert event['audience'] == ['u1', 'u2'] and event['project_name'] == 'P'
+    assert event['actor'] == 'u1' and event['target_id'] == 't1' and event['old_status'] == 'todo'
+    assert 'new_status' not in event
+
+
+def test_actor_defaults_to_none_outside_requests():
+    assert get_actor() is None
+
+
+def test_event_is_committed_with_its_mutation(db):
+    FirestoreService._write_with_activity(db, lambda batch: batch.update(('projects', 'p1'), {'name': 'Q'}),
+                                          'project_updated', 'p1', actor='u2')
+    (update, event), = db.committed
+    assert update == ('update', ('projects', 'p1'), {'name': 'Q'})
+    assert event[0] == 'set' and event[2]['action'] == 'project_updated' and event[2]['actor'] == 'u2'
+
+
+def test_feed_pages_through_the_user_events(db):
+    events, cursor = FirestoreService.get_activity_feed('u1', page_size=2)
+    assert [event.id for event in events] == ['e5', 'e3']
+    events, cursor = FirestoreService.get_activity_feed('u1', page_size=2, cursor=cursor)
+    assert [event.id for event in events] == ['e1'] and cursor is None
+    assert len(FirestoreService.get_activity_feed('u2', page_size=10)[0]) == 7
+
+
+def test_feed_rejects_a_bad_cursor(db):
+    with pytest.raises(ValueError):
+        FirestoreService.get_activity_feed('u1', cursor='not-a-cursor')
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from services.archive import TaskArchiver
+from services.firestore_service import FirestoreService
+from services.models import Task
+
+
+def task(task_id, project_id):
+    task = Task.from_dict(task_id, {'title': task_id, 'status': 'done'})
+    task.project_id = project_id
+    return task
+
+
+def fake_service(monkeypatch, batches):
+    calls = []
+
+    def archivable(cutoff, project_id=None, limit=200):
+        return batches.pop(0) if batches else []
+
+    def archive(project_id, task_ids, cutoff):
+        calls.append((project_id, list(task_ids)))
+        return len(task_ids)
+
+    monkeypatch.setattr(FirestoreService, 'get_archivable_tasks', staticmethod(archivable))
+    monkeypatch.setattr(FirestoreService, 'archive_tasks', staticmethod(archive))
+    return calls
+
+
+def test_tasks_are_archived_per_project_in_batches(monkeypatch):
+    calls = fake_service(monkeypatch, [
+        [task('t1', 'p1'), task('t2', 'p2'), task('t3', 'p1')],
+        [task('t4', 'p2')],
+    ])
+    archiver = TaskArchiver(after_days=30, batch_size=3)
+    report = archiver.run()
+    assert calls == [('p1', ['t1', 't3']), ('p2', ['t2']), ('p2', ['t4'])]
+    assert report == {'archived': 4, 'batches': 2, 'projects': 2}
+    assert archiver.stats() == {'after_days': 30, 'runs': 1, 'archived': 4}
+
+
+def test_tasks_without_a_project_are_not_archived(monkeypatch):
+    calls = fake_service(monkeypatch, [[task('t1', None), task('t2', 'p1')]])
+    report = TaskArchiver(after_days=30).run()
+    assert calls == [('p1', ['t2'])]
+    assert report['archived'] == 1 and report['projects'] == 1
+
+
+def test_archive_tasks_ignores_a_missing_project(monkeypatch):
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: None))
+    assert FirestoreService.archive_tasks(None, ['t1'], datetime.utcnow()) == 0
+
+
+def test_disabled_without_a_delay():
+    assert not TaskArchiver().enabled
+    assert TaskArchiver(after_days=1).enabled
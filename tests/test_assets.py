@@ -0,0 +1,63 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from flask import Flask, render_template_string
+
+import build_assets
+from routes.assets import assets_bp, init_assets
+
+SCRIPT = b'console.log("board");\n' * 50
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    static = tmp_path / 'static'
+    (static / 'js').mkdir(parents=True)
+    (static / 'js' / 'board.js').write_bytes(SCRIPT)
+    monkeypatch.setattr(build_assets, 'STATIC_DIR', str(static))
+    monkeypatch.setattr(build_assets, 'DIST_DIR', str(static / 'dist'))
+    build_assets.build()
+
+    app = Flask(__name__, static_folder=str(static))
+    init_assets(app)
+    app.register_blueprint(assets_bp, url_prefix='/assets')
+    return app
+
+
+def test_build_writes_hashed_and_precompressed_variants(app, tmp_path):
+    dist = tmp_path / 'static' / 'dist'
+    manifest = json.loads((dist / 'manifest.json').read_text())
+    hashed = manifest['js/board.js']
+    assert hashed == f'js/board.{build_assets.fingerprint(SCRIPT)}.js'
+    assert (dist / hashed).read_bytes() == SCRIPT
+    assert gzip.decompress((dist / (hashed + '.gz')).read_bytes()) == SCRIPT
+    assert brotli.decompress((dist / (hashed + '.br')).read_bytes()) == SCRIPT
+
+
+def test_asset_url_points_to_the_hashed_file(app):
+    with app.test_request_context():
+        url = render_template_string("{{ asset_url_for('static', filename='js/board.js') }}")
+        assert url == '/assets/js/board.' + build_assets.fingerprint(SCRIPT) + '.js'
+        assert render_template_string("{{ asset_url_for('static', filename='missing.js') }}") == \
+            '/static/missing.js'
+
+
+@pytest.mark.parametrize('accept, encoding, decode', [
+    ('br, gzip', 'br', brotli.decompress),
+    ('gzip', 'gzip', gzip.decompress),
+    ('identity', None, lambda body: body),
+])
+def test_precompressed_variant_is_served(app, accept, encoding, decode):
+    url = '/assets/js/board.' + build_assets.fingerprint(SCRIPT) + '.js'
+    response = app.test_client().get(url, headers={'Accept-Encoding': accept})
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    assert decode(response.get_data()) == SCRIPT
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.vary.as_set() == {'accept-encoding'}
+
+
+def test_unknown_asset_is_not_found(app):
+    assert app.test_client().get('/assets/js/nope.js').status_code == 404
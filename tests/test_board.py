@@ -0,0 +1,115 @@
+from google.cloud.firestore import DELETE_FIELD
+
+from services.board import (CARDS_PER_CHUNK, MAX_CHUNK_BYTES, card_from, chunk_count, chunk_id, chunk_of, is_usable,
+                            size_of, tasks_from)
+from services.firestore_service import FirestoreService
+
+
+def cards(n, **fields):
+    return {f'task{i}': {'title': f'Task {i}', 'status': 'todo', 'created_at': i, **fields} for i in range(n)}
+
+
+def split(project_id, all_cards, chunks):
+    """Chunk documents of a board, as a rebuild lays them out"""
+    documents = [{'cards': {}} for _ in range(chunks)]
+    for task_id, card in all_cards.items():
+        documents[chunk_of(task_id, chunks)]['cards'][task_id] = card
+    return documents
+
+
+def test_chunk_ids():
+    assert chunk_id('p1', 0) == 'p1'
+    assert chunk_id('p1', 2) == 'p1_2'
+
+
+def test_chunk_of_is_stable_and_in_range():
+    assert chunk_of('abc', 4) == chunk_of('abc', 4)
+    assert {chunk_of(f'task{i}', 4) for i in range(200)} == {0, 1, 2, 3}
+    assert chunk_of('abc', 1) == 0
+
+
+def test_card_keeps_only_board_fields():
+    assert card_from({'title': 'A', 'status': 'done', 'members': ['u1'], 'reminder_sent': True}) == \
+        {'title': 'A', 'status': 'done'}
+    assert card_from({'members': ['u1']}) == {}
+
+
+def test_chunk_count_leaves_room_to_grow():
+    assert chunk_count({}) == 1
+    assert chunk_count(cards(10)) == 1
+    assert chunk_count(cards(CARDS_PER_CHUNK)) == 2
+    # Large cards are split by size, not only by count
+    assert chunk_count(cards(50, description='x' * 10000)) > 1
+
+
+def test_is_usable():
+    assert is_usable({'chunks': 1, 'count': 10, 'sizes': {'0': 1000}})
+    assert not is_usable(None)
+    assert not is_usable({})
+    assert not is_usable({'chunks': 1, 'count': 10, 'sizes': {'0': 1000}, 'stale': True})
+    assert not is_usable({'chunks': 1, 'count': CARDS_PER_CHUNK + 1, 'sizes': {'0': 1000}})
+    # Built before sizes were tracked, or grown past the size limit
+    assert not is_usable({'chunks': 1, 'count': 10})
+    assert not is_usable({'chunks': 2, 'count': 10, 'sizes': {'0': 1000, '1': MAX_CHUNK_BYTES + 1}})
+
+
+class FakeDb:
+    """Firestore client stand-in whose document references are (collection, id) tuples"""
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self, document_id):
+        return (self.name, document_id)
+
+
+def test_board_writes_grow_the_tracked_chunk_sizes():
+    head = {'chunks': 2, 'count': 1, 'sizes': {'0': 10, '1': 10}}
+    card = {'title': 'A', 'status': 'todo'}
+    writes = dict(FirestoreService._board_writes(FakeDb(), 'p1', head, {'task1': card}, count_delta=1))
+    index = chunk_of('task1', 2)
+    assert writes[('boards', chunk_id('p1', index))]['cards'] == {'task1': card}
+    head_write = writes[('boards', 'p1')]
+    assert head_write['count'].value == 1
+    assert head_write['sizes'][str(index)].value == size_of({'task1': card})
+
+
+def test_board_writes_do_not_grow_sizes_on_removal():
+    head = {'chunks': 1, 'count': 1, 'sizes': {'0': 10}}
+    writes = dict(FirestoreService._board_writes(FakeDb(), 'p1', head, {'task1': None}, count_delta=-1))
+    assert writes[('boards', 'p1')]['cards'] == {'task1': DELETE_FIELD}
+    assert 'sizes' not in writes[('boards', 'p1')]
+
+
+def test_board_writes_mark_the_board_stale_instead_of_outgrowing_a_chunk():
+    head = {'chunks': 1, 'count': 1, 'sizes': {'0': MAX_CHUNK_BYTES - 100}}
+    card = {'title': 'A', 'description': 'x' * 1000}
+    writes = FirestoreService._board_writes(FakeDb(), 'p1', head, {'task1': card})
+    assert writes == [(('boards', 'p1'), {'stale': True})]
+
+
+def test_tasks_from_merges_chunks_newest_first():
+    all_cards = cards(50)
+    tasks = tasks_from('p1', split('p1', all_cards, 3))
+    assert [task.id for task in tasks] == [f'task{i}' for i in reversed(range(50))]
+    assert all(task.project_id == 'p1' for task in tasks)
+    assert tasks[0].title == 'Task 49' and tasks[0].status == 'todo'
+
+
+def test_tasks_from_ignores_cards_left_in_the_wrong_chunk():
+    documents = split('p1', cards(20), 2)
+    # A card left over from an older layout, in a chunk that no longer owns it
+    owner = chunk_of('task3', 2)
+    documents[1 - owner]['cards']['task3'] = {'title': 'stale', 'status': 'done', 'created_at': 3}
+    tasks = tasks_from('p1', documents)
+    assert len(tasks) == 20
+    assert next(task for task in tasks if task.id == 'task3').title == 'Task 3'
+
+
+def test_tasks_from_handles_empty_chunks():
+    assert tasks_from('p1', [{}, {'cards': None}]) == []
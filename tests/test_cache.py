@@ -0,0 +1,87 @@
+from services import cache as cache_module
+from services import firestore_service
+from services.cache import LRUCache
+from services.firestore_service import FirestoreService
+from services.models import Project
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_byte_budget_evicts_and_skips_oversized_values():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set('a', 'xxxx')
+    cache.set('b', 'yyyy')
+    cache.set('c', 'zzzz')
+    assert cache.get('a') is None and cache.get('c') == 'zzzz'
+    assert cache.stats()['bytes'] == 8
+    cache.set('d', 'x' * 11)
+    assert cache.get('d') is None and cache.get('b') == 'yyyy'
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    cache = LRUCache(ttl=30)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=60)
+    clock.now += 31
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    clock.now += 30
+    assert cache.get('b') is None
+    assert len(cache) == 0
+
+
+def test_stats_and_delete_where():
+    cache = LRUCache()
+    cache.set(('u1', 'p1'), True)
+    cache.set(('u2', 'p1'), True)
+    cache.set(('u1', 'p2'), False)
+    cache.get(('u1', 'p1'))
+    cache.get('missing')
+    assert cache.delete_where(lambda key: key[1] == 'p1') == 2
+    assert cache.delete(('u1', 'p2'))
+    assert not cache.delete(('u1', 'p2'))
+    stats = cache.stats()
+    assert stats['entries'] == 0 and stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_ratio'] == 0.5
+
+
+def test_set_skips_a_value_loaded_before_an_invalidation():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.delete('a')  # a write invalidates the key while it is being loaded
+    cache.set('a', 'stale', generation=generation)
+    assert cache.get('a') is None
+    cache.set('a', 'fresh', generation=cache.generation)
+    assert cache.get('a') == 'fresh'
+
+
+def test_get_project_does_not_cache_a_read_raced_by_a_write(monkeypatch):
+    monkeypatch.setattr(firestore_service, 'document_cache', LRUCache())
+
+    def load(project_id):
+        project = Project(id=project_id, name='old', version=1)
+        firestore_service.document_cache.delete(('project', project_id))
+        return project
+
+    monkeypatch.setattr(FirestoreService, '_load_project', staticmethod(load))
+    assert FirestoreService.get_project('p1').name == 'old'
+    assert firestore_service.document_cache.get(('project', 'p1')) is None
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timezone
+
+from services.calendar_feed import CalendarFeeds, _escape, _fold, due_day, render_event
+from services.models import Project, Task
+
+DUE = int(datetime(2026, 10, 20, 23, 30, tzinfo=timezone.utc).timestamp())
+
+
+def unfold(text):
+    return text.replace('\r\n ', '')
+
+
+def test_escape_special_characters():
+    assert _escape('a,b;c\\d') == 'a\\,b\\;c\\\\d'
+    assert _escape('ligne 1\r\nligne 2\nligne 3') == 'ligne 1\\nligne 2\\nligne 3'
+
+
+def test_short_lines_are_not_folded():
+    line = 'SUMMARY:' + 'x' * 67
+    assert _fold(line) == line
+
+
+def test_long_lines_fold_at_75_octets():
+    line = 'DESCRIPTION:' + 'x' * 200
+    folded = _fold(line)
+    parts = folded.split('\r\n')
+    assert len(parts[0].encode('utf-8')) == 75
+    assert all(part.startswith(' ') and len(part.encode('utf-8')) <= 75 for part in parts[1:])
+    assert unfold(folded) == line
+
+
+def test_folding_never_splits_a_multibyte_character():
+    line = 'SUMMARY:' + 'é' * 100
+    folded = _fold(line)
+    for part in folded.split('\r\n'):
+        part.encode('utf-8').decode('utf-8')
+        assert len(part.encode('utf-8')) <= 75
+    assert unfold(folded) == line
+
+
+def test_event_is_an_all_day_event_on_the_utc_due_day():
+    task = Task(id='t1', title='Livraison, v2', description='Voir; notes', due_date=DUE, updated_at=DUE - 3600)
+    assert due_day(task) == date(2026, 10, 20)
+    event = render_event(task)
+    assert event.startswith('BEGIN:VEVENT\r\n') and event.endswith('END:VEVENT\r\n')
+    assert 'UID:t1@taskflow\r\n' in event
+    assert 'DTSTART;VALUE=DATE:20261020\r\n' in event
+    assert 'DTEND;VALUE=DATE:20261021\r\n' in event
+    assert 'SUMMARY:Livraison\\, v2\r\n' in event
+    assert 'DESCRIPTION:Voir\\; notes\r\n' in event
+    assert 'LAST-MODIFIED:20261020T223000Z\r\n' in event
+
+
+def test_done_tasks_are_marked():
+    event = render_event(Task(id='t1', title='Fini', status='done', due_date=DUE))
+    assert 'SUMMARY:✔ Fini\r\n' in event
+
+
+def test_incremental_update_replaces_and_removes_events():
+    feeds = CalendarFeeds()
+    feed = feeds._build([Task(id='t1', title='A', due_date=DUE, updated_at=10),
+                         Task(id='t2', title='B', updated_at=20)])
+    assert set(feed['events']) == {'t1'} and feed['task_ids'] == {'t1', 't2'}
+    assert feed['watermark'] == 20 and feeds.builds == 1
+
+    updated = CalendarFeeds._apply(feed, [Task(id='t1', title='A2', updated_at=30),
+                                          Task(id='t2', title='B2', due_date=DUE, updated_at=40)])
+    assert set(updated['events']) == {'t2'} and updated['watermark'] == 40
+    # The previous feed is left untouched (it may still be served)
+    assert set(feed['events']) == {'t1'}
+
+
+def test_document_wraps_the_events():
+    body = CalendarFeeds._document(Project(id='p1', name='Site, v2'), [render_event(Task(id='t1', title='A', due_date=DUE))])
+    lines = unfold(body).split('\r\n')
+    assert lines[0] == 'BEGIN:VCALENDAR' and lines[-2] == 'END:VCALENDAR' and lines[-1] == ''
+    assert 'X-WR-CALNAME:Site\\, v2' in lines
+    assert lines.count('BEGIN:VEVENT') == 1
@@ -0,0 +1,103 @@
+import gzip
+import zlib
+
+import brotli
+import pytest
+from flask import Flask, Response
+
+from middleware import compression
+from middleware.compression import compress_stream, init_compression
+
+RULE = {'min_size': 100, 'gzip_level': 6, 'brotli_quality': 5}
+DECODERS = {'gzip': gzip.decompress, 'br': brotli.decompress}
+
+
+def rows(count):
+    return [f'{i},Task {i},todo\n'.encode('utf-8') for i in range(count)]
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_stream_round_trip(encoding):
+    chunks = rows(2000)
+    body = b''.join(compress_stream(iter(chunks), encoding, RULE))
+    assert DECODERS[encoding](body) == b''.join(chunks)
+
+
+def test_stream_flushes_by_size_not_per_chunk():
+    parts = list(compress_stream(iter(rows(2000)), 'gzip', dict(RULE, stream_flush_bytes=8192)))
+    raw = sum(len(row) for row in rows(2000))
+    # One part per flush (plus the final one), not one per row
+    assert len(parts) <= raw // 8192 + 2
+    assert gzip.decompress(b''.join(parts)) == b''.join(rows(2000))
+
+
+def test_stream_flushes_after_the_interval(monkeypatch):
+    clock = iter(range(0, 1000, 2))
+    monkeypatch.setattr(compression.time, 'monotonic', lambda: next(clock))
+    parts = list(compress_stream(iter([b'a', b'b']), 'gzip', RULE))
+    # Every chunk is old enough to be flushed: the client sees it at once
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(parts[0]) == b'a'
+
+
+def test_stream_accepts_text_and_closes_the_source():
+    closed = []
+
+    def source():
+        try:
+            yield 'é,'
+            yield 'done'
+        finally:
+            closed.append(True)
+
+    body = b''.join(compress_stream(source(), 'gzip', RULE))
+    assert gzip.decompress(body) == 'é,done'.encode('utf-8')
+    assert closed == [True]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['COMPRESSION_RULES'] = {'text/html': RULE, 'text/csv': RULE}
+    init_compression(app)
+
+    @app.route('/page')
+    def page():
+        return '<p>' + 'x' * 500 + '</p>'
+
+    @app.route('/small')
+    def small():
+        return 'tiny'
+
+    @app.route('/export')
+    def export():
+        return Response((row for row in rows(500)), mimetype='text/csv')
+
+    @app.route('/image')
+    def image():
+        return Response(b'x' * 500, mimetype='image/png')
+
+    return app
+
+
+def test_response_is_compressed_with_the_preferred_encoding(app):
+    client = app.test_client()
+    response = client.get('/page', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == ('<p>' + 'x' * 500 + '</p>').encode()
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert client.get('/page', headers={'Accept-Encoding': 'gzip'}).headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_unlisted_or_unaccepted_responses_are_left_alone(app):
+    client = app.test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/image', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/page', headers={'Accept-Encoding': 'identity'}).headers
+
+
+def test_streamed_response_is_compressed_without_a_length(app):
+    response = app.test_client().get('/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.get_data()) == b''.join(rows(500))
@@ -0,0 +1,122 @@
+import pytest
+from flask import Flask, session
+
+from routes.projects import _not_modified_page, _not_modified_response, _project_validators, _with_validators
+from services.firestore_service import FirestoreService
+from services.models import Project
+
+UPDATED_AT = 1700000000
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    return app
+
+
+@pytest.fixture
+def validators():
+    return _project_validators(Project(id='p1', updated_at=UPDATED_AT), '3.1700000000.0', 'board', 'u1')
+
+
+def test_etag_depends_on_version_and_variant(validators):
+    project = Project(id='p1', updated_at=UPDATED_AT)
+    etag, last_modified = validators
+    assert _project_validators(project, '3.1700000000.0', 'board', 'u1')[0] == etag
+    assert _project_validators(project, '4.1700000000.0', 'board', 'u1')[0] != etag
+    assert _project_validators(project, '3.1700000000.0', 'board', 'u2')[0] != etag
+    assert _project_validators(project, '3.1700000000.0', 'overview', 'u1')[0] != etag
+    assert last_modified.timestamp() == UPDATED_AT
+
+
+def test_matching_etag_is_not_modified(app, validators):
+    etag, _ = validators
+    with app.test_request_context(headers={'If-None-Match': f'"{etag}"'}):
+        response = _not_modified_response(validators)
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{etag}"'
+    assert response.cache_control.no_cache and response.cache_control.private
+
+
+def test_other_etag_is_modified(app, validators):
+    with app.test_request_context(headers={'If-None-Match': '"stale"'}):
+        assert _not_modified_response(validators) is None
+
+
+def test_weak_etag_of_compressed_response_matches(app, validators):
+    etag, _ = validators
+    with app.test_request_context(headers={'If-None-Match': f'W/"{etag}"'}):
+        assert _not_modified_response(validators).status_code == 304
+
+
+def test_without_conditional_headers_is_modified(app, validators):
+    with app.test_request_context():
+        assert _not_modified_response(validators) is None
+
+
+def test_page_with_pending_flashes_is_rendered(app, validators):
+    etag, _ = validators
+    with app.test_request_context(headers={'If-None-Match': f'"{etag}"'}):
+        assert _not_modified_page(validators).status_code == 304
+        session['_flashes'] = [('success', 'Projet créé')]
+        assert _not_modified_page(validators) is None
+
+
+class FakeSnapshot:
+    def __init__(self, path, data):
+        self.reference = FakeRef(path)
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+
+class FakeRef:
+    def __init__(self, path):
+        self.path = path
+
+
+class FakeDb:
+    """Firestore stand-in answering get_all from a dict of document paths"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.reads = []
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+    def get_all(self, refs, field_paths=None):
+        self.reads.append([ref.path for ref in refs])
+        return [FakeSnapshot(ref.path, self.documents.get(ref.path)) for ref in refs]
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self, document_id):
+        return FakeRef(f'{self.name}/{document_id}')
+
+
+def test_page_versions_are_read_in_one_round_trip(monkeypatch):
+    db = FakeDb({'projects/p1': {'version': 3, 'updated_at': UPDATED_AT},
+                 'users/u1': {'invites_version': 2}})
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: db))
+    project = Project(id='p1', version=3, updated_at=UPDATED_AT)
+    version, invites_version = FirestoreService.get_page_versions(project, 'u1')
+    assert version.startswith(f'3.{UPDATED_AT}.') and invites_version == 2
+    assert db.reads == [['projects/p1', 'users/u1']]
+    # A user whose invitations never changed has no stamp yet
+    assert FirestoreService.get_page_versions(project, 'u2')[1] == 0
+    assert FirestoreService.get_project_version(project) == version
+
+
+def test_with_validators_sets_revalidation_headers(app, validators):
+    etag, _ = validators
+    response = _with_validators(app.response_class('body'), validators)
+    assert response.get_etag() == (etag, False)
+    assert response.last_modified.timestamp() == UPDATED_AT
+    assert response.cache_control.no_cache and response.cache_control.private
@@ -0,0 +1,63 @@
+from services import firestore_service
+from services.cache import LRUCache
+from services.firestore_service import FirestoreService
+
+
+class FakeQuery:
+    """Query stand-in recording its collection and equality filters"""
+
+    def __init__(self, collection, filters=()):
+        self.collection = collection
+        self.filters = filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.collection, self.filters + ((field, op, value),))
+
+
+class FakeDb:
+    def collection(self, name):
+        return FakeQuery(name)
+
+
+COUNTS = {
+    ('projects', ()): 3,
+    ('tasks', ()): 12,
+    ('tasks', (('due_state', '==', 'overdue'),)): 2,
+    ('tasks', (('status', '==', 'todo'),)): 5,
+    ('tasks', (('status', '==', 'in_progress'),)): 3,
+    ('tasks', (('status', '==', 'done'),)): 3,
+}
+
+
+def fake_db(monkeypatch, calls):
+    def count(query):
+        calls.append(query)
+        return COUNTS[(query.collection, query.filters)]
+
+    monkeypatch.setattr(firestore_service, '_stats_cache', LRUCache())
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(FakeDb))
+    monkeypatch.setattr(FirestoreService, '_count', staticmethod(count))
+    monkeypatch.setattr(FirestoreService, '_sum', staticmethod(lambda query, field: 4))
+
+
+def test_dashboard_stats_come_from_aggregations(monkeypatch):
+    fake_db(monkeypatch, [])
+    stats = FirestoreService.get_dashboard_stats()
+    assert stats == {
+        'total_projects': 3,
+        # One task with an unknown status counts in the total only; 4 are archived
+        'total_tasks': 16,
+        'overdue_tasks': 2,
+        'status_distribution': {'todo': 5, 'in_progress': 3, 'done': 7}
+    }
+
+
+def test_dashboard_stats_are_cached_when_asked(monkeypatch):
+    calls = []
+    fake_db(monkeypatch, calls)
+    first = FirestoreService.get_dashboard_stats(cache_ttl=30)
+    queries = len(calls)
+    assert FirestoreService.get_dashboard_stats(cache_ttl=30) == first
+    assert len(calls) == queries
+    FirestoreService.get_dashboard_stats()
+    assert len(calls) == 2 * queries
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+
+from services.due_dates import DAY, DueDateScheduler, classify_due
+from services.firestore_service import FirestoreService
+from services.models import Project, Task
+
+NOW = 1_700_000_000
+
+
+@pytest.mark.parametrize('days_left, state', [
+    (-1, 'overdue'),
+    (0.5, 'due_soon'),
+    (1, 'due_soon'),
+    (2, 'upcoming'),
+    (3, 'approaching'),
+    (4, None),
+])
+def test_badge_tiers(days_left, state):
+    assert classify_due(int(NOW + days_left * DAY), 'todo', NOW) == state
+
+
+def test_done_and_undated_tasks_have_no_state():
+    assert classify_due(NOW - DAY, 'done', NOW) is None
+    assert classify_due(None, 'todo', NOW) is None
+
+
+def due_soon_task(task_id):
+    task = Task.from_dict(task_id, {'title': task_id, 'status': 'todo', 'due_state': 'due_soon'})
+    task.project_id = 'p1'
+    task.due_date = NOW + DAY // 2
+    return task
+
+
+@pytest.fixture
+def service(monkeypatch):
+    written = []
+    monkeypatch.setattr(FirestoreService, 'get_due_date_candidates',
+                        staticmethod(lambda horizon, project_id=None: [due_soon_task('t1')]))
+    monkeypatch.setattr(FirestoreService, 'get_project',
+                        staticmethod(lambda project_id: Project(id=project_id, name='A', members=['u1'])))
+    monkeypatch.setattr(FirestoreService, 'update_due_states',
+                        staticmethod(lambda *args: written.append(args)))
+    monkeypatch.setattr(FirestoreService, 'get_users_by_ids',
+                        staticmethod(lambda ids: [{'email': 'u1@example.com'}]))
+    monkeypatch.setattr('services.due_dates.time.time', lambda: NOW)
+    return written
+
+
+def test_refresh_writes_changed_flags_and_counts(service):
+    report = DueDateScheduler().refresh()
+    assert report == {'projects': 1, 'flags_written': 0, 'reminders_queued': 0}
+    assert service == [('p1', {}, 0, 1)]
+
+
+def test_reminders_are_not_queued_without_mail(service, monkeypatch, caplog):
+    monkeypatch.delenv('SMTP_EMAIL', raising=False)
+    monkeypatch.delenv('SMTP_PASSWORD', raising=False)
+    scheduler = DueDateScheduler()
+    with caplog.at_level(logging.WARNING, logger='services.due_dates'):
+        for _ in range(2):
+            assert scheduler.refresh(send_reminders=True)['reminders_queued'] == 0
+    assert scheduler.outbox_depth == 0
+    # Warned once, not on every sweep
+    assert len(caplog.records) == 1
+
+
+def test_outbox_is_kept_while_mail_is_not_configured(service, monkeypatch):
+    monkeypatch.setenv('SMTP_EMAIL', 'taskflow@example.com')
+    monkeypatch.setenv('SMTP_PASSWORD', 'secret')
+    scheduler = DueDateScheduler()
+    monkeypatch.setattr(scheduler, 'flush_outbox', lambda: 0)
+    assert scheduler.refresh(send_reminders=True)['reminders_queued'] == 1
+    monkeypatch.delenv('SMTP_PASSWORD')
+    assert DueDateScheduler.flush_outbox(scheduler) == 0
+    assert scheduler.outbox_depth == 1
@@ -0,0 +1,120 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from flask import Flask
+
+from config import Config
+from routes.projects import projects_bp
+from services.firestore_service import FirestoreService
+from services.models import Project, Task
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Query stand-in paging over documents ordered by id, counting the pages read"""
+
+    def __init__(self, docs, pages, page_size=None, after=None):
+        self.docs = docs
+        self.pages = pages
+        self.page_size = page_size
+        self.after = after
+
+    def where(self, field, op, value):
+        return self
+
+    def order_by(self, field):
+        return self
+
+    def limit(self, count):
+        return FakeQuery(self.docs, self.pages, count, self.after)
+
+    def start_after(self, doc):
+        return FakeQuery(self.docs, self.pages, self.page_size, doc.id)
+
+    def stream(self):
+        self.pages.append(self.after)
+        docs = [doc for doc in self.docs if self.after is None or doc.id > self.after]
+        return iter(docs[:self.page_size])
+
+
+class FakeDb:
+    def __init__(self, docs):
+        self.docs = docs
+        self.pages = []
+
+    def collection(self, name):
+        return FakeQuery(self.docs, self.pages)
+
+
+TASKS = [
+    Task(id='t1', project_id='p1', title='Rédiger, relire', status='done', due_date=1719734400, created_at=1719734400),
+    Task(id='t2', project_id='p1', title='Tester', priority='high'),
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.config.update(EXPORT_PAGE_SIZE=500, COMPRESSION_RULES=Config.COMPRESSION_RULES)
+    app.register_blueprint(projects_bp, url_prefix='/projects')
+    monkeypatch.setattr(FirestoreService, 'get_project',
+                        staticmethod(lambda project_id: Project(id=project_id, members=['u1'])))
+    monkeypatch.setattr(FirestoreService, 'has_project_access',
+                        staticmethod(lambda user_id, project: user_id in project.members))
+    monkeypatch.setattr(FirestoreService, 'iter_tasks', staticmethod(lambda project_id, page_size: iter(TASKS)))
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = {'uid': 'u1'}
+    return client
+
+
+def test_csv_export(client):
+    response = client.get('/projects/p1/export')
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="tasks-p1.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['title'] for row in rows] == ['Rédiger, relire', 'Tester']
+    assert rows[0]['due_date'] == '2024-06-30T08:00:00+00:00' and rows[1]['due_date'] == ''
+    assert 'due_state' not in rows[0] and 'reminder_sent' not in rows[0]
+
+
+def test_ndjson_export(client):
+    response = client.get('/projects/p1/export?format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows[1] == {'id': 't2', 'project_id': 'p1', 'title': 'Tester', 'description': '', 'status': 'todo',
+                       'priority': 'high', 'assignee': '', 'due_date': None, 'created_at': None,
+                       'updated_at': None}
+
+
+def test_gzip_download(client):
+    response = client.get('/projects/p1/export?format=ndjson&gzip=1')
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="tasks-p1.ndjson.gz"'
+    assert len(gzip.decompress(response.get_data()).splitlines()) == 2
+
+
+def test_unknown_format_is_refused(client):
+    assert client.get('/projects/p1/export?format=xlsx').status_code == 400
+
+
+def test_iter_tasks_reads_one_page_at_a_time(monkeypatch):
+    db = FakeDb([FakeDoc(f't{i}', {'project_id': 'p1', 'title': str(i)}) for i in range(5)])
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: db))
+    tasks = FirestoreService.iter_tasks('p1', page_size=2)
+    assert next(tasks).id == 't0' and db.pages == [None]
+    assert [task.id for task in tasks] == ['t1', 't2', 't3', 't4']
+    assert db.pages == [None, 't1', 't3']
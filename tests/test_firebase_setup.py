@@ -0,0 +1,74 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import firebase_setup
+
+
+class FakeChannel:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self._transport = SimpleNamespace(grpc_channel=FakeChannel())
+        self.fail = fail
+        self.reads = []
+
+    def collection(self, name):
+        return SimpleNamespace(document=lambda doc_id: SimpleNamespace(get=lambda timeout: self._get(name, timeout)))
+
+    def _get(self, name, timeout):
+        if self.fail:
+            raise RuntimeError('unavailable')
+        self.reads.append((name, timeout))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(firebase_setup, 'db', client)
+    return client
+
+
+def test_release_closes_the_channel(client):
+    assert firebase_setup.release_firestore_client()
+    assert client._transport.grpc_channel.closed and firebase_setup.db is None
+    assert not firebase_setup.release_firestore_client()
+
+
+def test_release_before_the_channel_is_opened(monkeypatch):
+    monkeypatch.setattr(firebase_setup, 'db', SimpleNamespace())
+    assert firebase_setup.release_firestore_client()
+
+
+def test_warm_up_reads_once(client):
+    assert firebase_setup.warm_up_firestore(timeout=2)
+    assert client.reads == [('_warmup', 2)]
+
+
+def test_warm_up_failure_is_not_fatal(monkeypatch):
+    monkeypatch.setattr(firebase_setup, 'db', FakeClient(fail=True))
+    assert not firebase_setup.warm_up_firestore()
+
+
+def test_channel_options_default_when_unset(monkeypatch):
+    monkeypatch.setattr(firebase_setup, '_channel_options', firebase_setup._channel_options)
+    firebase_setup.configure_firestore_client([('grpc.keepalive_time_ms', 1000)])
+    assert firebase_setup._channel_options == (('grpc.keepalive_time_ms', 1000),)
+    firebase_setup.configure_firestore_client(None)
+    assert firebase_setup._channel_options == firebase_setup.DEFAULT_CHANNEL_OPTIONS
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_forked_child_does_not_inherit_the_client(client):
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if firebase_setup.db is None else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert firebase_setup.db is client
@@ -0,0 +1,61 @@
+import pytest
+from flask import Flask, session
+from jinja2 import DictLoader
+
+from services.fragments import get_fragment_cache, init_fragment_cache, render_fragments
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.config.update(FRAGMENT_CACHE_MAX_BYTES=64 * 1024, DEFAULT_LOCALE='fr')
+    app.jinja_loader = DictLoader({
+        'columns.html': '<ul>{% for t in tasks %}<li>{{ t }}</li>{% endfor %}</ul>',
+        'stats.html': '<p>{{ tasks|length }} {{ user|default("") }}</p>',
+    })
+    init_fragment_cache(app)
+
+    @app.context_processor
+    def inject_user():
+        return {'user': session.get('user')}
+
+    return app
+
+
+class Loader:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'tasks': self.tasks}
+
+
+def test_fragments_are_rendered_once_per_key(app):
+    load = Loader(['<a>', 'b'])
+    with app.test_request_context():
+        columns, stats = render_fragments(('p1', '3'), load, 'columns.html', 'stats.html')
+        assert str(columns) == '<ul><li>&lt;a&gt;</li><li>b</li></ul>'
+        assert str(stats) == '<p>2 </p>'
+        assert render_fragments(('p1', '3'), load, 'columns.html', 'stats.html') == [columns, stats]
+    assert load.calls == 1
+
+
+def test_new_version_or_locale_renders_again(app):
+    load = Loader(['a'])
+    with app.test_request_context():
+        render_fragments(('p1', '3'), load, 'columns.html')
+        render_fragments(('p1', '4'), load, 'columns.html')
+        session['locale'] = 'en'
+        render_fragments(('p1', '4'), load, 'columns.html')
+        assert len(get_fragment_cache()) == 3
+    assert load.calls == 3
+
+
+def test_context_processors_do_not_leak_into_shared_fragments(app):
+    with app.test_request_context():
+        session['user'] = 'alice'
+        stats, = render_fragments(('p1', '3'), Loader([]), 'stats.html')
+    assert str(stats) == '<p>0 </p>'
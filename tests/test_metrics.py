@@ -0,0 +1,53 @@
+import pytest
+from flask import Flask
+
+from middleware import metrics
+from services.fragments import init_fragment_cache
+
+TOKEN = 'secret-token'
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(METRICS_ENABLED=True, METRICS_BEARER_TOKEN='', METRICS_ALLOW_UNAUTHENTICATED=False,
+                      METRICS_SYNC_SECONDS=5, FRAGMENT_CACHE_MAX_BYTES=1024)
+    app.config.update(config)
+    init_fragment_cache(app)
+    metrics.init_metrics(app)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+
+@pytest.fixture(autouse=True)
+def single_process(monkeypatch):
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+
+
+def test_disabled_by_default_without_a_token():
+    app = make_app()
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_token_is_required():
+    client = make_app(METRICS_BEARER_TOKEN=TOKEN).test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'}).status_code == 200
+
+
+def test_unauthenticated_access_must_be_explicit():
+    client = make_app(METRICS_ALLOW_UNAUTHENTICATED=True).test_client()
+    assert client.get('/metrics').status_code == 200
+
+
+def test_requests_and_cache_counters_are_exported():
+    client = make_app(METRICS_BEARER_TOKEN=TOKEN).test_client()
+    client.get('/ping')
+    body = client.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'}).get_data(as_text=True)
+    assert 'taskflow_http_request_duration_seconds_count{endpoint="ping",method="GET",status="200"}' in body
+    assert 'taskflow_cache_hits_total{cache="document"}' in body
+    assert 'taskflow_cache_hit_ratio{cache="document"}' in body
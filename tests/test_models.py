@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.models import Project, Task, epoch_to_datetime, to_epoch
+
+EPOCH = 1719734400  # 2024-06-30T08:00:00Z
+
+
+class FirestoreTimestamp:
+    seconds = EPOCH
+    nanos = 500
+
+
+@pytest.mark.parametrize('value', [
+    datetime(2024, 6, 30, 8),
+    datetime(2024, 6, 30, 10, tzinfo=timezone(timedelta(hours=2))),
+    '2024-06-30T08:00:00Z',
+    '2024-06-30T10:00:00+02:00',
+    EPOCH,
+    float(EPOCH),
+    FirestoreTimestamp(),
+])
+def test_timestamps_are_normalized_to_utc_epoch(value):
+    assert to_epoch(value) == EPOCH
+
+
+@pytest.mark.parametrize('value', [None, '', 'bientôt', object()])
+def test_missing_or_unparseable_timestamps_are_none(value):
+    assert to_epoch(value) is None
+
+
+def test_epoch_round_trip():
+    assert epoch_to_datetime(EPOCH) == datetime(2024, 6, 30, 8, tzinfo=timezone.utc)
+    assert epoch_to_datetime(None) is None
+
+
+def test_task_from_dict_fills_defaults():
+    task = Task.from_dict('t1', {'title': 'A', 'status': None, 'due_date': '2024-06-30T08:00:00Z',
+                                 'reminder_sent': 1})
+    assert task.status == 'todo' and task.assignee == '' and task.priority is None
+    assert task.due_date == EPOCH and task.reminder_sent is True
+    with pytest.raises(AttributeError):
+        task.unknown = 1  # slotted
+
+
+def test_task_apply_update_converts_timestamps_and_ignores_unknown_fields():
+    task = Task.from_dict('t1', {'title': 'A'})
+    task.apply_update({'status': 'done', 'updated_at': datetime(2024, 6, 30, 8), 'position': 3})
+    assert task.status == 'done' and task.updated_at == EPOCH
+    assert not hasattr(task, 'position')
+
+
+def test_project_from_dict_copies_lists():
+    members = ['u1']
+    project = Project.from_dict('p1', {'name': 'P', 'members': members, 'deadline': datetime(2024, 6, 30, 8)})
+    project.members.append('u2')
+    assert members == ['u1']
+    assert project.deadline == EPOCH and project.version == 0 and project.pending_invites == []
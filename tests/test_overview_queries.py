@@ -0,0 +1,90 @@
+from services import firestore_service
+from services.firestore_service import FirestoreService
+from services.models import Project
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Query stand-in evaluating equality filters, one ordering and a limit over in-memory rows"""
+
+    def __init__(self, rows, filters=(), order=None, limit=None):
+        self.rows = rows
+        self.filters = filters
+        self.order = order
+        self.limit_value = limit
+
+    def where(self, field, op, value):
+        return FakeQuery(self.rows, self.filters + ((field, value),), self.order, self.limit_value)
+
+    def order_by(self, field, direction=None):
+        return FakeQuery(self.rows, self.filters, (field, direction), self.limit_value)
+
+    def limit(self, count):
+        return FakeQuery(self.rows, self.filters, self.order, count)
+
+    def matching(self):
+        return [(doc_id, data) for doc_id, data in self.rows.items()
+                if all(data.get(field) == value for field, value in self.filters)]
+
+    def stream(self):
+        docs = self.matching()
+        field, direction = self.order
+        docs.sort(key=lambda item: item[1][field], reverse=direction == 'DESCENDING')
+        return iter(FakeDoc(doc_id, data) for doc_id, data in docs[:self.limit_value])
+
+
+class FakeDb:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def collection(self, name):
+        return FakeQuery(self.rows)
+
+
+TASKS = {
+    f't{i}': {'project_id': 'p1', 'title': f'Task {i}', 'status': 'done' if i % 3 == 0 else 'todo', 'updated_at': i}
+    for i in range(1, 10)
+}
+TASKS['other'] = {'project_id': 'p2', 'title': 'Other', 'status': 'todo', 'updated_at': 100}
+
+
+def use_db(monkeypatch, archived_count=0):
+    db = FakeDb(TASKS)
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: db))
+    monkeypatch.setattr(FirestoreService, '_count', staticmethod(lambda query: len(query.matching())))
+    monkeypatch.setattr(FirestoreService, 'get_project',
+                        staticmethod(lambda project_id: Project(id=project_id, archived_count=archived_count)))
+    monkeypatch.setattr(firestore_service.task_write_buffer, 'flush_group', lambda group: None)
+    return db
+
+
+def test_recent_tasks_are_ordered_and_limited_in_the_query(monkeypatch):
+    use_db(monkeypatch)
+    tasks = FirestoreService.get_recent_tasks('p1', limit=3)
+    assert [task.id for task in tasks] == ['t9', 't8', 't7']
+
+
+def test_completion_stats_come_from_counts(monkeypatch):
+    use_db(monkeypatch)
+    assert FirestoreService.get_task_completion_stats('p1') == {
+        'total_tasks': 9, 'completed_tasks': 3, 'completion_percentage': 33.3, 'pending_tasks': 6
+    }
+
+
+def test_completion_stats_include_archived_tasks(monkeypatch):
+    use_db(monkeypatch, archived_count=3)
+    stats = FirestoreService.get_task_completion_stats('p1')
+    assert stats['total_tasks'] == 12 and stats['completed_tasks'] == 6 and stats['completion_percentage'] == 50.0
+
+
+def test_completion_stats_of_an_empty_project(monkeypatch):
+    use_db(monkeypatch)
+    assert FirestoreService.get_task_completion_stats('empty')['completion_percentage'] == 0
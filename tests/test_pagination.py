@@ -0,0 +1,109 @@
+import base64
+from datetime import datetime, timezone
+
+import pytest
+
+from routes.projects import _parse_deadline
+from services.firestore_service import FirestoreService
+from services.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trip_keeps_datetimes_at_full_precision():
+    values = [0, datetime(2026, 10, 19, 3, 4, 5, 123456, tzinfo=timezone.utc), 'project-id']
+    assert decode_cursor(encode_cursor(values), 3) == values
+
+
+def test_round_trip_of_plain_values():
+    values = [1, None, 'abc']
+    assert decode_cursor(encode_cursor(values), 3) == values
+    assert decode_cursor(encode_cursor(['Étude', 'x']), 2) == ['Étude', 'x']
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(['?&/+=' * 10, 'é'])
+    assert all(c.isalnum() or c in '-_' for c in cursor)
+
+
+def test_unsupported_values_are_refused():
+    with pytest.raises(TypeError):
+        encode_cursor([object()])
+
+
+@pytest.mark.parametrize('cursor', ['', 'not a cursor', '!!!', encode_cursor([1, 2]), encode_cursor([1, 2, 3, 4])])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 3)
+
+
+def test_cursor_that_is_not_a_list_is_refused():
+    cursor = base64.urlsafe_b64encode(b'{"a": 1}').decode().rstrip('=')
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 1)
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+
+    def update(self, ref, data):
+        self.db.updates[ref] = data
+
+    def commit(self):
+        pass
+
+
+class FakeDb:
+    def __init__(self, documents):
+        self.documents = documents
+        self.updates = {}
+
+    def collection(self, name):
+        return self
+
+    def stream(self):
+        return [FakeDoc(doc_id, data) for doc_id, data in self.documents.items()]
+
+    def document(self, doc_id):
+        return doc_id
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+def test_backfill_adds_sort_fields_and_converts_string_deadlines(monkeypatch):
+    created = datetime(2024, 1, 2)
+    db = FakeDb({
+        'complete': {'name': 'A', 'deadline': None, 'updated_at': created},
+        'legacy': {'created_at': created},
+        'text': {'name': 'B', 'deadline': '2024-06-30', 'updated_at': created},
+        'garbage': {'name': 'C', 'deadline': 'next week', 'updated_at': created},
+    })
+    invalidated = []
+    monkeypatch.setattr(FirestoreService, '_get_db', staticmethod(lambda: db))
+    monkeypatch.setattr(FirestoreService, '_invalidate_project', staticmethod(invalidated.append))
+
+    assert FirestoreService.backfill_project_sort_fields() == 3
+    assert db.updates == {
+        'legacy': {'deadline': None, 'name': '', 'updated_at': created},
+        'text': {'deadline': datetime(2024, 6, 30, tzinfo=timezone.utc)},
+        'garbage': {'deadline': None},
+    }
+    assert sorted(invalidated) == ['garbage', 'legacy', 'text']
+
+
+def test_project_form_deadlines():
+    assert _parse_deadline('') is None and _parse_deadline(None) is None
+    assert _parse_deadline('2024-06-30') == datetime(2024, 6, 30)
+    assert _parse_deadline('2024-06-30T12:00:00Z') == datetime(2024, 6, 30, 12, tzinfo=timezone.utc)
+    for value in ('next week', 42):
+        with pytest.raises(ValueError):
+            _parse_deadline(value)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from flask import Flask
+
+from middleware import profiler
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # cProfile output, whether or not pyinstrument is installed
+    monkeypatch.setattr(profiler, 'SamplingProfiler', None)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.config.update(PROFILER_ADMIN_UIDS=[], PROFILER_SAMPLE_RATE=1.0, PROFILER_DIR=str(tmp_path),
+                      PROFILER_MAX_FILES=4, PROFILER_MAX_BYTES=10 * 1024 * 1024)
+    profiler.init_profiler(app)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+
+def test_disabled_profiler_registers_no_hook():
+    app = Flask(__name__)
+    app.config.update(PROFILER_ADMIN_UIDS=[], PROFILER_SAMPLE_RATE=0)
+    profiler.init_profiler(app)
+    assert not app.before_request_funcs
+
+
+def test_sampled_request_writes_a_profile(app, tmp_path):
+    response = app.test_client().get('/ping')
+    name = response.headers['X-Profile']
+    assert '-ping-anonymous-' in name
+    assert sorted(os.listdir(tmp_path)) == [name + '.prof', name + '.txt']
+    assert (tmp_path / (name + '.txt')).read_text().startswith('GET /ping? -> 200')
+
+
+def test_oldest_profiles_are_pruned(app, tmp_path):
+    client = app.test_client()
+    names = [client.get('/ping').headers['X-Profile'] for _ in range(4)]
+    # Two files per profile, at most four files kept
+    assert sorted(os.listdir(tmp_path)) == sorted(f'{name}{ext}' for name in names[-2:] for ext in ('.prof', '.txt'))
+
+
+def test_prune_by_size_only_touches_profiles(tmp_path):
+    for index, name in enumerate(['a.prof', 'b.txt', 'c.html']):
+        path = tmp_path / name
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (index, index))
+    (tmp_path / 'notes.md').write_bytes(b'x' * 1000)
+    profiler._prune(str(tmp_path), max_files=10, max_bytes=150)
+    assert sorted(os.listdir(tmp_path)) == ['c.html', 'notes.md']
@@ -0,0 +1,72 @@
+import pytest
+from flask import Flask, jsonify
+
+from routes.auth import project_access_required
+from services import firestore_service
+from services.cache import LRUCache
+from services.firestore_service import FirestoreService
+from services.models import Project
+
+PROJECTS = {'p1': Project(id='p1', created_by='owner', members=['u1'])}
+
+
+@pytest.fixture(autouse=True)
+def access_cache(monkeypatch):
+    cache = LRUCache()
+    monkeypatch.setattr(firestore_service, 'access_cache', cache)
+    monkeypatch.setattr(FirestoreService, 'get_project', staticmethod(PROJECTS.get))
+    monkeypatch.setattr(FirestoreService, 'get_task_project_id', staticmethod(lambda task_id: 'p1'))
+    return cache
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+
+    @app.route('/projects/<project_id>')
+    @project_access_required(api=True)
+    def project_view(project_id, project):
+        return jsonify({'project': project.id})
+
+    @app.route('/tasks/<task_id>')
+    @project_access_required(api=True)
+    def task_view(task_id, project):
+        return jsonify({'task': task_id, 'project': project.id})
+
+    return app.test_client()
+
+
+def login(client, uid):
+    with client.session_transaction() as session:
+        session['user'] = {'uid': uid}
+
+
+def test_owner_and_members_have_access():
+    assert FirestoreService.has_project_access('owner', PROJECTS['p1'])
+    assert FirestoreService.has_project_access('u1', PROJECTS['p1'])
+    assert not FirestoreService.has_project_access('u2', PROJECTS['p1'])
+
+
+def test_decisions_are_cached_until_the_membership_changes(access_cache):
+    project = Project(id='p2', members=['u1'])
+    assert FirestoreService.has_project_access('u1', project)
+    assert not FirestoreService.has_project_access('u2', Project(id='p1'))
+    project.members = []
+    assert FirestoreService.has_project_access('u1', project)  # cached
+    FirestoreService._invalidate_access('p2')
+    assert not FirestoreService.has_project_access('u1', project)
+    assert access_cache.get(('u2', 'p1')) is False  # other projects are kept
+
+
+def test_decorator_passes_the_project_to_the_view(client):
+    login(client, 'u1')
+    assert client.get('/projects/p1').get_json() == {'project': 'p1'}
+    assert client.get('/tasks/t1').get_json() == {'task': 't1', 'project': 'p1'}
+
+
+def test_decorator_rejects_anonymous_outsiders_and_unknown_projects(client):
+    assert client.get('/projects/p1').status_code == 401
+    login(client, 'u2')
+    assert client.get('/projects/p1').status_code == 403
+    assert client.get('/projects/missing').status_code == 404
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+from services import replica as replica_module
+from services.replica import ReplicaManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeWatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.is_active = True
+        self.closed = False
+
+    def unsubscribe(self):
+        self.closed = True
+
+
+class FakeRef:
+    def __init__(self, db, key):
+        self.db = db
+        self.key = key
+
+    def document(self, doc_id):
+        return FakeRef(self.db, (self.key, doc_id))
+
+    def where(self, field, op, value):
+        return FakeRef(self.db, (self.key, value))
+
+    def on_snapshot(self, callback):
+        watch = FakeWatch(callback)
+        self.db.watches[self.key] = watch
+        return watch
+
+
+class FakeDb:
+    """Client stand-in keeping the snapshot listeners, keyed by (collection, project id)"""
+
+    def __init__(self):
+        self.watches = {}
+
+    def collection(self, name):
+        return FakeRef(self, name)
+
+    def deliver(self, project_id, name='P', tasks=(), removed=()):
+        project = SimpleNamespace(id=project_id, exists=True, to_dict=lambda: {'name': name})
+        self.watches[('projects', project_id)].callback([project], [], None)
+        changes = [SimpleNamespace(type=SimpleNamespace(name='ADDED'),
+                                   document=SimpleNamespace(id=task_id, to_dict=lambda t=task_id: {'title': t}))
+                   for task_id in tasks]
+        changes += [SimpleNamespace(type=SimpleNamespace(name='REMOVED'), document=SimpleNamespace(id=task_id))
+                    for task_id in removed]
+        self.watches[('tasks', project_id)].callback([], changes, None)
+
+
+def test_reads_are_served_once_the_snapshots_arrive():
+    db, replicas = FakeDb(), ReplicaManager(max_projects=2)
+    assert replicas.get_tasks(db, 'p1') is None
+    assert replicas.get_project(db, 'p1') is None
+    db.deliver('p1', tasks=['t1', 't2'])
+    assert replicas.get_project(db, 'p1').name == 'P'
+    assert sorted(task.id for task in replicas.get_tasks(db, 'p1')) == ['t1', 't2']
+    db.deliver('p1', removed=['t1'])
+    assert [task.id for task in replicas.get_tasks(db, 'p1')] == ['t2']
+    assert replicas.stats()['hits'] == 3 and replicas.stats()['misses'] == 2
+
+
+def test_reads_return_copies():
+    db, replicas = FakeDb(), ReplicaManager(max_projects=1)
+    replicas.get_tasks(db, 'p1')
+    db.deliver('p1', tasks=['t1'])
+    replicas.get_tasks(db, 'p1')[0].title = 'changed'
+    assert replicas.get_tasks(db, 'p1')[0].title == 't1'
+
+
+def test_local_write_waits_for_the_next_snapshot(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(replica_module.time, 'monotonic', clock)
+    db, replicas = FakeDb(), ReplicaManager(max_projects=1)
+    replicas.get_tasks(db, 'p1')
+    db.deliver('p1', tasks=['t1'])
+    clock.now += 1
+    replicas.mark_dirty('p1')
+    assert replicas.get_tasks(db, 'p1') is None
+    clock.now += 0.5
+    db.deliver('p1', tasks=['t2'])
+    assert len(replicas.get_tasks(db, 'p1')) == 2
+
+
+def test_least_recently_used_replica_is_closed():
+    db, replicas = FakeDb(), ReplicaManager(max_projects=1)
+    replicas.get_tasks(db, 'p1')
+    first = db.watches[('tasks', 'p1')]
+    replicas.get_tasks(db, 'p2')
+    assert first.closed and replicas.stats()['projects'] == 1 and replicas.evictions == 1
+
+
+def test_oversized_project_is_not_replicated_again():
+    db, replicas = FakeDb(), ReplicaManager(max_projects=2, max_tasks=1)
+    replicas.get_tasks(db, 'p1')
+    db.deliver('p1', tasks=['t1', 't2'])
+    assert replicas.get_tasks(db, 'p1') is None
+    db.watches.clear()
+    assert replicas.get_tasks(db, 'p1') is None
+    assert db.watches == {}
+
+
+def test_dead_listener_drops_the_replica():
+    db, replicas = FakeDb(), ReplicaManager(max_projects=1)
+    replicas.get_tasks(db, 'p1')
+    db.deliver('p1')
+    db.watches[('tasks', 'p1')].is_active = False
+    assert replicas.get_tasks(db, 'p1') is None
+    assert replicas.stats()['projects'] == 0
+
+
+def test_disabled_manager_starts_no_listener():
+    db = FakeDb()
+    assert ReplicaManager().get_project(db, 'p1') is None
+    assert db.watches == {}
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from services.resilience import CircuitBreaker, ResilientExecutor, ServiceUnavailableError, TokenBucket
+
+
+def unavailable():
+    raise google_exceptions.ServiceUnavailable('backend down')
+
+
+def open_executor(**kwargs):
+    """Executor whose breaker just opened (one failure), resetting after 50 ms"""
+    executor = ResilientExecutor(failure_threshold=1, reset_timeout=0.05, max_attempts=1, **kwargs)
+    with pytest.raises(ServiceUnavailableError):
+        executor.call('read', unavailable, idempotent=True)
+    assert executor.breaker.state == CircuitBreaker.OPEN
+    return executor
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(rate=100, burst=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire()
+    assert bucket.acquire(timeout=0.1)
+
+
+def test_token_bucket_does_not_wait_past_its_timeout():
+    bucket = TokenBucket(rate=1, burst=1)
+    assert bucket.acquire()
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - started < 0.5
+
+
+def test_token_bucket_rejects_a_zero_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, burst=1)
+
+
+def test_breaker_opens_after_the_threshold_and_rejects():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(ServiceUnavailableError) as error:
+        breaker.before_call()
+    assert error.value.retry_after >= 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    rejected = []
+    def other_thread():
+        try:
+            breaker.before_call()
+        except ServiceUnavailableError:
+            rejected.append(True)
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+    assert rejected
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_calls_nested_in_the_trial_share_its_slot():
+    executor = open_executor()
+    time.sleep(0.06)
+    # e.g. a transaction (write) reading a document
+    result = executor.call('write', lambda: executor.call('read', lambda: 42, idempotent=True))
+    assert result == 42
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+    assert executor.metrics()['operations']['read']['rejected'] == 0
+
+
+def test_self_rejection_does_not_close_the_breaker():
+    executor = open_executor(limits={'read': (0.001, 1)})
+    time.sleep(0.06)
+    executor.buckets['read'].acquire()  # Empty the read bucket
+
+    def transaction():
+        return executor.call('read', lambda: 42, idempotent=True)
+    with pytest.raises(ServiceUnavailableError):
+        executor.call('write', transaction)
+    # Nothing reached the backend: still half-open, and the slot is free for a real probe
+    assert executor.breaker.state == CircuitBreaker.HALF_OPEN
+    assert executor.call('write', lambda: 'ok') == 'ok'
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_idempotent_calls_are_retried():
+    executor = ResilientExecutor(max_attempts=3, base_delay=0.001)
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise google_exceptions.DeadlineExceeded('slow')
+        return 'ok'
+    assert executor.call('read', flaky, idempotent=True) == 'ok'
+    assert executor.metrics()['operations']['read']['retries'] == 2
+
+
+def test_writes_are_not_retried():
+    executor = ResilientExecutor(max_attempts=3, base_delay=0.001)
+    attempts = []
+    def failing_write():
+        attempts.append(1)
+        unavailable()
+    with pytest.raises(ServiceUnavailableError):
+        executor.call('write', failing_write)
+    assert len(attempts) == 1
+
+
+def test_non_transient_errors_pass_through_and_count_as_healthy():
+    executor = ResilientExecutor(failure_threshold=1)
+    def missing():
+        raise google_exceptions.NotFound('missing')
+    with pytest.raises(google_exceptions.NotFound):
+        executor.call('read', missing)
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_throttled_call_fails_fast():
+    executor = ResilientExecutor(limits={'query': (0.001, 1)}, max_wait=0.01)
+    executor.call('query', lambda: None)
+    with pytest.raises(ServiceUnavailableError):
+        executor.call('query', lambda: None)
+    assert executor.metrics()['operations']['query']['throttled'] == 1
+
+
+def test_zero_rate_leaves_the_operation_unlimited():
+    executor = ResilientExecutor(limits={'read': (0, 0), 'write': (100, 1)})
+    for _ in range(10):
+        executor.call('read', lambda: None)
+    assert 'read' not in executor.metrics()['tokens_available']
+    assert executor.metrics()['operations']['read']['throttled'] == 0
@@ -0,0 +1,89 @@
+import pytest
+
+from services.models import Project, Task
+from services.search import EXACT_MATCH, PREFIX_MATCH, ProjectIndex, SearchIndex, tokenize
+
+
+def make_index(*tasks):
+    index = ProjectIndex('p1')
+    for task in tasks:
+        index.add(task)
+    return index
+
+
+@pytest.fixture
+def index():
+    return make_index(
+        Task(id='t1', title='Préparer la démo client', assignee='alice', updated_at=100),
+        Task(id='t2', title='Corriger le bug de connexion', description='Démo bloquée', updated_at=200),
+        Task(id='t3', title='Rédiger la documentation', assignee='bob', updated_at=150),
+    )
+
+
+def test_tokenize_lowercases_and_folds_accents():
+    assert tokenize('Préparer la DÉMO, v2!') == ['preparer', 'la', 'demo', 'v2']
+    assert tokenize('') == []
+
+
+def test_exact_and_prefix_matches(index):
+    assert index.matches('demo') == {'demo': EXACT_MATCH}
+    assert index.matches('doc') == {'documentation': PREFIX_MATCH}
+
+
+def test_typo_tolerant_match(index):
+    assert 'connexion' in index.matches('conexion')
+    assert index.matches('zzz') == {}
+
+
+def test_title_outweighs_description(index):
+    results = index.search(['demo'])
+    assert set(results) == {'t1', 't2'}
+    assert results['t1'][1] > results['t2'][1]
+
+
+def test_results_count_matched_terms(index):
+    results = index.search(['demo', 'alice'])
+    assert results['t1'][0] == 2 and results['t2'][0] == 1
+
+
+def test_update_and_remove_keep_postings_consistent(index):
+    index.add(Task(id='t1', title='Nouvelle tâche', updated_at=300))
+    assert 't1' not in index.search(['preparer'])
+    assert 'preparer' not in index.vocabulary
+    assert 't1' in index.search(['nouvelle'])
+    assert index.watermark == 300
+
+    index.remove('t3')
+    index.remove('missing')
+    assert index.search(['documentation']) == {}
+    assert index.vocabulary == sorted(index.postings)
+
+
+def test_search_ranks_across_projects_without_reading_the_store(index):
+    search_index = SearchIndex()
+    other = make_index(Task(id='t9', title='Démo interne', assignee='alice'))
+    index.version, other.version = 1, 4
+    search_index._projects.update({'p1': index, 'p2': other})
+    projects = [Project(id='p1', name='Site', version=1), Project(id='p2', name='Interne', version=4)]
+
+    results = search_index.search('demo alice', projects)
+    assert {r['id'] for r in results[:2]} == {'t1', 't9'} and all(r['matched_all'] for r in results[:2])
+    assert {r['id'] for r in results} == {'t1', 't2', 't9'}
+    assert results[-1]['id'] == 't2' and not results[-1]['matched_all']
+    assert search_index.hits == 2
+    assert search_index.search('  ', projects) == []
+
+
+def test_write_hooks_update_loaded_indexes(index):
+    search_index = SearchIndex()
+    search_index._projects['p1'] = index
+    search_index.on_task_written('t4', {'title': 'Planifier le sprint', 'status': 'todo'}, 'p1')
+    assert 't4' in index.search(['sprint'])
+    # Partial update keeps the other indexed fields
+    search_index.on_task_written('t4', {'status': 'done'})
+    assert index.docs['t4']['status'] == 'done' and 't4' in index.search(['sprint'])
+    search_index.on_task_deleted('t4')
+    assert 't4' not in index.docs
+    # Projects that are not loaded are left alone
+    search_index.on_task_written('t5', {'title': 'Autre'}, 'p2')
+    assert 'p2' not in search_index._projects
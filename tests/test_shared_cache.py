@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from services.shared_cache import SharedCache
+
+
+def make_cache():
+    cache = SharedCache()
+    cache.configure('memory://', ttl=60)
+    return cache
+
+
+def test_disabled_cache_is_a_no_op():
+    cache = SharedCache()
+    cache.set('project', 'p1', {'name': 'A'}, cache.stamp('project', 'p1'))
+    assert cache.get('project', 'p1') is None
+    assert not cache.stats()['enabled']
+
+
+def test_values_round_trip_with_datetimes():
+    cache = make_cache()
+    value = {'name': 'A', 'created_at': datetime(2024, 5, 1, 12, 30)}
+    cache.set('project', 'p1', value, cache.stamp('project', 'p1'))
+    assert cache.get('project', 'p1') == value
+    assert cache.get('project', 'p2') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_invalidation_drops_the_entry_and_reaches_other_workers():
+    client = make_cache()._client
+    writer, reader = SharedCache(), SharedCache()
+    for cache in (writer, reader):
+        cache.configure('memory://', ttl=60)
+        cache._client = client  # two workers sharing one server
+    received = {'writer': [], 'reader': []}
+    writer.subscribe(lambda kind, key: received['writer'].append((kind, key)))
+    reader.subscribe(lambda kind, key: received['reader'].append((kind, key)))
+
+    reader.set('project', 'p1', {'name': 'A'}, reader.stamp('project', 'p1'))
+    writer.invalidate('project', 'p1')
+    assert reader.get('project', 'p1') is None
+    # Applied once locally by the writer, and through pub/sub by the other worker
+    assert received == {'writer': [('project', 'p1')], 'reader': [('project', 'p1')]}
+
+
+def test_a_read_raced_by_an_invalidation_is_not_kept():
+    cache = make_cache()
+    stamp = cache.stamp('project', 'p1')
+    cache.invalidate('project', 'p1')  # a write lands while the document is being read
+    cache.set('project', 'p1', {'name': 'old'}, stamp)
+    assert cache.get('project', 'p1') is None
+    cache.set('project', 'p1', {'name': 'new'}, cache.stamp('project', 'p1'))
+    assert cache.get('project', 'p1') == {'name': 'new'}
+
+
+def test_value_without_a_stamp_is_not_stored():
+    cache = make_cache()
+    cache.set('user', 'u1', {'name': 'A'}, None)
+    assert cache.get('user', 'u1') is None
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from services.firestore_service import FirestoreService
+from services.models import Task
+from services.task_import import import_tasks, parse_rows
+
+CSV = """title,description,status,priority,assignee,due_date
+Rédiger le cahier des charges,Version 1,in_progress,high,u1,2024-06-30
+Relire,,,,,
+,Sans titre,todo,low,,
+Déployer,,blocked,low,,
+Tester,,todo,urgent,,
+Publier,,todo,low,,bientôt
+relire,Doublon du fichier,todo,low,,
+Existante,Déjà dans le projet,todo,low,,
+"""
+
+
+@pytest.fixture
+def created(monkeypatch):
+    written = []
+    existing = [Task.from_dict('t0', {'title': ' existante '})]
+    monkeypatch.setattr(FirestoreService, 'iter_tasks', staticmethod(lambda project_id: iter(existing)))
+
+    def create_tasks(project_id, tasks):
+        written.extend(tasks)
+        return [f'new{i}' for i in range(len(tasks))]
+
+    monkeypatch.setattr(FirestoreService, 'create_tasks', staticmethod(create_tasks))
+    return written
+
+
+def test_csv_rows_are_validated_and_reported(created):
+    report = import_tasks('p1', CSV, 'csv')
+    assert report == {
+        'dry_run': False, 'total_rows': 8, 'valid_rows': 2, 'created': 2,
+        'errors': [
+            {'row': 3, 'error': 'Titre manquant'},
+            {'row': 4, 'error': 'Statut invalide: blocked'},
+            {'row': 5, 'error': 'Priorité invalide: urgent'},
+            {'row': 6, 'error': 'Date invalide: bientôt'},
+            {'row': 7, 'error': 'Le nom de la tâche "relire" doit être unique dans ce projet.'},
+            {'row': 8, 'error': 'Le nom de la tâche "Existante" doit être unique dans ce projet.'},
+        ]
+    }
+    assert created == [
+        {'project_id': 'p1', 'title': 'Rédiger le cahier des charges', 'description': 'Version 1',
+         'status': 'in_progress', 'priority': 'high', 'assignee': 'u1', 'due_date': datetime(2024, 6, 30)},
+        {'project_id': 'p1', 'title': 'Relire', 'description': '', 'status': 'todo', 'priority': 'low',
+         'assignee': ''},
+    ]
+
+
+def test_ndjson_rows_and_invalid_lines(created):
+    content = '\n'.join([
+        '{"title": "A", "due_date": "2024-06-30T08:00:00Z"}',
+        '',
+        'not json',
+        '["a list"]',
+        '{"title": 42, "priority": "medium"}',
+    ])
+    report = import_tasks('p1', content, 'ndjson')
+    assert report['total_rows'] == 4 and report['created'] == 2
+    assert report['errors'] == [{'row': 2, 'error': 'Ligne JSON invalide'},
+                                {'row': 3, 'error': 'Ligne JSON invalide'}]
+    assert created[0]['due_date'] == datetime(2024, 6, 30, 8, tzinfo=timezone.utc)
+    assert created[1]['title'] == '42' and created[1]['priority'] == 'medium'
+
+
+def test_dry_run_writes_nothing(created):
+    report = import_tasks('p1', 'title\nA\nB\n', 'csv', dry_run=True)
+    assert report['valid_rows'] == 2 and report['created'] == 0
+    assert created == []
+
+
+def test_unknown_format_is_refused():
+    with pytest.raises(ValueError):
+        parse_rows('title\nA\n', 'xlsx')
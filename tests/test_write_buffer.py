@@ -0,0 +1,145 @@
+import threading
+import time
+
+from services.write_buffer import WriteBuffer
+
+
+class RecordingWriter:
+    """Writer storing what was written, optionally blocking or failing on demand"""
+
+    def __init__(self):
+        self.writes = []
+        self.block = None
+        self.started = threading.Event()
+        self.fail = None
+
+    def __call__(self, key, data, group):
+        self.started.set()
+        if self.block is not None:
+            self.block.wait(2)
+        if self.fail:
+            raise self.fail
+        self.writes.append((key, dict(data), group))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_updates_within_the_window_are_coalesced():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60)
+    buffer.submit('t1', {'status': 'in_progress'}, group='p1')
+    buffer.submit('t1', {'status': 'done', 'title': 'A'}, group='p1')
+    assert buffer.peek('t1') == {'status': 'done', 'title': 'A'}
+    buffer.flush_all()
+    assert writer.writes == [('t1', {'status': 'done', 'title': 'A'}, 'p1')]
+    assert len(buffer) == 0 and buffer.submitted == 2 and buffer.flushed == 1
+
+
+def test_background_thread_writes_after_the_delay():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=0.05)
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    wait_for(lambda: writer.writes)
+    assert writer.writes == [('t1', {'status': 'done'}, 'p1')]
+
+
+def test_generation_and_group_flush():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60)
+    assert buffer.generation('p1') == 0
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    buffer.submit('t2', {'status': 'todo'}, group='p2')
+    assert buffer.generation('p1') == 1
+    assert buffer.has_pending('p1')
+    buffer.flush_group('p1')
+    assert not buffer.has_pending('p1') and buffer.has_pending('p2')
+    assert [key for key, _, _ in writer.writes] == ['t1']
+
+
+def test_discard_returns_the_pending_update():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60)
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    entry = buffer.discard('t1')
+    assert entry['data'] == {'status': 'done'} and entry['group'] == 'p1'
+    assert buffer.discard('t1') is None
+    buffer.flush_all()
+    assert writer.writes == []
+
+
+class Transient(Exception):
+    pass
+
+
+def test_transient_failure_is_requeued_with_newer_updates():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60, retry_on=(Transient,))
+    buffer.submit('t1', {'status': 'in_progress', 'title': 'A'}, group='p1')
+    writer.fail = Transient('backend down')
+    buffer.flush_all()
+    assert buffer.peek('t1') == {'status': 'in_progress', 'title': 'A'}
+    writer.fail = None
+    buffer.flush_all()
+    assert writer.writes == [('t1', {'status': 'in_progress', 'title': 'A'}, 'p1')]
+
+
+def test_permanent_failure_is_dropped():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60, retry_on=(Transient,))
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    writer.fail = LookupError('task deleted')
+    buffer.flush_all()
+    assert buffer.peek('t1') is None and buffer.dropped == 1
+
+
+def test_transient_failure_is_dropped_after_max_retries():
+    writer = RecordingWriter()
+    buffer = WriteBuffer(writer, delay=60, retry_on=(Transient,), max_retries=2)
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    writer.fail = Transient('backend down')
+    for _ in range(2):
+        buffer.flush_all()
+        assert buffer.peek('t1') == {'status': 'done'}
+    buffer.flush_all()
+    assert buffer.peek('t1') is None and buffer.dropped == 1
+
+
+def test_discard_waits_for_a_write_in_progress():
+    writer = RecordingWriter()
+    writer.block = threading.Event()
+    buffer = WriteBuffer(writer, delay=0.01)
+    buffer.submit('t1', {'status': 'in_progress'}, group='p1')
+    assert writer.started.wait(2)
+
+    discarded = threading.Event()
+    thread = threading.Thread(target=lambda: (buffer.discard('t1'), discarded.set()))
+    thread.start()
+    # A direct write must not start while the buffered one may still commit after it
+    assert not discarded.wait(0.1)
+    writer.block.set()
+    thread.join(2)
+    assert discarded.is_set()
+    assert writer.writes == [('t1', {'status': 'in_progress'}, 'p1')]
+
+
+def test_discard_returns_a_write_that_failed_meanwhile():
+    writer = RecordingWriter()
+    writer.block = threading.Event()
+    writer.fail = Transient('backend down')
+    buffer = WriteBuffer(writer, delay=0.01, retry_on=(Transient,))
+    buffer.submit('t1', {'status': 'done'}, group='p1')
+    assert writer.started.wait(2)
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(entry=buffer.discard('t1')))
+    thread.start()
+    writer.block.set()
+    thread.join(2)
+    # The failed update is handed to the direct write instead of being retried later
+    assert result['entry']['data'] == {'status': 'done'}
+    assert buffer.peek('t1') is None